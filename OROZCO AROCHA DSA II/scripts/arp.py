@@ -0,0 +1,121 @@
+# Módulo 7: Resolución ARP
+# Caché de resolución de siguiente salto con expiración y colas de espera
+
+from collections import OrderedDict
+from estructuras_datos import Cola
+
+class EntradaARP:
+    """Entrada resuelta de la caché: destino -> saltos (interfaz, vecino) de igual costo"""
+    
+    def __init__(self, ip, saltos, expira_en):
+        self.ip = ip
+        self.saltos = saltos
+        self.expira_en = expira_en
+
+class CacheARP:
+    """Caché ARP acotada con desalojo LRU, expiración por TTL en ticks
+    y colas de paquetes pendientes mientras se resuelve un destino"""
+    
+    def __init__(self, capacidad=256, ttl=60, latencia_resolucion=1, max_pendientes=16):
+        self.capacidad = capacidad
+        self.ttl = ttl
+        self.latencia_resolucion = latencia_resolucion
+        self.max_pendientes = max_pendientes
+        self.entradas = OrderedDict()  # ip -> EntradaARP, en orden de uso
+        self.pendientes = {}  # ip -> {'listo_en': tick, 'cola': Cola}
+        self.aciertos = 0
+        self.fallos = 0
+        self.expiradas = 0
+        self.desalojadas = 0
+        self.solicitudes = 0
+    
+    def buscar(self, ip, tick):
+        """Busca una resolución vigente y actualiza los contadores"""
+        entrada = self.entradas.get(ip)
+        if entrada is not None:
+            if entrada.expira_en > tick:
+                self.entradas.move_to_end(ip)
+                self.aciertos += 1
+                return entrada
+            del self.entradas[ip]
+            self.expiradas += 1
+        self.fallos += 1
+        return None
+    
+    def insertar(self, ip, saltos, tick):
+        """Registra una resolución, desalojando la menos usada si está llena.
+        Retorna la entrada creada"""
+        if ip in self.entradas:
+            del self.entradas[ip]
+        elif len(self.entradas) >= self.capacidad:
+            self.entradas.popitem(last=False)
+            self.desalojadas += 1
+        entrada = EntradaARP(ip, saltos, tick + self.ttl)
+        self.entradas[ip] = entrada
+        return entrada
+    
+    def encolar_pendiente(self, ip, paquete, tick):
+        """Retiene un paquete hasta que termine la resolución de su destino.
+        Retorna False si la cola de espera de ese destino está llena"""
+        pendiente = self.pendientes.get(ip)
+        if pendiente is None:
+            pendiente = {'listo_en': tick + self.latencia_resolucion, 'cola': Cola()}
+            self.pendientes[ip] = pendiente
+            self.solicitudes += 1
+        elif pendiente['cola'].obtener_tamaño() >= self.max_pendientes:
+            return False
+        pendiente['cola'].encolar(paquete)
+        return True
+    
+    def resoluciones_listas(self, tick):
+        """Retira y retorna las resoluciones cuyo tiempo de espera se cumplió"""
+        listas = []
+        for ip, pendiente in list(self.pendientes.items()):
+            if pendiente['listo_en'] <= tick:
+                listas.append((ip, pendiente['cola']))
+                del self.pendientes[ip]
+        return listas
+    
+    def purgar_expiradas(self, tick):
+        """Elimina todas las entradas cuyo TTL ya venció"""
+        for ip in [ip for ip, e in self.entradas.items() if e.expira_en <= tick]:
+            del self.entradas[ip]
+            self.expiradas += 1
+    
+    def invalidar_interfaz(self, interfaz):
+        """Elimina las resoluciones que usan una interfaz dada como salida"""
+        for ip in [ip for ip, e in self.entradas.items()
+                   if any(salida is interfaz for salida, _ in e.saltos)]:
+            del self.entradas[ip]
+    
+    def limpiar(self):
+        """Vacía la caché (las resoluciones en curso se conservan)"""
+        self.entradas.clear()
+    
+    def en_espera(self):
+        """Paquetes retenidos esperando una resolución"""
+        return sum(len(p['cola']) for p in self.pendientes.values())
+    
+    def obtener_entradas(self, tick):
+        """Retorna las entradas vigentes con su tiempo restante"""
+        self.purgar_expiradas(tick)
+        return [{
+            'ip': e.ip,
+            'saltos': [f"{i.nombre} -> {v.dispositivo_padre.nombre}:{v.nombre}" for i, v in e.saltos],
+            'expira_en': e.expira_en - tick
+        } for e in self.entradas.values()]
+    
+    def obtener_estadisticas(self):
+        """Retorna los contadores de la caché"""
+        consultas = self.aciertos + self.fallos
+        return {
+            'entradas': len(self.entradas),
+            'capacidad': self.capacidad,
+            'pendientes': sum(p['cola'].obtener_tamaño() for p in self.pendientes.values()),
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / consultas * 100, 1) if consultas else 0,
+            'solicitudes': self.solicitudes,
+            'expiradas': self.expiradas,
+            'desalojadas': self.desalojadas
+        }
@@ -0,0 +1,170 @@
+# Barrido de escenarios
+# Ejecuta la misma topología bajo una grilla de parámetros en procesos paralelos
+
+import csv
+import hashlib
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from red import Red
+from persistencia import GestorPersistencia
+
+# Parámetros de cada escenario y su valor si la grilla no los menciona
+PARAMETROS_POR_DEFECTO = {
+    'ttl': 64,
+    'tasa_trafico': 1,  # Paquetes por tick en cada flujo
+    'fallas': [],  # Dispositivos que pasan a offline en tick_falla
+    'tick_falla': None,  # None = a mitad del tráfico
+    'ticks': 100,  # Ticks con tráfico; después se deja vaciar la red
+    'flujos': None,  # [[ip_origen, ip_destino], ...]; None = todos los pares de hosts
+    'semilla': 0
+}
+
+def expandir_grilla(grilla):
+    """Producto cartesiano de la grilla: las claves con lista de valores se
+    combinan y el resto queda fijo. 'fallas' y 'flujos' ya son listas, así
+    que para barrerlas se da una lista de alternativas"""
+    barridas = {}
+    for clave, valor in grilla.items():
+        if clave not in PARAMETROS_POR_DEFECTO:
+            raise ValueError(f"Parámetro desconocido en la grilla: {clave}")
+        anidado = clave in ('fallas', 'flujos')
+        es_barrido = isinstance(valor, list) and (not anidado or (valor and all(isinstance(v, list) for v in valor)))
+        barridas[clave] = valor if es_barrido else [valor]
+    
+    claves = list(barridas)
+    for combinacion in itertools.product(*(barridas[c] for c in claves)):
+        parametros = dict(PARAMETROS_POR_DEFECTO)
+        parametros.update(zip(claves, combinacion))
+        yield parametros
+
+def identificar(parametros):
+    """Identificador estable de un escenario (para reanudar)"""
+    return hashlib.sha1(json.dumps(parametros, sort_keys=True).encode()).hexdigest()[:12]
+
+def _flujos_por_defecto(red):
+    """Todos los pares ordenados de IPs de PCs y hosts"""
+    ips = [interfaz.direccion_ip
+           for dispositivo in red.dispositivos.values() if dispositivo.tipo.lower() in ('pc', 'host')
+           for interfaz in dispositivo.interfaces.values() if interfaz.direccion_ip]
+    return [[a, b] for a in ips for b in ips if a != b]
+
+def ejecutar_escenario(archivo_base, parametros):
+    """Corre un escenario en una red nueva y retorna sus estadísticas globales"""
+    red = Red()
+    resultado = GestorPersistencia(red).cargar_configuracion(archivo_base)
+    if resultado.startswith("Error"):
+        raise RuntimeError(resultado)
+    red.sembrar(parametros['semilla'])
+    desconocidos = [nombre for nombre in parametros['fallas'] if nombre not in red.dispositivos]
+    if desconocidos:
+        raise RuntimeError(f"Dispositivos de 'fallas' no encontrados: {', '.join(desconocidos)}")
+    
+    flujos = parametros['flujos'] or _flujos_por_defecto(red)
+    emisores = [(red._dueño_direccion(origen), origen, destino) for origen, destino in flujos]
+    sin_dueño = [origen for dispositivo, origen, _ in emisores if dispositivo is None]
+    if sin_dueño:
+        raise RuntimeError(f"IPs de origen de 'flujos' sin dispositivo: {', '.join(sin_dueño)}")
+    tick_falla = parametros['tick_falla'] if parametros['tick_falla'] is not None else parametros['ticks'] // 2
+    
+    for tick in range(parametros['ticks']):
+        if tick == tick_falla:
+            for nombre in parametros['fallas']:
+                red.establecer_estado_dispositivo(nombre, False)
+        for dispositivo, origen, destino in emisores:
+            for _ in range(parametros['tasa_trafico']):
+                dispositivo.enviar_paquete(origen, destino, None, parametros['ttl'], red.tick_actual, 64)
+        red.procesar_tick()
+    
+    # Dejar que los paquetes en vuelo terminen (o expiren)
+    for _ in range(parametros['ttl'] + 1):
+        if not red.metricas.series['en_vuelo'].ultimo():
+            break
+        red.procesar_tick()
+    
+    stats = red.obtener_estadisticas_globales()
+    resumen = red.metricas.obtener_resumen()
+    stats['latencia_p50'] = resumen['latencia_p50']
+    stats['latencia_p99'] = resumen['latencia_p99']
+    stats['ticks_simulados'] = red.tick_actual
+    stats['digest'] = red.resumen.obtener_resumen()['digest']
+    return stats
+
+def _cargar_progreso(archivo_progreso):
+    """Resultados ya completados de una corrida anterior, por identificador"""
+    completados = {}
+    if os.path.exists(archivo_progreso):
+        with open(archivo_progreso, 'r', encoding='utf-8') as archivo:
+            for linea in archivo:
+                try:
+                    fila = json.loads(linea)
+                except json.JSONDecodeError:
+                    continue  # Última línea cortada por una interrupción
+                completados[fila['escenario']] = fila
+    return completados
+
+def _escribir_tabla(filas, archivo_salida):
+    """Escribe la tabla final en CSV o JSON según la extensión"""
+    if archivo_salida.endswith('.json'):
+        with open(archivo_salida, 'w', encoding='utf-8') as archivo:
+            json.dump(filas, archivo, indent=2, ensure_ascii=False)
+        return
+    
+    columnas = []
+    for fila in filas:
+        for columna in fila:
+            if columna not in columnas:
+                columnas.append(columna)
+    with open(archivo_salida, 'w', encoding='utf-8', newline='') as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=columnas)
+        escritor.writeheader()
+        for fila in filas:
+            escritor.writerow({c: json.dumps(v) if isinstance(v, (list, dict)) else v for c, v in fila.items()})
+
+def ejecutar_barrido(archivo_base, grilla, archivo_salida, procesos=None):
+    """Corre todos los escenarios pendientes y escribe la tabla agregada.
+    Cada resultado se agrega a '<salida>.progreso.jsonl' en cuanto termina,
+    así que una corrida interrumpida retoma solo lo que faltaba"""
+    escenarios = [(identificar(p), p) for p in expandir_grilla(grilla)]
+    archivo_progreso = archivo_salida + '.progreso.jsonl'
+    completados = _cargar_progreso(archivo_progreso)
+    pendientes = [(clave, p) for clave, p in escenarios if clave not in completados]
+    print(f"{len(escenarios)} escenarios: {len(completados)} ya completados, {len(pendientes)} pendientes")
+    
+    errores = 0
+    with open(archivo_progreso, 'a', encoding='utf-8') as progreso, \
+            ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        futuros = {ejecutor.submit(ejecutar_escenario, archivo_base, p): (clave, p) for clave, p in pendientes}
+        for futuro in as_completed(futuros):
+            clave, parametros = futuros[futuro]
+            try:
+                stats = futuro.result()
+            except Exception as e:
+                errores += 1
+                print(f"  Escenario {clave} falló: {e}")
+                continue
+            fila = {'escenario': clave, **parametros, **stats}
+            completados[clave] = fila
+            progreso.write(json.dumps(fila, ensure_ascii=False) + "\n")
+            progreso.flush()
+            print(f"  [{len(completados)}/{len(escenarios)}] {clave}: {stats['paquetes_entregados']} entregados")
+    
+    filas = [completados[clave] for clave, _ in escenarios if clave in completados]
+    _escribir_tabla(filas, archivo_salida)
+    print(f"Tabla escrita en {archivo_salida} ({len(filas)} filas, {errores} errores)")
+    return filas
+
+def main():
+    """Uso: python barrido.py <config_base.json> <grilla.json> <salida.csv|salida.json> [procesos]"""
+    if len(sys.argv) < 4:
+        print(main.__doc__)
+        return
+    with open(sys.argv[2], 'r', encoding='utf-8') as archivo:
+        grilla = json.load(archivo)
+    procesos = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    ejecutar_barrido(sys.argv[1], grilla, sys.argv[3], procesos)
+
+if __name__ == "__main__":
+    main()
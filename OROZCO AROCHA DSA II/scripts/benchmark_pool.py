@@ -0,0 +1,87 @@
+# Benchmark del pool de paquetes
+# Compara las pausas del recolector de basura con y sin reciclaje de paquetes
+
+import gc
+import sys
+import time
+from red import Red
+
+class MedidorGC:
+    """Mide la duración de cada recolección usando gc.callbacks"""
+
+    def __init__(self):
+        self.pausas = []
+        self._inicio = None
+
+    def __call__(self, fase, info):
+        if fase == 'start':
+            self._inicio = time.perf_counter()
+        elif self._inicio is not None:
+            self.pausas.append(time.perf_counter() - self._inicio)
+            self._inicio = None
+
+def construir_red(con_pool, lote):
+    """Crea dos hosts conectados con capacidad suficiente para el lote por tick"""
+    red = Red()
+    red.pool_paquetes.establecer_habilitado(con_pool)
+    red.agregar_dispositivo('Origen', 'pc')
+    red.agregar_dispositivo('Destino', 'pc')
+    for nombre, ip in (('Origen', '10.0.0.1'), ('Destino', '10.0.0.2')):
+        dispositivo = red.obtener_dispositivo(nombre)
+        dispositivo.configurar_interfaz_ip('eth0', ip)
+        dispositivo.activar_interfaz('eth0')
+        dispositivo.obtener_interfaz('eth0').configurar_servicio(lote)
+    red.conectar_dispositivos('Origen', 'eth0', 'Destino', 'eth0')
+    red.obtener_dispositivo('Destino').establecer_retencion_historial(1000)
+
+    # Resolver ARP antes de medir para que ningún paquete quede retenido
+    red.obtener_dispositivo('Origen').enviar_paquete('10.0.0.1', '10.0.0.2', 'warmup', 64, red.tick_actual)
+    for _ in range(3):
+        red.procesar_tick()
+    return red
+
+def ejecutar(total, con_pool, lote=1000):
+    """Envía 'total' paquetes en lotes por tick y retorna las métricas"""
+    red = construir_red(con_pool, lote)
+    origen = red.obtener_dispositivo('Origen')
+    medidor = MedidorGC()
+
+    gc.collect()
+    gc.callbacks.append(medidor)
+    inicio = time.perf_counter()
+    try:
+        enviados = 0
+        while enviados < total:
+            for _ in range(min(lote, total - enviados)):
+                origen.enviar_paquete('10.0.0.1', '10.0.0.2', None, 64, red.tick_actual, 1500)
+            enviados += lote
+            red.procesar_tick()
+    finally:
+        gc.callbacks.remove(medidor)
+
+    return {
+        'segundos': time.perf_counter() - inicio,
+        'recolecciones': len(medidor.pausas),
+        'pausa_total_ms': sum(medidor.pausas) * 1000,
+        'pausa_max_ms': max(medidor.pausas, default=0) * 1000,
+        'pool': red.pool_paquetes.obtener_estadisticas()
+    }
+
+def main():
+    """Ejecuta el benchmark: python benchmark_pool.py [paquetes]"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    print(f"Benchmark de reciclaje con {total} paquetes")
+
+    for con_pool in (False, True):
+        resultado = ejecutar(total, con_pool)
+        etiqueta = "Con pool" if con_pool else "Sin pool"
+        print(f"\n{etiqueta}:")
+        print(f"  Tiempo: {resultado['segundos']:.2f} s")
+        print(f"  Recolecciones: {resultado['recolecciones']}")
+        print(f"  Pausa total de GC: {resultado['pausa_total_ms']:.1f} ms | Pausa máxima: {resultado['pausa_max_ms']:.2f} ms")
+        if con_pool:
+            stats = resultado['pool']
+            print(f"  Pool: {stats['aciertos']} aciertos, {stats['fallos']} fallos ({stats['tasa_aciertos']}%)")
+
+if __name__ == "__main__":
+    main()
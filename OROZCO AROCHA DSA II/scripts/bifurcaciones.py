@@ -0,0 +1,126 @@
+# Módulo 19: Bifurcaciones de la topología
+# Variantes "¿qué pasa si...?" de la red guardadas como diarios de cambios
+
+class Bifurcacion:
+    """Una variante de la red: los cambios que hizo sobre la de su padre"""
+    
+    def __init__(self, nombre, padre):
+        self.nombre = nombre
+        self.padre = padre
+        self.punto = len(padre.cambios) if padre else 0  # Cambios del padre al bifurcar
+        self.cambios = []  # (rehacer, deshacer) en el orden en que ocurrieron
+    
+    def aplicados(self):
+        """(rama, cantidad de cambios suyos vigentes) desde la raíz hasta esta:
+        de cada ancestro valen solo los cambios anteriores a la bifurcación"""
+        cadena = [(self, len(self.cambios))]
+        actual = self
+        while actual.padre is not None:
+            cadena.append((actual.padre, actual.punto))
+            actual = actual.padre
+        cadena.reverse()
+        return cadena
+
+class GestorBifurcaciones:
+    """Mantiene varias variantes de una misma Red sin copiarla.
+    
+    Todas las variantes comparten los mismos objetos Dispositivo e Interfaz.
+    Cada bifurcación guarda solo el diario de los cambios que hizo (con su
+    operación inversa), así que crearla es O(1) y ocupa memoria proporcional
+    a sus cambios. Una variante ve los cambios de sus ancestros hasta el
+    momento en que se bifurcó, no los posteriores. Cambiar de variante
+    deshace los cambios hasta el punto común y rehace los del destino:
+    cuesta O(cambios), no O(red). La raíz lleva diario solo mientras existan
+    otras variantes.
+    
+    Se registran los cambios de configuración y topología (conexiones, IPs,
+    estado de interfaces y dispositivos, tasas de servicio, ECMP, nombres).
+    El estado de tráfico (colas, paquetes en vuelo, contadores) es uno solo
+    y acompaña a la variante activa"""
+    
+    RAIZ = 'main'
+    
+    def __init__(self, red):
+        self.red = red
+        self.raiz = Bifurcacion(self.RAIZ, None)
+        self.ramas = {self.RAIZ: self.raiz}
+        self.actual = self.raiz
+        self.reproduciendo = False
+    
+    def registrar(self, rehacer, deshacer):
+        """Anota un cambio en la bifurcación activa (en la raíz, solo si hay otras)"""
+        if self.reproduciendo or (self.actual is self.raiz and len(self.ramas) == 1):
+            return
+        self.actual.cambios.append((rehacer, deshacer))
+    
+    def bifurcar(self, nombre):
+        """Crea una bifurcación de la variante activa y pasa a ella"""
+        if nombre in self.ramas:
+            return False
+        rama = Bifurcacion(nombre, self.actual)
+        self.ramas[nombre] = rama
+        self.actual = rama
+        return True
+    
+    def cambiar(self, nombre):
+        """Pasa a otra variante; retorna cuántos cambios se deshicieron y rehicieron"""
+        destino = self.ramas.get(nombre)
+        if destino is None:
+            return None
+        
+        origen = self.actual.aplicados()
+        objetivo = destino.aplicados()
+        
+        # Primer tramo en que difieren; en la rama compartida vale el mínimo
+        k = 0
+        while k < min(len(origen), len(objetivo)) and origen[k] == objetivo[k]:
+            k += 1
+        comun = 0
+        if k < len(origen) and k < len(objetivo) and origen[k][0] is objetivo[k][0]:
+            comun = min(origen[k][1], objetivo[k][1])
+        
+        self.reproduciendo = True
+        try:
+            deshechos = 0
+            for i in range(len(origen) - 1, k - 1, -1):
+                rama, cantidad = origen[i]
+                desde = comun if i == k else 0
+                for _, deshacer in reversed(rama.cambios[desde:cantidad]):
+                    deshacer()
+                    deshechos += 1
+            
+            rehechos = 0
+            for i in range(k, len(objetivo)):
+                rama, cantidad = objetivo[i]
+                desde = comun if i == k else 0
+                for rehacer, _ in rama.cambios[desde:cantidad]:
+                    rehacer()
+                    rehechos += 1
+        finally:
+            self.reproduciendo = False
+        
+        self.actual = destino
+        return deshechos, rehechos
+    
+    def descartar(self, nombre):
+        """Elimina una bifurcación sin hijas que no sea la activa ni la raíz"""
+        rama = self.ramas.get(nombre)
+        if rama is None or rama is self.raiz:
+            return "no existe o es la raíz"
+        if rama is self.actual:
+            return "es la variante activa"
+        if any(otra.padre is rama for otra in self.ramas.values()):
+            return "tiene bifurcaciones hijas"
+        del self.ramas[nombre]
+        if len(self.ramas) == 1:
+            self.raiz.cambios.clear()  # Sin otras variantes, la raíz deja de llevar diario
+        return None
+    
+    def obtener_ramas(self):
+        """Nombre, padre, cambios y si es la activa, por bifurcación"""
+        return [{
+            'nombre': rama.nombre,
+            'padre': rama.padre.nombre if rama.padre else None,
+            'cambios': len(rama.cambios),
+            'activa': rama is self.actual
+        } for rama in self.ramas.values()]
@@ -0,0 +1,93 @@
+# Módulo 17: Simulación en segundo plano
+# Hilo que avanza la red a una tasa objetivo de ticks por segundo
+
+import threading
+import time
+from collections import deque
+
+class BucleSimulacion:
+    """Ejecuta Red.procesar_tick continuamente en un hilo propio.
+    
+    Cada tick se procesa con red.cerrojo tomado, y el CLI toma el mismo
+    cerrojo para ejecutar un comando: los comandos ven siempre la red entre
+    dos ticks, nunca a medio procesar. Con tasa None los ticks se encadenan
+    tan rápido como se pueda. Con tasa fija se planifican sobre una agenda
+    absoluta (inicio + n / tasa), así que un tick lento no acumula retraso:
+    la deriva es cuánto va atrasado el tick actual respecto de su agenda"""
+    
+    def __init__(self, red, tasa=None):
+        self.red = red
+        self.tasa = tasa  # Ticks por segundo; None = sin límite
+        self.ticks = 0
+        self.deriva = 0.0  # Segundos de atraso del último tick respecto de la agenda
+        self.deriva_maxima = 0.0
+        self.tiempo_procesando = 0.0
+        self.error = None
+        self._detener = threading.Event()
+        self._hilo = None
+        self._inicio = None
+        self._fin = None
+        self._recientes = deque(maxlen=64)  # Instantes de los últimos ticks
+    
+    def iniciar(self):
+        """Arranca el hilo de simulación"""
+        self._detener.clear()
+        self._inicio = time.perf_counter()
+        self._hilo = threading.Thread(target=self._ejecutar, name='bucle-simulacion', daemon=True)
+        self._hilo.start()
+    
+    def detener(self):
+        """Pide al hilo que termine y espera a que lo haga"""
+        self._detener.set()
+        if self._hilo:
+            self._hilo.join()
+            self._hilo = None
+    
+    def activo(self):
+        return self._hilo is not None and self._hilo.is_alive()
+    
+    def _ejecutar(self):
+        periodo = 1.0 / self.tasa if self.tasa else 0.0
+        while not self._detener.is_set():
+            antes = time.perf_counter()
+            try:
+                with self.red.cerrojo:
+                    self.red.procesar_tick()
+            except Exception as e:
+                self.error = e
+                break
+            ahora = time.perf_counter()
+            self.ticks += 1
+            self.tiempo_procesando += ahora - antes
+            self._recientes.append(ahora)
+            
+            if periodo:
+                agenda = self._inicio + self.ticks * periodo
+                self.deriva = max(ahora - agenda, 0.0)
+                self.deriva_maxima = max(self.deriva_maxima, self.deriva)
+                if agenda > ahora:
+                    self._detener.wait(agenda - ahora)
+            else:
+                time.sleep(0)  # Ceder el cerrojo al CLI entre ticks
+        self._fin = time.perf_counter()
+    
+    def obtener_estado(self):
+        """Tasa lograda, deriva y costo por tick"""
+        fin = self._fin if self._fin and not self.activo() else time.perf_counter()
+        transcurrido = fin - self._inicio if self._inicio else 0.0
+        if len(self._recientes) > 1 and self._recientes[-1] > self._recientes[0]:
+            tasa_reciente = (len(self._recientes) - 1) / (self._recientes[-1] - self._recientes[0])
+        else:
+            tasa_reciente = 0.0
+        return {
+            'activo': self.activo(),
+            'tasa_objetivo': self.tasa,
+            'ticks': self.ticks,
+            'segundos': round(transcurrido, 2),
+            'tasa_lograda': round(self.ticks / transcurrido, 1) if transcurrido else 0.0,
+            'tasa_reciente': round(tasa_reciente, 1),
+            'deriva_ms': round(self.deriva * 1000, 2),
+            'deriva_maxima_ms': round(self.deriva_maxima * 1000, 2),
+            'ms_por_tick': round(self.tiempo_procesando / self.ticks * 1000, 3) if self.ticks else 0.0,
+            'error': str(self.error) if self.error else None
+        }
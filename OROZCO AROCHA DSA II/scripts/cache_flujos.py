@@ -0,0 +1,75 @@
+# Módulo 12: Caché de flujos
+# Decisiones de reenvío por destino, invalidadas por la época de la topología
+
+from collections import OrderedDict
+
+class EntradaFlujo:
+    """Decisión de reenvío cacheada: saltos de igual costo válidos para una época"""
+    
+    def __init__(self, saltos, epoca, expira_en):
+        self.saltos = saltos
+        self.epoca = epoca
+        self.expira_en = expira_en  # Vence junto con la resolución ARP que la respalda
+
+class CacheFlujos:
+    """Caché acotada por destino con desalojo LRU. Las entradas no se borran
+    al cambiar la topología: se descartan al consultarlas con otra época"""
+    
+    CAPACIDAD_POR_TIPO = {'router': 1024, 'firewall': 512, 'switch': 256, 'pc': 32, 'host': 32}
+    CAPACIDAD_POR_DEFECTO = 128
+    
+    def __init__(self, capacidad=CAPACIDAD_POR_DEFECTO):
+        self.capacidad = capacidad
+        self.entradas = OrderedDict()  # ip destino -> EntradaFlujo, en orden de uso
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidadas = 0  # Entradas descartadas por época vieja o vencidas
+        self.desalojadas = 0
+    
+    def buscar(self, ip, epoca, tick):
+        """Retorna los saltos cacheados si la entrada sigue vigente, o None"""
+        entrada = self.entradas.get(ip)
+        if entrada is not None:
+            if entrada.epoca == epoca and entrada.expira_en > tick:
+                self.entradas.move_to_end(ip)
+                self.aciertos += 1
+                return entrada.saltos
+            del self.entradas[ip]
+            self.invalidadas += 1
+        self.fallos += 1
+        return None
+    
+    def insertar(self, ip, saltos, epoca, expira_en):
+        """Registra una decisión, desalojando la menos usada si está llena"""
+        if self.capacidad <= 0:
+            return
+        if ip in self.entradas:
+            del self.entradas[ip]
+        elif len(self.entradas) >= self.capacidad:
+            self.entradas.popitem(last=False)
+            self.desalojadas += 1
+        self.entradas[ip] = EntradaFlujo(saltos, epoca, expira_en)
+    
+    def establecer_capacidad(self, capacidad):
+        """Cambia el tamaño máximo, desalojando las entradas menos usadas que sobren"""
+        self.capacidad = capacidad
+        while len(self.entradas) > max(capacidad, 0):
+            self.entradas.popitem(last=False)
+            self.desalojadas += 1
+    
+    def limpiar(self):
+        """Vacía la caché"""
+        self.entradas.clear()
+    
+    def obtener_estadisticas(self):
+        """Retorna los contadores de la caché"""
+        consultas = self.aciertos + self.fallos
+        return {
+            'entradas': len(self.entradas),
+            'capacidad': self.capacidad,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / consultas * 100, 1) if consultas else 0,
+            'invalidadas': self.invalidadas,
+            'desalojadas': self.desalojadas
+        }
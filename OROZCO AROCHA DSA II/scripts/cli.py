@@ -1,6 +1,7 @@
 # Módulo 4: Interfaz de Línea de Comandos
 # Parser CLI con diferentes modos usando patrón comando
 
+import math
 import re
 from abc import ABC, abstractmethod
 
@@ -110,6 +111,47 @@ class ComandoShutdown(Comando):
     def obtener_ayuda(self):
         return "shutdown / no shutdown - Desactiva/activa la interfaz"
 
+class ComandoServiceRate(Comando):
+    def ejecutar(self, argumentos, contexto):
+        if contexto.modo_actual != 'configuracion_interfaz':
+            return "Error: Comando disponible solo en modo configuración de interfaz"
+        
+        if not argumentos:
+            return "Error: Uso: service-rate <n> [packets|bytes]"
+        
+        unidad = 'bytes' if len(argumentos) > 1 and argumentos[1].lower() == 'bytes' else 'paquetes'
+        try:
+            tasa = float(argumentos[0])
+        except ValueError:
+            return "Error: Tasa de servicio inválida"
+        
+        interfaz = contexto.dispositivo_actual.obtener_interfaz(contexto.interfaz_actual)
+        if interfaz and interfaz.configurar_servicio(tasa, unidad):
+            return f"Tasa de servicio de {contexto.interfaz_actual}: {tasa:g} {unidad}/tick"
+        return "Error: Tasa de servicio inválida"
+    
+    def obtener_ayuda(self):
+        return "service-rate <n> [packets|bytes] - Paquetes o bytes atendidos por tick"
+
+class ComandoQueueType(Comando):
+    TIPOS = {'linked': 'enlazada', 'ring': 'circular'}
+    
+    def ejecutar(self, argumentos, contexto):
+        if contexto.modo_actual != 'configuracion_interfaz':
+            return "Error: Comando disponible solo en modo configuración de interfaz"
+        
+        if not argumentos or argumentos[0].lower() not in self.TIPOS:
+            return "Error: Uso: queue-type <linked|ring>"
+        
+        tipo = self.TIPOS[argumentos[0].lower()]
+        interfaz = contexto.dispositivo_actual.obtener_interfaz(contexto.interfaz_actual)
+        if interfaz and interfaz.establecer_tipo_cola(tipo):
+            return f"Colas de {contexto.interfaz_actual}: {tipo}"
+        return "Error al cambiar el tipo de cola"
+    
+    def obtener_ayuda(self):
+        return "queue-type <linked|ring> - Colas enlazadas o sobre arreglo circular"
+
 class ComandoExit(Comando):
     def ejecutar(self, argumentos, contexto):
         if contexto.modo_actual == 'configuracion_interfaz':
@@ -134,23 +176,51 @@ class ComandoEnd(Comando):
 
 class ComandoConnect(Comando):
     def ejecutar(self, argumentos, contexto):
-        if len(argumentos) < 4:
-            return "Error: Uso: connect <interfaz1> <dispositivo2> <interfaz2>"
+        if len(argumentos) < 3:
+            return "Error: Uso: connect <interfaz1> <dispositivo2> <interfaz2> [bandwidth <n>|bytes <n>] [delay <ticks>] [loss <p>]"
         
         interfaz1 = argumentos[0]
         dispositivo2 = argumentos[1]
         interfaz2 = argumentos[2]
         
-        if contexto.red.conectar_dispositivos(contexto.nombre_dispositivo, interfaz1, dispositivo2, interfaz2):
+        atributos = self._parsear_atributos(argumentos[3:])
+        if atributos is None:
+            return "Error: Atributos de enlace inválidos"
+        
+        if contexto.red.conectar_dispositivos(contexto.nombre_dispositivo, interfaz1, dispositivo2, interfaz2, **atributos):
             return f"Conexión establecida: {contexto.nombre_dispositivo}:{interfaz1} <-> {dispositivo2}:{interfaz2}"
         return "Error: No se pudo establecer la conexión"
     
+    def _parsear_atributos(self, argumentos):
+        """Convierte pares 'clave valor' en atributos de enlace"""
+        atributos = {}
+        if len(argumentos) % 2 != 0:
+            return None
+        try:
+            for clave, valor in zip(argumentos[::2], argumentos[1::2]):
+                clave = clave.lower()
+                if clave == 'bandwidth':
+                    atributos['ancho_banda'] = float(valor)
+                    atributos['unidad'] = 'paquetes'
+                elif clave == 'bytes':
+                    atributos['ancho_banda'] = float(valor)
+                    atributos['unidad'] = 'bytes'
+                elif clave == 'delay':
+                    atributos['retardo'] = int(valor)
+                elif clave == 'loss':
+                    atributos['perdida'] = float(valor)
+                else:
+                    return None
+        except ValueError:
+            return None
+        return atributos
+    
     def obtener_ayuda(self):
-        return "connect <interfaz1> <dispositivo2> <interfaz2> - Conecta dos interfaces"
+        return "connect <interfaz1> <dispositivo2> <interfaz2> [bandwidth <n>|bytes <n>] [delay <t>] [loss <p>] - Conecta dos interfaces"
 
 class ComandoDisconnect(Comando):
     def ejecutar(self, argumentos, contexto):
-        if len(argumentos) < 4:
+        if len(argumentos) < 3:
             return "Error: Uso: disconnect <interfaz1> <dispositivo2> <interfaz2>"
         
         interfaz1 = argumentos[0]
@@ -166,20 +236,339 @@ class ComandoDisconnect(Comando):
 
 class ComandoSend(Comando):
     def ejecutar(self, argumentos, contexto):
+        if contexto.red.fluido.activo:
+            return self._iniciar_flujo(argumentos, contexto)
         if len(argumentos) < 3:
-            return "Error: Uso: send <ip_origen> <ip_destino> <mensaje> [ttl]"
+            return "Error: Uso: send <ip_origen> <ip_destino> <mensaje|-> [ttl] [size <bytes>]"
         
         ip_origen = argumentos[0]
         ip_destino = argumentos[1]
         mensaje = argumentos[2]
-        ttl = int(argumentos[3]) if len(argumentos) > 3 else 64
+        opciones = argumentos[3:]
+        
+        # Tamaño declarado: la carga no se reserva, solo se contabiliza
+        tamaño = None
+        if 'size' in opciones:
+            posicion = opciones.index('size')
+            if posicion + 1 >= len(opciones):
+                return "Error: Especifique el tamaño en bytes"
+            tamaño = int(opciones[posicion + 1])
+            if tamaño < 0:
+                return "Error: El tamaño no puede ser negativo"
+            opciones = opciones[:posicion] + opciones[posicion + 2:]
+            if mensaje == '-':
+                mensaje = None
+        
+        ttl = int(opciones[0]) if opciones else 64
         
-        if contexto.dispositivo_actual.enviar_paquete(ip_origen, ip_destino, mensaje, ttl):
+        dispositivo = contexto.dispositivo_actual
+        descartados = dispositivo.paquetes_descartados
+        if dispositivo.enviar_paquete(ip_origen, ip_destino, mensaje, ttl, contexto.red.tick_actual, tamaño):
             return "Paquete enviado exitosamente"
+        if dispositivo.paquetes_descartados > descartados:
+            razon = contexto.red.verificar_alcance(dispositivo, ip_destino, ttl)
+            return f"Error: Paquete descartado en el origen ({razon})"
         return "Error: No se pudo enviar el paquete"
     
+    def _iniciar_flujo(self, argumentos, contexto):
+        """En modo fluido: send <ip_origen> <ip_destino> <tasa|max> [size <bytes>] [for <ticks>]"""
+        uso = "Error: Uso (modo fluido): send <ip_origen> <ip_destino> <paquetes_por_tick|max> [size <bytes>] [for <ticks>]"
+        if len(argumentos) < 3 or len(argumentos) % 2 == 0:
+            return uso
+        
+        try:
+            demanda = math.inf if argumentos[2].lower() == 'max' else float(argumentos[2])
+            opciones = {argumentos[i].lower(): int(argumentos[i + 1]) for i in range(3, len(argumentos), 2)}
+        except ValueError:
+            return uso
+        if demanda <= 0 or set(opciones) - {'size', 'for'} or any(v <= 0 for v in opciones.values()):
+            return uso
+        
+        flujo = contexto.red.fluido.iniciar(contexto.dispositivo_actual, argumentos[0], argumentos[1], demanda,
+                                            opciones.get('size'), opciones.get('for'))
+        if flujo is None:
+            return f"Error: {argumentos[0]} no es una IP activa de {contexto.nombre_dispositivo}"
+        if flujo.razon:
+            return f"Flujo {flujo.id} creado sin ruta ({flujo.razon})"
+        return f"Flujo {flujo.id} iniciado: {flujo.tasa:.3g} paquetes/tick"
+    
     def obtener_ayuda(self):
-        return "send <ip_origen> <ip_destino> <mensaje> [ttl] - Envía un paquete"
+        return "send <ip_origen> <ip_destino> <mensaje|-> [ttl] [size <bytes>] - Envía un paquete"
+
+class ComandoEcmp(Comando):
+    MODOS = {'flow': 'flujo', 'packet': 'paquete', 'off': 'desactivado'}
+    
+    def ejecutar(self, argumentos, contexto):
+        if contexto.modo_actual != 'configuracion':
+            return "Error: Comando disponible solo en modo configuración"
+        
+        if not argumentos or argumentos[0].lower() not in self.MODOS:
+            return "Error: Uso: ecmp <flow|packet|off> [all]"
+        
+        modo = self.MODOS[argumentos[0].lower()]
+        if len(argumentos) > 1 and argumentos[1].lower() == 'all':
+            for dispositivo in contexto.red.dispositivos.values():
+                dispositivo.establecer_modo_ecmp(modo)
+            return f"ECMP en modo {modo} para todos los dispositivos"
+        
+        contexto.dispositivo_actual.establecer_modo_ecmp(modo)
+        return f"ECMP en modo {modo} para {contexto.nombre_dispositivo}"
+    
+    def obtener_ayuda(self):
+        return "ecmp <flow|packet|off> [all] - Balanceo entre rutas de igual costo"
+
+class ComandoRouting(Comando):
+    PROTOCOLOS = {'static': None, 'rip': 'rip', 'ospf': 'ospf'}
+    
+    def ejecutar(self, argumentos, contexto):
+        if contexto.modo_actual != 'configuracion':
+            return "Error: Comando disponible solo en modo configuración"
+        
+        if not argumentos or argumentos[0].lower() not in self.PROTOCOLOS:
+            return "Error: Uso: routing <static|rip|ospf> [all]"
+        
+        protocolo = self.PROTOCOLOS[argumentos[0].lower()]
+        nombre = protocolo.upper() if protocolo else 'estático'
+        if len(argumentos) > 1 and argumentos[1].lower() == 'all':
+            routers = [d for d in contexto.red.dispositivos.values() if d.tipo.lower() == 'router']
+            for dispositivo in routers:
+                dispositivo.establecer_enrutamiento(protocolo)
+            return f"Enrutamiento {nombre} en {len(routers)} routers"
+        
+        contexto.dispositivo_actual.establecer_enrutamiento(protocolo)
+        return f"Enrutamiento {nombre} en {contexto.nombre_dispositivo}"
+    
+    def obtener_ayuda(self):
+        return "routing <static|rip|ospf> [all] - Protocolo de enrutamiento del dispositivo (all = todos los routers)"
+
+class ComandoHistoryRetention(Comando):
+    def ejecutar(self, argumentos, contexto):
+        if contexto.modo_actual != 'configuracion':
+            return "Error: Comando disponible solo en modo configuración"
+        
+        if not argumentos:
+            return "Error: Uso: history-retention <n|off>"
+        
+        if argumentos[0].lower() == 'off':
+            contexto.dispositivo_actual.establecer_retencion_historial(None)
+            return f"Historial de {contexto.nombre_dispositivo} sin límite"
+        
+        if argumentos[0].isdigit() and contexto.dispositivo_actual.establecer_retencion_historial(int(argumentos[0])):
+            return f"Historial de {contexto.nombre_dispositivo} limitado a {argumentos[0]} paquetes"
+        return "Error: La retención debe ser un entero positivo"
+    
+    def obtener_ayuda(self):
+        return "history-retention <n|off> - Limita el historial de paquetes recibidos"
+
+class ComandoPool(Comando):
+    def ejecutar(self, argumentos, contexto):
+        if not argumentos or argumentos[0].lower() not in ('on', 'off'):
+            return "Error: Uso: pool <on|off>"
+        
+        from estructuras_datos import pool_nodos
+        
+        habilitado = argumentos[0].lower() == 'on'
+        contexto.red.pool_paquetes.establecer_habilitado(habilitado)
+        pool_nodos.establecer_habilitado(habilitado)
+        return f"Reciclaje de paquetes y nodos {'habilitado' if habilitado else 'deshabilitado'}"
+    
+    def obtener_ayuda(self):
+        return "pool <on|off> - Habilita el reciclaje de paquetes y de nodos de las colas"
+
+class ComandoFlowCache(Comando):
+    def ejecutar(self, argumentos, contexto):
+        if len(argumentos) < 2 or not argumentos[1].isdigit():
+            return "Error: Uso: flow-cache <tipo> <tamaño>"
+        
+        afectados = contexto.red.configurar_cache_flujos(argumentos[0], int(argumentos[1]))
+        return f"Caché de flujos de tipo {argumentos[0].lower()}: {argumentos[1]} entradas ({afectados} dispositivos actualizados)"
+    
+    def obtener_ayuda(self):
+        return "flow-cache <tipo> <tamaño> - Tamaño de la caché de flujos por tipo de dispositivo"
+
+class ComandoMetricsServer(Comando):
+    def ejecutar(self, argumentos, contexto):
+        accion = argumentos[0].lower() if argumentos else 'status'
+        red = contexto.red
+        
+        if accion == 'start':
+            if red.exportador:
+                return f"Error: El servidor de métricas ya está activo en el puerto {red.exportador.puerto}"
+            from exportador import ExportadorMetricas
+            puerto = int(argumentos[1]) if len(argumentos) > 1 else 9108
+            exportador = ExportadorMetricas(red, puerto)
+            try:
+                exportador.iniciar()
+            except OSError as e:
+                return f"Error: No se pudo abrir el puerto {puerto}: {e}"
+            red.exportador = exportador
+            return f"Métricas disponibles en http://127.0.0.1:{exportador.puerto}/metrics"
+        
+        if accion == 'stop':
+            if not red.exportador:
+                return "Error: El servidor de métricas no está activo"
+            red.exportador.detener()
+            red.exportador = None
+            return "Servidor de métricas detenido"
+        
+        if accion == 'status':
+            if not red.exportador:
+                return "Servidor de métricas inactivo"
+            return (f"Servidor de métricas activo en http://127.0.0.1:{red.exportador.puerto}/metrics "
+                    f"({red.exportador.publicaciones} instantáneas, {red.exportador.tasa_ticks():.1f} ticks/s)")
+        
+        return "Error: Uso: metrics-server <start [puerto]|stop|status>"
+    
+    def obtener_ayuda(self):
+        return "metrics-server <start [puerto]|stop|status> - Exporta métricas en formato Prometheus"
+
+class ComandoFailures(Comando):
+    def ejecutar(self, argumentos, contexto):
+        from fallas import PlanFallas
+        accion = argumentos[0].lower() if argumentos else ''
+        red = contexto.red
+        
+        if accion == 'load' and len(argumentos) > 1:
+            try:
+                red.plan_fallas = PlanFallas.desde_archivo(red, argumentos[1])
+            except (OSError, ValueError, KeyError) as e:
+                return f"Error: No se pudo cargar el calendario: {e}"
+            return f"Calendario de fallas cargado: {len(red.plan_fallas.eventos)} eventos"
+        
+        if accion == 'random' and len(argumentos) > 2:
+            try:
+                valores = [int(a) for a in argumentos[1:5]]
+            except ValueError:
+                return "Error: Los parámetros deben ser enteros"
+            red.plan_fallas = PlanFallas.aleatorio(red, *valores)
+            eventos = red.plan_fallas.eventos
+            if not eventos:
+                return "Error: No hay enlaces ni dispositivos a los que inyectar fallas"
+            return f"Calendario aleatorio: {len(eventos)} eventos entre los ticks {eventos[0].tick} y {eventos[-1].tick}"
+        
+        if accion == 'save' and len(argumentos) > 1:
+            if not red.plan_fallas:
+                return "Error: No hay un calendario de fallas"
+            try:
+                red.plan_fallas.guardar(argumentos[1])
+            except OSError as e:
+                return f"Error: No se pudo guardar el calendario: {e}"
+            return f"Calendario de fallas guardado en {argumentos[1]}"
+        
+        if accion == 'clear':
+            red.plan_fallas = None
+            return "Calendario de fallas eliminado"
+        
+        return "Error: Uso: failures <load <archivo>|random <semilla> <cantidad> [horizonte] [duracion]|save <archivo>|clear>"
+    
+    def obtener_ayuda(self):
+        return "failures <load|random|save|clear> - Calendario de caídas de enlaces y dispositivos"
+
+class ComandoSeed(Comando):
+    def ejecutar(self, argumentos, contexto):
+        if not argumentos:
+            return "Error: Uso: seed <n|off>"
+        
+        if argumentos[0].lower() == 'off':
+            contexto.red.sembrar(None)
+            return "Modo determinista desactivado"
+        if not argumentos[0].isdigit():
+            return "Error: La semilla debe ser un entero no negativo"
+        contexto.red.sembrar(int(argumentos[0]))
+        return f"Modo determinista con semilla {argumentos[0]}"
+    
+    def obtener_ayuda(self):
+        return "seed <n|off> - Identificadores y pérdidas reproducibles"
+
+class ComandoFluid(Comando):
+    def ejecutar(self, argumentos, contexto):
+        fluido = contexto.red.fluido
+        accion = argumentos[0].lower() if argumentos else ''
+        if accion in ('on', 'off'):
+            fluido.establecer_activo(accion == 'on')
+            if fluido.activo:
+                return "Modo fluido: 'send' inicia flujos a tasa constante"
+            return "Modo por paquetes (flujos detenidos)"
+        
+        if accion == 'stop' and len(argumentos) > 1:
+            if argumentos[1].lower() == 'all':
+                return f"{fluido.detener_todos()} flujos detenidos"
+            if argumentos[1].isdigit() and fluido.detener(int(argumentos[1])):
+                return f"Flujo {argumentos[1]} detenido"
+            return f"Error: Flujo {argumentos[1]} no encontrado"
+        return "Error: Uso: fluid <on|off|stop <id|all>>"
+    
+    def obtener_ayuda(self):
+        return "fluid <on|off|stop <id|all>> - Modo de simulación por flujos"
+
+class ComandoFork(Comando):
+    def ejecutar(self, argumentos, contexto):
+        if not argumentos:
+            return "Error: Uso: fork <nombre>"
+        
+        bifurcaciones = contexto.red.bifurcaciones
+        padre = bifurcaciones.actual.nombre
+        if not bifurcaciones.bifurcar(argumentos[0]):
+            return f"Error: La bifurcación {argumentos[0]} ya existe"
+        return f"Bifurcación {argumentos[0]} creada desde {padre} (activa)"
+    
+    def obtener_ayuda(self):
+        return "fork <nombre> - Crea una variante de la topología y pasa a ella"
+
+class ComandoSwitch(Comando):
+    def ejecutar(self, argumentos, contexto):
+        if not argumentos:
+            return "Error: Uso: switch <nombre>"
+        
+        resultado = contexto.red.bifurcaciones.cambiar(argumentos[0])
+        if resultado is None:
+            return f"Error: La bifurcación {argumentos[0]} no existe"
+        deshechos, rehechos = resultado
+        return f"Variante activa: {argumentos[0]} ({deshechos} cambios deshechos, {rehechos} aplicados)"
+    
+    def obtener_ayuda(self):
+        return "switch <nombre> - Pasa a otra variante de la topología"
+
+class ComandoDiscard(Comando):
+    def ejecutar(self, argumentos, contexto):
+        if not argumentos:
+            return "Error: Uso: discard <nombre>"
+        
+        error = contexto.red.bifurcaciones.descartar(argumentos[0])
+        if error:
+            return f"Error: No se puede descartar {argumentos[0]}: {error}"
+        return f"Bifurcación {argumentos[0]} descartada"
+    
+    def obtener_ayuda(self):
+        return "discard <nombre> - Elimina una variante de la topología"
+
+class ComandoVsim(Comando):
+    def ejecutar(self, argumentos, contexto):
+        if len(argumentos) < 3:
+            return "Error: Uso: vsim <ip_origen> <ip_destino> <cantidad> [ttl] [max_ticks]"
+        
+        try:
+            from motor_vectorizado import MotorVectorizado
+            motor = MotorVectorizado(contexto.red)
+        except ImportError as e:
+            return f"Error: {e}"
+        
+        cantidad = int(argumentos[2])
+        ttl = int(argumentos[3]) if len(argumentos) > 3 else 64
+        max_ticks = int(argumentos[4]) if len(argumentos) > 4 else ttl + 1
+        
+        if not motor.inyectar(argumentos[0], argumentos[1], cantidad, ttl):
+            return f"Error: IP de origen {argumentos[0]} no encontrada"
+        
+        stats = motor.simular(max_ticks)
+        resultado = [f"Simulación vectorizada: {cantidad} paquetes en {motor.tick_actual} ticks"]
+        resultado.extend(contexto.gestor_estadisticas.formatear_estadisticas_globales(stats))
+        resultado.append(f"En tránsito al finalizar: {motor.en_transito()}")
+        resultado.append(f"Digest: {motor.resumen.obtener_resumen()['digest']}")
+        return "\n".join(resultado)
+    
+    def obtener_ayuda(self):
+        return "vsim <ip_origen> <ip_destino> <cantidad> [ttl] [max_ticks] - Simulación masiva con el motor vectorizado"
 
 class ComandoTick(Comando):
     def ejecutar(self, argumentos, contexto):
@@ -200,6 +589,93 @@ class ComandoTick(Comando):
     def obtener_ayuda(self):
         return "tick / process - Procesa un paso de simulación"
 
+class ComandoStart(Comando):
+    def ejecutar(self, argumentos, contexto):
+        red = contexto.red
+        if red.bucle and red.bucle.activo():
+            return "Error: La simulación ya está en curso (use 'stop')"
+        
+        tasa = None
+        if argumentos:
+            try:
+                tasa = float(argumentos[0])
+            except ValueError:
+                return "Error: Uso: start [ticks_por_segundo]"
+            if tasa <= 0:
+                return "Error: La tasa debe ser positiva"
+        
+        from bucle import BucleSimulacion
+        red.bucle = BucleSimulacion(red, tasa)
+        red.bucle.iniciar()
+        return f"Simulación iniciada ({f'{tasa:g} ticks/s' if tasa else 'sin límite de tasa'})"
+    
+    def obtener_ayuda(self):
+        return "start [ticks_por_segundo] - Avanza la simulación en segundo plano"
+
+class ComandoStop(Comando):
+    def ejecutar(self, argumentos, contexto):
+        red = contexto.red
+        if not red.bucle:
+            return "Error: No hay una simulación en curso"
+        
+        red.bucle.detener()
+        estado = red.bucle.obtener_estado()
+        red.bucle = None
+        return contexto.gestor_estadisticas.formatear_estado_bucle(estado)
+    
+    def obtener_ayuda(self):
+        return "stop - Detiene la simulación en segundo plano"
+
+class ComandoWatch(Comando):
+    OPCIONES = ('device', 'dst', 'type', 'rate', 'for')
+    
+    def ejecutar(self, argumentos, contexto):
+        from eventos import Suscripcion, TIPOS_EVENTO
+        import time
+        
+        if len(argumentos) % 2:
+            return "Error: Uso: watch [device <d>] [dst <ip>] [type <tipo>] [rate <lineas/s>] [for <segundos>]"
+        opciones = dict(zip(argumentos[::2], argumentos[1::2]))
+        for opcion in opciones:
+            if opcion not in self.OPCIONES:
+                return f"Error: Opción desconocida '{opcion}'"
+        if 'type' in opciones and opciones['type'] not in TIPOS_EVENTO:
+            return f"Error: Tipo de evento inválido (use: {', '.join(TIPOS_EVENTO)})"
+        
+        try:
+            limite = int(opciones.get('rate', 20))
+            duracion = float(opciones['for']) if 'for' in opciones else None
+        except ValueError:
+            return "Error: 'rate' y 'for' deben ser numéricos"
+        if limite < 1:
+            return "Error: 'rate' debe ser de al menos 1 línea por segundo"
+        
+        red = contexto.red
+        suscripcion = red.eventos.suscribir(Suscripcion(opciones.get('device'), opciones.get('dst'),
+                                                        opciones.get('type'), limite))
+        if not (red.bucle and red.bucle.activo()):
+            contexto.escribir("Aviso: la simulación no está en curso (use 'start' para verla avanzar)")
+        contexto.escribir("Observando eventos (Ctrl+C para terminar)...")
+        
+        inicio = time.monotonic()
+        try:
+            while duracion is None or time.monotonic() - inicio < duracion:
+                time.sleep(0.1)
+                for linea in suscripcion.leer():
+                    contexto.escribir(linea)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            red.eventos.desuscribir(suscripcion)
+        for linea in suscripcion.leer(final=True):
+            contexto.escribir(linea)
+        
+        return (f"Fin de la observación: {suscripcion.mostrados} mostrados, "
+                f"{suscripcion.suprimidos} suprimidos, {suscripcion.perdidos} perdidos")
+    
+    def obtener_ayuda(self):
+        return "watch [device <d>] [dst <ip>] [type <tipo>] [rate <n>] [for <s>] - Sigue los eventos en vivo"
+
 class ContextoCLI:
     """Contexto que mantiene el estado actual del CLI"""
     
@@ -218,6 +694,10 @@ class ContextoCLI:
         
         self.dispositivo_actual = self.red.obtener_dispositivo(self.nombre_dispositivo)
     
+    def escribir(self, linea):
+        """Muestra una línea de inmediato (comandos que producen salida continua)"""
+        print(linea, flush=True)
+    
     def cambiar_modo(self, nuevo_modo):
         """Cambia el modo actual del CLI"""
         self.modo_actual = nuevo_modo
@@ -239,9 +719,12 @@ class ContextoCLI:
 class ParserCLI:
     """Parser principal del CLI que maneja todos los comandos"""
     
+    COMANDOS_SIN_CERROJO = ('stop', 'watch', 'source')
+    
     def __init__(self, red, gestor_estadisticas, gestor_persistencia):
         self.contexto = ContextoCLI(red, gestor_estadisticas, gestor_persistencia)
         self.comandos = self._inicializar_comandos()
+        self.ejecutor_script = None  # Se crea con el primer 'source'
     
     def _inicializar_comandos(self):
         """Inicializa el diccionario de comandos disponibles"""
@@ -254,17 +737,46 @@ class ParserCLI:
             'ip': ComandoIpAddress(),
             'shutdown': ComandoShutdown(),
             'no': ComandoShutdown(),  # Para "no shutdown"
+            'service-rate': ComandoServiceRate(),
+            'queue-type': ComandoQueueType(),
             'exit': ComandoExit(),
             'end': ComandoEnd(),
             'connect': ComandoConnect(),
             'disconnect': ComandoDisconnect(),
             'send': ComandoSend(),
+            'ecmp': ComandoEcmp(),
+            'routing': ComandoRouting(),
+            'history-retention': ComandoHistoryRetention(),
+            'pool': ComandoPool(),
+            'flow-cache': ComandoFlowCache(),
+            'metrics-server': ComandoMetricsServer(),
+            'seed': ComandoSeed(),
+            'fluid': ComandoFluid(),
+            'failures': ComandoFailures(),
+            'fork': ComandoFork(),
+            'switch': ComandoSwitch(),
+            'discard': ComandoDiscard(),
+            'vsim': ComandoVsim(),
             'tick': ComandoTick(),
+            'start': ComandoStart(),
+            'stop': ComandoStop(),
+            'watch': ComandoWatch(),
             'process': ComandoTick(),  # Alias para tick
         }
     
     def procesar_comando(self, linea_comando):
-        """Procesa una línea de comando completa"""
+        """Procesa una línea de comando completa. Con la simulación en segundo
+        plano, el comando se ejecuta entre dos ticks (salvo 'stop' y 'watch',
+        que deben dejar avanzar al hilo de simulación, y 'source', cuyas
+        líneas toman el cerrojo una por una)"""
+        partes = linea_comando.split()
+        if partes and partes[0].lower() in self.COMANDOS_SIN_CERROJO:
+            return self._procesar_comando(linea_comando)
+        with self.contexto.red.cerrojo:
+            return self._procesar_comando(linea_comando)
+    
+    def _procesar_comando(self, linea_comando):
+        """Interpreta y ejecuta una línea de comando"""
         if not linea_comando.strip():
             return ""
         
@@ -280,12 +792,18 @@ class ParserCLI:
             return self._manejar_save(argumentos)
         elif comando_principal == 'load':
             return self._manejar_load(argumentos)
+        elif comando_principal == 'clear':
+            return self._manejar_clear(argumentos)
+        elif comando_principal == 'audit':
+            return self._manejar_audit(argumentos)
         elif comando_principal == 'list_devices':
             return self._manejar_list_devices()
         elif comando_principal == 'set_device_status':
             return self._manejar_set_device_status(argumentos)
         elif comando_principal == 'console':
             return self._manejar_console(argumentos)
+        elif comando_principal == 'source':
+            return self._manejar_source(argumentos)
         elif comando_principal == 'help':
             return self._mostrar_ayuda()
         elif comando_principal == 'quit' or comando_principal == 'exit':
@@ -319,13 +837,12 @@ class ParserCLI:
     def _manejar_show(self, argumentos):
         """Maneja los comandos show"""
         if not argumentos:
-            return "Error: Especifique qué mostrar (history, queue, interfaces, statistics)"
+            return "Error: Especifique qué mostrar (history, queue, interfaces, statistics, arp, links, pool, reachable, perf, topology, simulation, forks, digest, failures, routes, memory, flows)"
         
         subcomando = argumentos[0].lower()
         
         if subcomando == 'history':
-            dispositivo = argumentos[1] if len(argumentos) > 1 else self.contexto.nombre_dispositivo
-            return self.contexto.gestor_estadisticas.mostrar_historial_dispositivo(dispositivo)
+            return self._mostrar_historial(argumentos[1:])
         
         elif subcomando == 'queue':
             dispositivo = argumentos[1] if len(argumentos) > 1 else self.contexto.nombre_dispositivo
@@ -338,9 +855,81 @@ class ParserCLI:
         elif subcomando == 'statistics':
             return self.contexto.gestor_estadisticas.mostrar_estadisticas_globales()
         
+        elif subcomando == 'reachable':
+            dispositivo = argumentos[1] if len(argumentos) > 1 else self.contexto.nombre_dispositivo
+            return self.contexto.gestor_estadisticas.mostrar_alcanzables(dispositivo)
+        
+        elif subcomando == 'topology':
+            return self.contexto.gestor_estadisticas.generar_reporte_topologia()
+        
+        elif subcomando == 'simulation':
+            if not self.contexto.red.bucle:
+                return "No hay una simulación en segundo plano"
+            return self.contexto.gestor_estadisticas.formatear_estado_bucle(self.contexto.red.bucle.obtener_estado())
+        
+        elif subcomando == 'routes':
+            dispositivo = argumentos[1] if len(argumentos) > 1 else self.contexto.nombre_dispositivo
+            return self.contexto.gestor_estadisticas.mostrar_rutas_dispositivo(dispositivo)
+        
+        elif subcomando == 'failures':
+            return self.contexto.gestor_estadisticas.mostrar_fallas()
+        
+        elif subcomando == 'digest':
+            return self.contexto.gestor_estadisticas.mostrar_resumen_ejecucion()
+        
+        elif subcomando == 'forks':
+            return self.contexto.gestor_estadisticas.mostrar_bifurcaciones()
+        
+        elif subcomando == 'perf':
+            dispositivo = argumentos[1] if len(argumentos) > 1 else None
+            return self.contexto.gestor_estadisticas.mostrar_rendimiento(dispositivo)
+        
+        elif subcomando == 'pool':
+            return self.contexto.gestor_estadisticas.mostrar_pools()
+        
+        elif subcomando == 'flows':
+            return self.contexto.gestor_estadisticas.mostrar_flujos()
+        
+        elif subcomando == 'memory':
+            if len(argumentos) > 1 and (not argumentos[1].isdigit() or int(argumentos[1]) < 1):
+                return "Error: Uso: show memory [muestra]"
+            muestra = int(argumentos[1]) if len(argumentos) > 1 else None
+            return self.contexto.gestor_estadisticas.mostrar_memoria(muestra)
+        
+        elif subcomando == 'links':
+            return self.contexto.gestor_estadisticas.mostrar_enlaces()
+        
+        elif subcomando == 'arp':
+            dispositivo = argumentos[1] if len(argumentos) > 1 else self.contexto.nombre_dispositivo
+            return self.contexto.gestor_estadisticas.mostrar_arp_dispositivo(dispositivo)
+        
         else:
             return f"Subcomando show no reconocido: {subcomando}"
     
+    def _mostrar_historial(self, argumentos):
+        """show history [dispositivo] [from <ip>] [content <texto>] [since <tick>] [last <n>]"""
+        uso = "Error: Uso: show history [dispositivo] [from <ip>] [content <texto>] [since <tick>] [last <n>]"
+        filtros = {'from': None, 'content': None, 'since': None, 'last': None}
+        dispositivo = self.contexto.nombre_dispositivo
+        if argumentos and argumentos[0].lower() not in filtros:
+            dispositivo = argumentos[0]
+            argumentos = argumentos[1:]
+        
+        if len(argumentos) % 2:
+            return uso
+        for clave, valor in zip(argumentos[::2], argumentos[1::2]):
+            clave = clave.lower()
+            if clave not in filtros:
+                return uso
+            if clave in ('since', 'last'):
+                if not valor.isdigit() or (clave == 'last' and int(valor) == 0):
+                    return uso
+                valor = int(valor)
+            filtros[clave] = valor
+        
+        return self.contexto.gestor_estadisticas.mostrar_historial_dispositivo(
+            dispositivo, filtros['from'], filtros['content'], filtros['since'], filtros['last'])
+    
     def _manejar_save(self, argumentos):
         """Maneja el comando save"""
         if argumentos and argumentos[0] == 'running-config':
@@ -354,6 +943,30 @@ class ParserCLI:
             return self.contexto.gestor_persistencia.cargar_configuracion(argumentos[1])
         return "Error: Uso: load config <archivo>"
     
+    def _manejar_clear(self, argumentos):
+        """Maneja el comando clear"""
+        if not argumentos or argumentos[0].lower() != 'arp':
+            return "Error: Uso: clear arp [dispositivo]"
+        
+        nombre_dispositivo = argumentos[1] if len(argumentos) > 1 else self.contexto.nombre_dispositivo
+        dispositivo = self.contexto.red.obtener_dispositivo(nombre_dispositivo)
+        if not dispositivo:
+            return f"Error: Dispositivo {nombre_dispositivo} no encontrado"
+        
+        dispositivo.cache_arp.limpiar()
+        dispositivo.cache_flujos.limpiar()
+        return f"Caché ARP de {nombre_dispositivo} vaciada"
+    
+    def _manejar_audit(self, argumentos):
+        """Maneja el comando audit (revisión completa de la topología)"""
+        if not argumentos or argumentos[0].lower() != 'topology':
+            return "Error: Uso: audit topology"
+        
+        errores = self.contexto.red.auditar_topologia()
+        if errores:
+            return "Auditoría completa - errores de topología:\n" + "\n".join(f"  - {error}" for error in errores)
+        return "Auditoría completa - topología válida"
+    
     def _manejar_list_devices(self):
         """Maneja el comando list_devices"""
         dispositivos = self.contexto.red.obtener_lista_dispositivos()
@@ -390,6 +1003,25 @@ class ParserCLI:
             return f"Conectado a {nombre_dispositivo}"
         return f"Error: Dispositivo {nombre_dispositivo} no encontrado"
     
+    def _manejar_source(self, argumentos):
+        """Maneja el comando source: ejecuta un archivo de comandos sin eco"""
+        from lotes import EjecutorScript, formatear_resumen
+        
+        if not argumentos or len(argumentos) > 2 or (len(argumentos) == 2 and argumentos[1] != 'continue'):
+            return "Error: Uso: source <archivo> [continue]"
+        if self.ejecutor_script is None:
+            self.ejecutor_script = EjecutorScript(self)
+        
+        resumen = self.ejecutor_script.ejecutar(argumentos[0], detener_en_error=len(argumentos) == 1)
+        texto = formatear_resumen(resumen)
+        if resumen['errores']:
+            texto = f"Error en el script:\n{texto}"
+        if resumen['salida']:
+            # 'quit' en el script sale del simulador, como si se hubiera escrito a mano
+            self.contexto.escribir(texto)
+            return "QUIT"
+        return texto
+    
     def _mostrar_ayuda(self):
         """Muestra la ayuda de comandos disponibles"""
         ayuda = ["\n=== COMANDOS DISPONIBLES ==="]
@@ -410,31 +1042,68 @@ class ParserCLI:
         ayuda.append("  interface <nombre> - Configura una interfaz")
         ayuda.append("  ip address <ip> - Asigna IP a la interfaz")
         ayuda.append("  shutdown / no shutdown - Desactiva/activa interfaz")
+        ayuda.append("  service-rate <n> [packets|bytes] - Capacidad de servicio por tick de la interfaz")
+        ayuda.append("  queue-type <linked|ring> - Implementación de las colas de la interfaz")
+        ayuda.append("  history-retention <n|off> - Limita el historial de recibidos")
+        ayuda.append("  ecmp <flow|packet|off> [all] - Balanceo por flujo, por paquete o desactivado")
+        ayuda.append("  routing <static|rip|ospf> [all] - Enrutamiento estático o dinámico (all = todos los routers)")
         
         # Comandos de red
         ayuda.append("\nComandos de red:")
-        ayuda.append("  connect <int1> <disp2> <int2> - Conecta interfaces")
+        ayuda.append("  connect <int1> <disp2> <int2> [bandwidth <n>|bytes <n>] [delay <t>] [loss <p>] - Conecta interfaces")
         ayuda.append("  disconnect <int1> <disp2> <int2> - Desconecta interfaces")
         ayuda.append("  list_devices - Lista todos los dispositivos")
         ayuda.append("  set_device_status <disp> <online|offline> - Cambia estado")
         ayuda.append("  console <dispositivo> - Cambia a otro dispositivo")
+        ayuda.append("  fork <nombre> - Crea una variante de la topología y pasa a ella")
+        ayuda.append("  switch <nombre> - Pasa a otra variante (main es la original)")
+        ayuda.append("  discard <nombre> - Elimina una variante")
         
         # Comandos de comunicación
         ayuda.append("\nComandos de comunicación:")
-        ayuda.append("  send <origen> <destino> <mensaje> [ttl] - Envía paquete")
+        ayuda.append("  send <origen> <destino> <mensaje|-> [ttl] [size <bytes>] - Envía paquete")
         ayuda.append("  tick / process - Procesa un paso de simulación")
+        ayuda.append("  start [ticks_por_segundo] - Avanza la simulación en segundo plano")
+        ayuda.append("  stop - Detiene la simulación en segundo plano")
+        ayuda.append("  watch [device <d>] [dst <ip>] [type <tipo>] [rate <n>] [for <s>] - Sigue los eventos en vivo")
+        ayuda.append("  failures load <archivo> - Carga un calendario de fallas (JSON)")
+        ayuda.append("  failures random <semilla> <cantidad> [horizonte] [duracion] - Genera caídas al azar")
+        ayuda.append("  failures save <archivo> | clear - Guarda o elimina el calendario")
+        ayuda.append("  seed <n|off> - Identificadores y pérdidas reproducibles")
+        ayuda.append("  fluid <on|off> - Modo fluido: send <origen> <destino> <tasa|max> [size <bytes>] [for <ticks>] inicia un flujo")
+        ayuda.append("  fluid stop <id|all> - Detiene flujos del modo fluido")
+        ayuda.append("  pool <on|off> - Habilita el reciclaje de paquetes y de nodos de las colas")
+        ayuda.append("  flow-cache <tipo> <tamaño> - Tamaño de la caché de flujos por tipo de dispositivo")
+        ayuda.append("  metrics-server <start [puerto]|stop|status> - Exporta métricas en formato Prometheus")
+        ayuda.append("  vsim <origen> <destino> <cantidad> [ttl] [ticks] - Simulación vectorizada (requiere NumPy)")
         
         # Comandos de información
         ayuda.append("\nComandos de información:")
-        ayuda.append("  show history [dispositivo] - Muestra historial")
+        ayuda.append("  show history [dispositivo] [from <ip>] [content <texto>] [since <tick>] [last <n>] - Muestra historial")
         ayuda.append("  show queue [dispositivo] - Muestra colas")
         ayuda.append("  show interfaces [dispositivo] - Muestra interfaces")
         ayuda.append("  show statistics - Muestra estadísticas globales")
+        ayuda.append("  show links - Muestra enlaces y su utilización")
+        ayuda.append("  show pool - Muestra los pools de reciclaje")
+        ayuda.append("  show flows - Tasa, cuello de botella y volumen de cada flujo (modo fluido)")
+        ayuda.append("  show memory [muestra] - Bytes por interfaz y dispositivo (tracemalloc)")
+        ayuda.append("  show reachable [dispositivo] - Dispositivos alcanzables")
+        ayuda.append("  show perf [dispositivo] - Aciertos y fallos de las cachés de reenvío")
+        ayuda.append("  show topology - Dispositivos, conexiones y errores de topología")
+        ayuda.append("  show simulation - Tasa lograda y deriva de la simulación en segundo plano")
+        ayuda.append("  show failures - Paquetes perdidos y ticks de recuperación por evento de falla")
+        ayuda.append("  show digest - Huella de las entregas y descartes de la corrida")
+        ayuda.append("  show forks - Variantes de la topología y cuál está activa")
+        ayuda.append("  audit topology - Revisa toda la topología desde cero")
+        ayuda.append("  show arp [dispositivo] - Muestra la caché ARP")
+        ayuda.append("  show routes [dispositivo] - Tabla del protocolo de enrutamiento dinámico")
+        ayuda.append("  clear arp [dispositivo] - Vacía la caché ARP")
         
         # Comandos de persistencia
         ayuda.append("\nComandos de persistencia:")
         ayuda.append("  save running-config [archivo] - Guarda configuración")
         ayuda.append("  load config <archivo> - Carga configuración")
+        ayuda.append("  source <archivo> [continue] - Ejecuta un script de comandos (continue = no parar en errores)")
         
         return "\n".join(ayuda)
     
@@ -0,0 +1,75 @@
+# Módulo 13: Componentes conexas
+# Conectividad incremental con union-find y reconstrucción tras cortes
+
+class ComponentesConexas:
+    """Mantiene qué dispositivos pueden comunicarse entre sí.
+    
+    Agregar enlaces solo une conjuntos (union-find con compresión de caminos);
+    un corte (desconexión, interfaz o dispositivo caído) puede separar un
+    componente, así que marca la estructura para reconstruirla en la próxima consulta"""
+    
+    def __init__(self, red):
+        self.red = red
+        self.padre = {}  # Dispositivo -> padre en el bosque
+        self.rango = {}
+        self.vigente = False  # La primera consulta construye desde cero
+        self.reconstrucciones = 0
+    
+    def invalidar(self):
+        """Registra un corte: la próxima consulta reconstruye los componentes"""
+        self.vigente = False
+    
+    def encontrar(self, dispositivo):
+        """Representante del componente de un dispositivo (con división de caminos)"""
+        padre = self.padre
+        if dispositivo not in padre:
+            padre[dispositivo] = dispositivo
+            self.rango[dispositivo] = 0
+            return dispositivo
+        while padre[dispositivo] is not dispositivo:
+            padre[dispositivo] = padre[padre[dispositivo]]
+            dispositivo = padre[dispositivo]
+        return dispositivo
+    
+    def unir(self, a, b):
+        """Une los componentes de dos dispositivos por rango"""
+        raiz_a = self.encontrar(a)
+        raiz_b = self.encontrar(b)
+        if raiz_a is raiz_b:
+            return
+        if self.rango[raiz_a] < self.rango[raiz_b]:
+            raiz_a, raiz_b = raiz_b, raiz_a
+        self.padre[raiz_b] = raiz_a
+        if self.rango[raiz_a] == self.rango[raiz_b]:
+            self.rango[raiz_a] += 1
+    
+    def unir_enlaces(self, dispositivo):
+        """Une un dispositivo con sus vecinos por los enlaces utilizables"""
+        if not self.vigente or not dispositivo.en_linea:
+            return
+        for interfaz, vecino in dispositivo._enlaces_activos():
+            if vecino.activa and vecino.dispositivo_padre.en_linea:
+                self.unir(dispositivo, vecino.dispositivo_padre)
+    
+    def reconstruir(self):
+        """Recalcula todos los componentes desde la topología actual"""
+        self.padre = {}
+        self.rango = {}
+        self.vigente = True
+        self.reconstrucciones += 1
+        for dispositivo in self.red.dispositivos.values():
+            self.encontrar(dispositivo)
+        for dispositivo in self.red.dispositivos.values():
+            self.unir_enlaces(dispositivo)
+    
+    def conectados(self, a, b):
+        """Indica si dos dispositivos están en el mismo componente"""
+        if not self.vigente:
+            self.reconstruir()
+        return self.encontrar(a) is self.encontrar(b)
+    
+    def contar(self):
+        """Cantidad de componentes"""
+        if not self.vigente:
+            self.reconstruir()
+        return len({self.encontrar(d) for d in self.red.dispositivos.values()})
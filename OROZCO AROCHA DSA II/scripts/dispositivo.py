@@ -1,28 +1,101 @@
 # Módulo 1: Dispositivos y Red - Clases Device e Interface
 # Representa los dispositivos de red y sus interfaces
 
-from estructuras_datos import ListaEnlazada, Cola, Pila
+from estructuras_datos import ListaEnlazada, TIPOS_COLA, VACIA
+from arp import CacheARP
+from cache_flujos import CacheFlujos
+from eventos import Evento
+from enrutamiento import CONECTADO
+from historial import IndiceHistorial
+from functools import partial
 import re
+import sys
+import zlib
+from types import MappingProxyType
+
+SIN_ENLACES = MappingProxyType({})  # Vista vacía compartida por las interfaces sin enlaces
+
+def _mezclar32(valor):
+    """Finalizador de MurmurHash3. CRC32 es lineal: sin esta mezcla, dos
+    dispositivos con distinto nombre harían elecciones correlacionadas"""
+    valor ^= valor >> 16
+    valor = (valor * 0x85EBCA6B) & 0xFFFFFFFF
+    valor ^= valor >> 13
+    valor = (valor * 0xC2B2AE35) & 0xFFFFFFFF
+    return valor ^ (valor >> 16)
 
 class Interfaz:
-    """Representa una interfaz de red de un dispositivo"""
+    """Representa una interfaz de red de un dispositivo.
     
-    def __init__(self, nombre, dispositivo_padre):
-        self.nombre = nombre
+    Las colas, la lista de vecinos y el diccionario de enlaces se crean con
+    el primer paquete o la primera conexión; hasta entonces se leen como
+    estructuras vacías compartidas"""
+    
+    UNIDADES_SERVICIO = ('paquetes', 'bytes')
+    
+    __slots__ = ('nombre', 'dispositivo_padre', 'direccion_ip', 'activa', 'tipo_cola',
+                 '_vecinos', '_cola_entrada', '_cola_salida', '_enlaces',
+                 'paquetes_transmitidos', 'paquetes_recibidos', 'tasa_servicio', 'unidad_servicio',
+                 '_tick_cupos', '_cupo_entrada', '_cupo_salida')
+    
+    def __init__(self, nombre, dispositivo_padre, tipo_cola='enlazada'):
+        self.nombre = sys.intern(nombre)  # Nombres como g0/0 se repiten en cada dispositivo
         self.dispositivo_padre = dispositivo_padre
         self.direccion_ip = None
         self.activa = False  # Estado shutdown por defecto
-        self.vecinos = ListaEnlazada()  # Interfaces conectadas
-        self.cola_entrada = Cola()  # Paquetes entrantes
-        self.cola_salida = Cola()   # Paquetes salientes
+        self._vecinos = None  # Interfaces conectadas
+        self.tipo_cola = tipo_cola  # 'enlazada' (nodos) o 'circular' (arreglo)
+        self._cola_entrada = None  # Paquetes entrantes
+        self._cola_salida = None   # Paquetes salientes
+        self._enlaces = None  # Interfaz vecina -> Enlace que las une
+        self.paquetes_transmitidos = 0  # Contadores de utilización del enlace
+        self.paquetes_recibidos = 0
+        self.tasa_servicio = 2  # Paquetes (o bytes) atendidos por cola en cada tick
+        self.unidad_servicio = 'paquetes'
+        self._tick_cupos = None
+        self._cupo_entrada = 0
+        self._cupo_salida = 0
+    
+    @property
+    def vecinos(self):
+        """Interfaces conectadas"""
+        return self._vecinos if self._vecinos is not None else VACIA
+    
+    @property
+    def cola_entrada(self):
+        """Paquetes entrantes"""
+        return self._cola_entrada if self._cola_entrada is not None else VACIA
+    
+    @property
+    def cola_salida(self):
+        """Paquetes salientes"""
+        return self._cola_salida if self._cola_salida is not None else VACIA
+    
+    @property
+    def enlaces(self):
+        """Interfaz vecina -> Enlace que las une. Es el diccionario interno (sin
+        copia, se lee en cada envío): solo lo modifican conectar_vecino y
+        desconectar_vecino. Sin enlaces es una vista vacía de solo lectura"""
+        return self._enlaces if self._enlaces is not None else SIN_ENLACES
     
     def asignar_ip(self, ip):
         """Asigna dirección IP a la interfaz con validación"""
         if self._validar_ip(ip):
-            self.direccion_ip = ip
+            self.dispositivo_padre.registrar_cambio(partial(self._establecer_ip, ip),
+                                                    partial(self._establecer_ip, self.direccion_ip))
+            self._establecer_ip(ip)
             return True
         return False
     
+    def _establecer_ip(self, ip):
+        """Aplica una IP ya validada (o None) y avisa a la red"""
+        anterior = self.direccion_ip
+        self.direccion_ip = ip
+        validador = self._validador()
+        if validador:
+            validador.direccion_cambiada(self, anterior)
+        self.dispositivo_padre.notificar_cambio_topologia(direcciones=True)
+    
     def _validar_ip(self, ip):
         """Valida formato de dirección IP"""
         patron = r'^(\d{1,3}\.){3}\d{1,3}$'
@@ -37,89 +110,238 @@ class Interfaz:
     
     def activar(self):
         """Activa la interfaz (no shutdown)"""
+        if not self.activa:
+            self.dispositivo_padre.registrar_cambio(self.activar, self.desactivar)
         self.activa = True
+        self.dispositivo_padre.notificar_cambio_topologia()
     
     def desactivar(self):
         """Desactiva la interfaz (shutdown)"""
+        if self.activa:
+            self.dispositivo_padre.registrar_cambio(self.desactivar, self.activar)
         self.activa = False
+        self.dispositivo_padre.cache_arp.invalidar_interfaz(self)
+        self.dispositivo_padre.notificar_cambio_topologia(corte=True)
     
-    def conectar_vecino(self, interfaz_vecina):
+    def conectar_vecino(self, interfaz_vecina, enlace=None):
         """Conecta esta interfaz con otra"""
-        if not self.vecinos.buscar(interfaz_vecina):
-            self.vecinos.agregar(interfaz_vecina)
+        if self._vecinos is None:
+            self._vecinos = ListaEnlazada()
+        if not self._vecinos.buscar(interfaz_vecina):
+            self._vecinos.agregar(interfaz_vecina)
+        if enlace:
+            if self._enlaces is None:
+                self._enlaces = {}
+            self._enlaces[interfaz_vecina] = enlace
+        validador = self._validador()
+        if validador:
+            validador.enlace_conectado(self, interfaz_vecina)
+        self.dispositivo_padre.notificar_cambio_topologia()
     
     def desconectar_vecino(self, interfaz_vecina):
-        """Desconecta esta interfaz de otra"""
-        self.vecinos.eliminar(interfaz_vecina)
+        """Desconecta esta interfaz de otra (y suelta las estructuras que quedan vacías)"""
+        if self._vecinos is not None:
+            self._vecinos.eliminar(interfaz_vecina)
+            if self._vecinos.esta_vacia():
+                self._vecinos = None
+        if self._enlaces is not None:
+            self._enlaces.pop(interfaz_vecina, None)
+            if not self._enlaces:
+                self._enlaces = None
+        self.dispositivo_padre.cache_arp.invalidar_interfaz(self)
+        validador = self._validador()
+        if validador:
+            validador.enlace_desconectado(self, interfaz_vecina)
+        self.dispositivo_padre.notificar_cambio_topologia(corte=True)
+    
+    def _validador(self):
+        """Validador incremental de la red del dispositivo, si pertenece a una"""
+        red = self.dispositivo_padre.red
+        return red.validador if red is not None else None
     
     def obtener_vecinos(self):
         """Retorna lista de interfaces vecinas"""
-        return self.vecinos.obtener_lista()
+        return self._vecinos.obtener_lista() if self._vecinos is not None else []
     
     def recibir_paquete(self, paquete):
         """Recibe un paquete en la cola de entrada"""
         if self.activa:
-            self.cola_entrada.encolar(paquete)
+            if self._cola_entrada is None:
+                self._cola_entrada = TIPOS_COLA[self.tipo_cola]()
+            self._cola_entrada.encolar(paquete)
+            self.paquetes_recibidos += 1
             return True
         return False
     
     def enviar_paquete(self, paquete):
         """Envía un paquete a la cola de salida"""
         if self.activa:
-            self.cola_salida.encolar(paquete)
+            if self._cola_salida is None:
+                self._cola_salida = TIPOS_COLA[self.tipo_cola]()
+            self._cola_salida.encolar(paquete)
             return True
         return False
     
     def procesar_cola_salida(self):
         """Procesa un paquete de la cola de salida"""
         if not self.cola_salida.esta_vacia() and self.activa:
-            return self.cola_salida.desencolar()
+            return self._cola_salida.desencolar()
         return None
     
     def procesar_cola_entrada(self):
         """Procesa un paquete de la cola de entrada"""
         if not self.cola_entrada.esta_vacia() and self.activa:
-            return self.cola_entrada.desencolar()
+            return self._cola_entrada.desencolar()
         return None
     
+    def establecer_tipo_cola(self, tipo_cola):
+        """Cambia la implementación de las colas conservando los paquetes en espera"""
+        if tipo_cola not in TIPOS_COLA:
+            return False
+        if tipo_cola != self.tipo_cola:
+            for atributo in ('_cola_entrada', '_cola_salida'):
+                anterior = getattr(self, atributo)
+                if anterior is None:
+                    continue
+                nueva = TIPOS_COLA[tipo_cola]()
+                nueva.encolar_lote(anterior.desencolar_lote(anterior.obtener_tamaño()))
+                setattr(self, atributo, nueva)
+            self.tipo_cola = tipo_cola
+        return True
+    
+    def configurar_servicio(self, tasa, unidad='paquetes'):
+        """Configura cuántos paquetes (o bytes) por tick atiende cada cola"""
+        if unidad not in self.UNIDADES_SERVICIO or tasa <= 0:
+            return False
+        if unidad == 'paquetes' and int(tasa) != tasa:
+            return False
+        self.dispositivo_padre.registrar_cambio(partial(self.configurar_servicio, tasa, unidad),
+                                                partial(self.configurar_servicio, self.tasa_servicio, self.unidad_servicio))
+        self.tasa_servicio = int(tasa) if unidad == 'paquetes' else tasa
+        self.unidad_servicio = unidad
+        self._tick_cupos = None
+        if self.dispositivo_padre.red is not None:
+            self.dispositivo_padre.red.version_capacidad += 1  # El modelo fluido reasigna tasas
+        return True
+    
+    def _renovar_cupos(self, tick):
+        """Recarga los cupos de servicio al comenzar un tick nuevo"""
+        if self._tick_cupos == tick:
+            return
+        self._tick_cupos = tick
+        if self.unidad_servicio == 'bytes':
+            # Déficit acumulado mientras haya paquetes esperando (estilo DRR)
+            self._cupo_entrada = self.tasa_servicio + (self._cupo_entrada if not self.cola_entrada.esta_vacia() else 0)
+            self._cupo_salida = self.tasa_servicio + (self._cupo_salida if not self.cola_salida.esta_vacia() else 0)
+        else:
+            self._cupo_entrada = self.tasa_servicio
+            self._cupo_salida = self.tasa_servicio
+    
+    def procesar_lote_entrada(self, tick):
+        """Retira de la cola de entrada todos los paquetes que permite el cupo del tick"""
+        cola = self._cola_entrada
+        if not self.activa or cola is None or cola.esta_vacia():
+            return []
+        self._renovar_cupos(tick)
+        
+        if self.unidad_servicio == 'paquetes':
+            lote = cola.desencolar_lote(self._cupo_entrada)
+            self._cupo_entrada -= len(lote)
+            return lote
+        
+        lote = []
+        while not cola.esta_vacia():
+            tamaño = cola.ver_frente().obtener_tamaño()
+            if tamaño > self._cupo_entrada:
+                break
+            self._cupo_entrada -= tamaño
+            lote.append(cola.desencolar())
+        return lote
+    
+    def consumir_cupo_salida(self, paquete, tick):
+        """Descuenta un paquete del cupo de salida; False si ya no alcanza en este tick"""
+        self._renovar_cupos(tick)
+        costo = paquete.obtener_tamaño() if self.unidad_servicio == 'bytes' else 1
+        if costo > self._cupo_salida:
+            return False
+        self._cupo_salida -= costo
+        return True
+    
     def obtener_estado(self):
         """Retorna información del estado de la interfaz"""
         return {
             'nombre': self.nombre,
             'ip': self.direccion_ip or 'No asignada',
             'estado': 'up' if self.activa else 'down',
-            'vecinos': len(self.vecinos.obtener_lista()),
+            'vecinos': len(self.vecinos),
             'cola_entrada': self.cola_entrada.obtener_tamaño(),
-            'cola_salida': self.cola_salida.obtener_tamaño()
+            'cola_salida': self.cola_salida.obtener_tamaño(),
+            'transmitidos': self.paquetes_transmitidos,
+            'recibidos': self.paquetes_recibidos,
+            'tasa_servicio': self.tasa_servicio,
+            'unidad_servicio': self.unidad_servicio,
+            'tipo_cola': self.tipo_cola
         }
 
 class Dispositivo:
     """Clase base para todos los dispositivos de red"""
     
+    MODOS_ECMP = ('flujo', 'paquete', 'desactivado')
+    
+    __slots__ = ('nombre', 'tipo', 'interfaces', 'en_linea', '_historial',
+                 'paquetes_procesados', 'paquetes_enviados', 'paquetes_descartados',
+                 'cache_arp', 'cache_flujos', 'modo_ecmp', 'pool_paquetes', 'red',
+                 'enrutamiento', 'retencion_historial', '_turno_ecmp')
+    
     def __init__(self, nombre, tipo_dispositivo):
         self.nombre = nombre
         self.tipo = tipo_dispositivo
         self.interfaces = {}  # Diccionario de interfaces
         self.en_linea = True
-        self.historial_recibidos = Pila()  # Historial de paquetes recibidos
+        self._historial = None  # IndiceHistorial, se crea con el primer paquete recibido
         self.paquetes_procesados = 0
         self.paquetes_enviados = 0
         self.paquetes_descartados = 0
+        self.cache_arp = CacheARP()  # Resolución de siguiente salto
+        self.cache_flujos = CacheFlujos(CacheFlujos.CAPACIDAD_POR_TIPO.get(
+            tipo_dispositivo.lower(), CacheFlujos.CAPACIDAD_POR_DEFECTO))  # Decisiones de reenvío
+        self.modo_ecmp = 'flujo'  # Selección entre saltos de igual costo
+        self.pool_paquetes = None  # Pool de reciclaje compartido por la red
+        self.red = None  # Red a la que pertenece (la asigna Red.agregar_dispositivo)
+        self.enrutamiento = None  # Proceso de enrutamiento dinámico (None = rutas de la topología)
+        self.retencion_historial = None  # Paquetes recibidos a conservar (None = todos)
+        self._turno_ecmp = 0
+    
+    @property
+    def historial_recibidos(self):
+        """Historial de paquetes recibidos (del más reciente al más antiguo)"""
+        return self._historial if self._historial is not None else VACIA
     
     def cambiar_nombre(self, nuevo_nombre):
         """Cambia el nombre del dispositivo"""
         if nuevo_nombre and isinstance(nuevo_nombre, str):
+            self.registrar_cambio(partial(self.cambiar_nombre, nuevo_nombre), partial(self.cambiar_nombre, self.nombre))
             self.nombre = nuevo_nombre
+            self.notificar_cambio_topologia()
             return True
         return False
     
     def agregar_interfaz(self, nombre_interfaz):
         """Agrega una nueva interfaz al dispositivo"""
+        nombre_interfaz = sys.intern(nombre_interfaz)
         if nombre_interfaz not in self.interfaces:
+            self.registrar_cambio(partial(self.agregar_interfaz, nombre_interfaz),
+                                  partial(self._quitar_interfaz, nombre_interfaz))
             self.interfaces[nombre_interfaz] = Interfaz(nombre_interfaz, self)
+            self.notificar_cambio_topologia()
             return True
         return False
     
+    def _quitar_interfaz(self, nombre_interfaz):
+        """Elimina una interfaz sin conexiones (deshace agregar_interfaz)"""
+        if self.interfaces.pop(nombre_interfaz, None):
+            self.notificar_cambio_topologia(corte=True)
+    
     def obtener_interfaz(self, nombre_interfaz):
         """Obtiene una interfaz específica"""
         return self.interfaces.get(nombre_interfaz)
@@ -149,62 +371,257 @@ class Dispositivo:
     
     def establecer_estado(self, en_linea):
         """Establece si el dispositivo está online u offline"""
+        if en_linea != self.en_linea:
+            self.registrar_cambio(partial(self.establecer_estado, en_linea), partial(self.establecer_estado, self.en_linea))
         self.en_linea = en_linea
+        self.notificar_cambio_topologia(corte=not en_linea)
     
-    def procesar_paquetes(self):
+    def registrar_cambio(self, rehacer, deshacer):
+        """Anota un cambio (y su inverso) en la bifurcación activa de la red"""
+        if self.red is not None:
+            self.red.bifurcaciones.registrar(rehacer, deshacer)
+    
+    def notificar_cambio_topologia(self, corte=False, direcciones=False):
+        """Avisa a la red que su topología cambió. 'corte' indica que el cambio
+        puede separar dispositivos; 'direcciones', que cambió una IP"""
+        if self.red is not None:
+            self.red.marcar_topologia_modificada(self, corte, direcciones)
+    
+    def procesar_paquetes(self, tick=0):
         """Procesa paquetes en todas las interfaces activas"""
         paquetes_procesados = []
         
         if not self.en_linea:
             return paquetes_procesados
         
-        # Procesar colas de entrada de todas las interfaces
+        # Liberar paquetes cuya resolución ARP ya terminó
+        self._completar_resoluciones(tick, paquetes_procesados)
+        
+        # Procesar colas de entrada: cada interfaz atiende su cupo en un solo lote
         for interfaz in self.interfaces.values():
-            paquete = interfaz.procesar_cola_entrada()
-            if paquete:
+            for paquete in interfaz.procesar_lote_entrada(tick):
+                if paquete.control is not None:
+                    self._recibir_control(paquete, interfaz)
+                    continue
                 self.paquetes_procesados += 1
                 paquete.agregar_salto(self.nombre)
                 
                 # Si el paquete es para este dispositivo
                 if self._es_paquete_para_mi(paquete):
                     paquete.marcar_entregado()
-                    self.historial_recibidos.apilar(paquete)
+                    self._registrar_recibido(paquete, tick)
+                    self._publicar_evento('entregado', paquete)
                 else:
                     # Reenviar paquete
                     if paquete.decrementar_ttl():
-                        interfaz_salida = self._encontrar_ruta(paquete.destino)
-                        if interfaz_salida:
-                            interfaz_salida.enviar_paquete(paquete)
-                        else:
-                            paquete.descartado = True
-                            paquete.razon_descarte = "No hay ruta al destino"
-                            self.paquetes_descartados += 1
+                        if self._reenviar_paquete(paquete, tick):
+                            self._publicar_evento('reenviado', paquete)
                     else:
                         self.paquetes_descartados += 1
+                        self._publicar_evento('descartado', paquete, paquete.razon_descarte)
                 
                 paquetes_procesados.append(paquete)
         
         # Procesar colas de salida - enviar paquetes a vecinos
         for interfaz in self.interfaces.values():
             if interfaz.activa:
-                paquete_salida = interfaz.procesar_cola_salida()
-                if paquete_salida:
-                    # Enviar a todas las interfaces vecinas
-                    vecinos = interfaz.obtener_vecinos()
-                    if vecinos:
-                        # Enviar al primer vecino disponible (routing simple)
-                        vecino = vecinos[0]
-                        if vecino.activa:
-                            vecino.recibir_paquete(paquete_salida)
-                            self.paquetes_enviados += 1
-                    else:
-                        # No hay vecinos, descartar paquete
-                        paquete_salida.descartado = True
-                        paquete_salida.razon_descarte = "No hay vecinos conectados"
-                        self.paquetes_descartados += 1
+                self._procesar_salida(interfaz, tick, paquetes_procesados)
         
         return paquetes_procesados
     
+    def _procesar_salida(self, interfaz, tick, paquetes_procesados):
+        """Transmite paquetes de la cola de salida hasta agotar el cupo del tick
+        o encontrar el enlace ocupado"""
+        cola = interfaz.cola_salida
+        while not cola.esta_vacia():
+            vecinos = interfaz.obtener_vecinos()
+            if not vecinos:
+                # No hay vecinos, descartar paquete
+                self._descartar(cola.desencolar(), "No hay vecinos conectados")
+                continue
+            
+            # Usar el vecino resuelto por ARP; si ya no está, el primero
+            paquete_salida = cola.ver_frente()
+            vecino = paquete_salida.siguiente_salto
+            if vecino not in vecinos:
+                vecino = vecinos[0]
+            
+            # Si el enlace sigue serializando, el paquete espera en la cola
+            enlace = interfaz.enlaces.get(vecino)
+            if enlace and not enlace.disponible(interfaz, tick):
+                return
+            if not interfaz.consumir_cupo_salida(paquete_salida, tick):
+                return
+            
+            cola.desencolar()
+            if vecino.activa:
+                interfaz.paquetes_transmitidos += 1
+                # Los mensajes de control ocupan la cola y el enlace, pero no cuentan como datos
+                datos = paquete_salida.control is None
+                if datos:
+                    self.paquetes_enviados += 1
+                if enlace is None:
+                    vecino.recibir_paquete(paquete_salida)
+                elif not enlace.transmitir(interfaz, paquete_salida, tick) and datos:
+                    self.paquetes_descartados += 1
+                    self._publicar_evento('descartado', paquete_salida, paquete_salida.razon_descarte)
+                    paquetes_procesados.append(paquete_salida)
+    
+    def _recibir_control(self, paquete, interfaz):
+        """Entrega un mensaje de enrutamiento al proceso que habla su protocolo"""
+        proceso = self.enrutamiento
+        if proceso is not None and proceso.PROTOCOLO == paquete.control.protocolo:
+            proceso.recibir(paquete, interfaz)
+    
+    def establecer_enrutamiento(self, protocolo):
+        """Activa un protocolo dinámico ('rip', 'ospf') o vuelve a las rutas
+        de la topología (None). Requiere que el dispositivo esté en una red"""
+        if self.red is None:
+            return False
+        actual = self.enrutamiento.PROTOCOLO if self.enrutamiento else None
+        self.registrar_cambio(partial(self.establecer_enrutamiento, protocolo),
+                              partial(self.establecer_enrutamiento, actual))
+        self.red.enrutamiento.activar(self, protocolo)
+        self.cache_flujos.limpiar()
+        self.notificar_cambio_topologia()
+        return True
+    
+    def establecer_retencion_historial(self, cantidad):
+        """Limita cuántos paquetes recibidos se conservan (None = sin límite)"""
+        if cantidad is not None and cantidad < 1:
+            return False
+        self.retencion_historial = cantidad
+        return True
+    
+    def _registrar_recibido(self, paquete, tick=0):
+        """Indexa un paquete entregado y recorta el historial vencido.
+        Se recorta al doble del límite para que el costo sea O(1) amortizado"""
+        if self._historial is None:
+            self._historial = IndiceHistorial()
+        self._historial.agregar(paquete, tick)
+        retencion = self.retencion_historial
+        if retencion and len(self._historial) > 2 * retencion:
+            vencidos = self._historial.recortar(len(self._historial) - retencion)
+            for vencido in vencidos:
+                if self.pool_paquetes:
+                    self.pool_paquetes.diferir(vencido)
+    
+    def _descartar(self, paquete, razon):
+        """Marca un paquete como descartado por este dispositivo"""
+        paquete.descartado = True
+        paquete.razon_descarte = razon
+        self.paquetes_descartados += 1
+        self._publicar_evento('descartado', paquete, razon)
+    
+    def _publicar_evento(self, tipo, paquete, detalle=None):
+        """Publica un evento del paquete si alguien está observando la red"""
+        red = self.red
+        if red is not None and red.eventos.suscripciones:
+            red.eventos.publicar(Evento(red.tick_actual, tipo, self.nombre, paquete, detalle))
+    
+    def _reenviar_paquete(self, paquete, tick):
+        """Envía un paquete hacia su siguiente salto: primero la caché de flujos,
+        luego la caché ARP y, si el destino es nuevo, una resolución ARP"""
+        epoca = self._epoca_topologia()
+        saltos = self.cache_flujos.buscar(paquete.destino, epoca, tick)
+        if saltos:
+            return self._transmitir(paquete, saltos)
+        
+        entrada = self.cache_arp.buscar(paquete.destino, tick)
+        if entrada:
+            # La resolución sigue vigente: recalcular la ruta para la época actual
+            saltos = self._resolver_saltos(paquete.destino)
+            if saltos:
+                entrada.saltos = saltos
+                self.cache_flujos.insertar(paquete.destino, saltos, epoca, entrada.expira_en)
+                return self._transmitir(paquete, saltos)
+        
+        if not self._encontrar_ruta(paquete.destino):
+            self._descartar(paquete, "No hay ruta al destino")
+            return False
+        
+        # Retener el paquete mientras se resuelve el destino
+        if not self.cache_arp.encolar_pendiente(paquete.destino, paquete, tick):
+            self._descartar(paquete, "Cola ARP llena")
+            return False
+        return True
+    
+    def _completar_resoluciones(self, tick, paquetes_procesados):
+        """Resuelve los destinos pendientes y despacha sus paquetes retenidos"""
+        for ip, cola in self.cache_arp.resoluciones_listas(tick):
+            saltos = self._resolver_saltos(ip)
+            if saltos:
+                entrada = self.cache_arp.insertar(ip, saltos, tick)
+                self.cache_flujos.insertar(ip, saltos, self._epoca_topologia(), entrada.expira_en)
+            
+            while not cola.esta_vacia():
+                paquete = cola.desencolar()
+                if saltos:
+                    self._transmitir(paquete, saltos)
+                else:
+                    self._descartar(paquete, "Resolución ARP fallida")
+                    paquetes_procesados.append(paquete)
+    
+    def _epoca_topologia(self):
+        """Época de la topología de la red; invalida las entradas de flujo viejas"""
+        return self.red.version_topologia if self.red is not None else 0
+    
+    def establecer_modo_ecmp(self, modo):
+        """Establece el modo ECMP: 'flujo', 'paquete' o 'desactivado'"""
+        if modo in self.MODOS_ECMP:
+            self.registrar_cambio(partial(self.establecer_modo_ecmp, modo), partial(self.establecer_modo_ecmp, self.modo_ecmp))
+            self.modo_ecmp = modo
+            return True
+        return False
+    
+    def _transmitir(self, paquete, saltos):
+        """Encola el paquete en la interfaz del salto elegido"""
+        interfaz, vecino = self._seleccionar_salto(paquete, saltos)
+        paquete.siguiente_salto = vecino
+        return interfaz.enviar_paquete(paquete)
+    
+    def _seleccionar_salto(self, paquete, saltos):
+        """Elige uno de los saltos de igual costo según el modo ECMP"""
+        if len(saltos) == 1 or self.modo_ecmp == 'desactivado':
+            return saltos[0]
+        if self.modo_ecmp == 'paquete':
+            self._turno_ecmp += 1
+            return saltos[self._turno_ecmp % len(saltos)]
+        return self.elegir_salto_flujo(paquete.origen, paquete.destino, saltos)
+    
+    def elegir_salto_flujo(self, origen, destino, saltos):
+        """Hash estable por flujo (origen, destino) para no reordenar paquetes.
+        El nombre del dispositivo entra en el hash: sin él, cada nivel de la
+        topología elegiría el mismo índice y el tráfico se polarizaría"""
+        if len(saltos) == 1 or self.modo_ecmp == 'desactivado':
+            return saltos[0]
+        clave = zlib.crc32(f"{origen}>{destino}".encode()) ^ zlib.crc32(self.nombre.encode())
+        return saltos[_mezclar32(clave) % len(saltos)]
+    
+    def _enlaces_activos(self):
+        """Retorna los pares (interfaz, vecino) utilizables desde este dispositivo"""
+        enlaces = []
+        for interfaz in self.interfaces.values():
+            if interfaz.activa:
+                for vecino in interfaz.obtener_vecinos():
+                    enlaces.append((interfaz, vecino))
+        return enlaces
+    
+    def _resolver_saltos(self, ip_destino):
+        """Resuelve los saltos (interfaz, vecino) de igual costo hacia un destino
+        sobre la instantánea CSR de la red. Si el destino no es alcanzable se usa
+        el primer vecino activo (gateway). Con enrutamiento dinámico manda la
+        tabla del protocolo, salvo para los segmentos conectados"""
+        if self.enrutamiento is not None:
+            saltos = self.enrutamiento.saltos(ip_destino)
+            if saltos != CONECTADO:
+                return saltos or []
+        if self.red is not None:
+            saltos = self.red.congelar().saltos_equivalentes(self, ip_destino)
+            if saltos:
+                return saltos
+        return self._enlaces_activos()[:1]
+    
     def _es_paquete_para_mi(self, paquete):
         """Verifica si el paquete está destinado a este dispositivo"""
         for interfaz in self.interfaces.values():
@@ -220,8 +637,9 @@ class Dispositivo:
                 return interfaz
         return None
     
-    def enviar_paquete(self, ip_origen, ip_destino, mensaje, ttl=64):
-        """Envía un paquete desde este dispositivo"""
+    def enviar_paquete(self, ip_origen, ip_destino, mensaje, ttl=64, tick=0, tamaño=None):
+        """Envía un paquete desde este dispositivo. Si se indica tamaño, la carga
+        se declara de ese largo sin reservarla (mensaje None = sin buffer)"""
         from paquete import Paquete
         
         if not self.en_linea:
@@ -237,12 +655,24 @@ class Dispositivo:
         if not interfaz_origen:
             return False
         
-        # Crear y enviar paquete
-        paquete = Paquete(ip_origen, ip_destino, mensaje, ttl)
+        # Crear (o reciclar) y enviar paquete
+        if self.pool_paquetes:
+            paquete = self.pool_paquetes.crear(ip_origen, ip_destino, mensaje, ttl, tamaño)
+        else:
+            paquete = Paquete(ip_origen, ip_destino, mensaje, ttl, tamaño)
         paquete.agregar_salto(self.nombre)
+        paquete.tick_creacion = tick
+        
+        # Un destino inalcanzable o fuera del alcance del TTL se descarta en el origen
+        razon = self.red.verificar_alcance(self, ip_destino, ttl) if self.red is not None else None
+        if razon:
+            self._descartar(paquete, razon)
+            self.red.registrar_descarte(paquete)
+            return False
         
-        if interfaz_origen.enviar_paquete(paquete):
+        if self._reenviar_paquete(paquete, tick):
             self.paquetes_enviados += 1
+            self._publicar_evento('enviado', paquete)
             return True
         
         return False
@@ -257,13 +687,25 @@ class Dispositivo:
             'paquetes_procesados': self.paquetes_procesados,
             'paquetes_enviados': self.paquetes_enviados,
             'paquetes_descartados': self.paquetes_descartados,
-            'historial_size': self.historial_recibidos.obtener_tamaño()
+            'historial_size': self.historial_recibidos.obtener_tamaño(),
+            'retencion_historial': self.retencion_historial,
+            'modo_ecmp': self.modo_ecmp,
+            'enrutamiento': self.enrutamiento.PROTOCOLO if self.enrutamiento else 'estatico',
+            'arp': self.cache_arp.obtener_estadisticas(),
+            'flujos': self.cache_flujos.obtener_estadisticas()
         }
     
     def obtener_historial(self):
         """Retorna el historial de paquetes recibidos"""
         return self.historial_recibidos.obtener_elementos()
     
+    def consultar_historial(self, origen=None, contenido=None, desde_tick=None):
+        """Generador (tick, paquete) de los recibidos que cumplen los filtros,
+        del más reciente al más antiguo"""
+        if self._historial is None:
+            return iter(())
+        return self._historial.consultar(origen, contenido, desde_tick)
+    
     def obtener_info_interfaces(self):
         """Retorna información de todas las interfaces"""
         info = {}
@@ -275,8 +717,9 @@ class Dispositivo:
         """Retorna información de las colas de todas las interfaces"""
         info = {}
         for nombre, interfaz in self.interfaces.items():
+            # Se entregan las colas mismas: son iterables y no hace falta copiarlas
             info[nombre] = {
-                'entrada': interfaz.cola_entrada.obtener_elementos(),
-                'salida': interfaz.cola_salida.obtener_elementos()
+                'entrada': interfaz.cola_entrada,
+                'salida': interfaz.cola_salida
             }
         return info
@@ -0,0 +1,146 @@
+# Módulo 8: Enlaces
+# Modelo de ancho de banda, retardo de propagación y pérdida por enlace
+
+import math
+from collections import deque
+
+class SentidoEnlace:
+    """Estado de un sentido de transmisión del enlace (línea de retardo incluida)"""
+    
+    def __init__(self, destino):
+        self.destino = destino  # Interfaz que recibe en este sentido
+        self.linea_retardo = deque()  # (tick_llegada, paquete) en orden de llegada
+        self.ocupado_hasta = 0.0  # Fin de la serialización en curso
+        self.transmitidos = 0
+        self.unidades = 0
+        self.tiempo_ocupado = 0.0
+        self.perdidos = 0
+
+class Enlace:
+    """Conexión punto a punto entre dos interfaces con capacidad finita opcional"""
+    
+    UNIDADES = ('paquetes', 'bytes')
+    
+    def __init__(self, clave, interfaz1, interfaz2, ancho_banda=None, unidad='paquetes',
+                 retardo=0, perdida=0.0, aleatorio=None, tick_creacion=0):
+        self.clave = clave
+        self.ancho_banda = ancho_banda  # Unidades por tick; None = infinito
+        self.unidad = unidad
+        self.retardo = retardo  # Ticks de propagación
+        self.perdida = perdida  # Probabilidad de pérdida por paquete
+        self.aleatorio = aleatorio
+        self.tick_creacion = tick_creacion
+        self.sentidos = {
+            interfaz1: SentidoEnlace(interfaz2),
+            interfaz2: SentidoEnlace(interfaz1)
+        }
+    
+    def _costo(self, paquete):
+        """Unidades que consume un paquete según la unidad del ancho de banda"""
+        if self.unidad == 'bytes':
+            return paquete.obtener_tamaño()
+        return 1
+    
+    def disponible(self, origen, tick):
+        """Indica si el sentido que sale de 'origen' puede iniciar una transmisión en este tick"""
+        return self.sentidos[origen].ocupado_hasta < tick + 1
+    
+    def transmitir(self, origen, paquete, tick):
+        """Serializa el paquete y lo coloca en la línea de retardo.
+        Retorna False si el paquete se pierde en el enlace"""
+        sentido = self.sentidos[origen]
+        
+        inicio = max(float(tick), sentido.ocupado_hasta)
+        costo = self._costo(paquete)
+        duracion = costo / self.ancho_banda if self.ancho_banda else 0.0
+        sentido.ocupado_hasta = inicio + duracion
+        sentido.tiempo_ocupado += duracion
+        sentido.transmitidos += 1
+        sentido.unidades += costo
+        
+        if self.perdida and self.aleatorio and self.aleatorio.random() < self.perdida:
+            sentido.perdidos += 1
+            paquete.descartado = True
+            paquete.razon_descarte = "Pérdida en el enlace"
+            return False
+        
+        llegada = math.ceil(inicio + duracion) + self.retardo
+        if llegada <= tick and not sentido.linea_retardo:
+            # Enlace ideal: entrega inmediata como una conexión directa
+            sentido.destino.recibir_paquete(paquete)
+        else:
+            sentido.linea_retardo.append((llegada, paquete))
+        return True
+    
+    def _descartar(self, sentido, paquete, razon, perdidos):
+        """Descarta un paquete en vuelo. Los de datos se cargan al dispositivo
+        que debía recibirlo; los de control no cuentan como descartes"""
+        if paquete.control is None:
+            sentido.destino.dispositivo_padre._descartar(paquete, razon)
+            perdidos.append(paquete)
+        else:
+            paquete.descartado = True
+            paquete.razon_descarte = razon
+    
+    def entregar(self, tick):
+        """Entrega los paquetes cuya llegada ya ocurrió; retorna los paquetes
+        de datos que se perdieron"""
+        perdidos = []
+        for sentido in self.sentidos.values():
+            linea = sentido.linea_retardo
+            while linea and linea[0][0] <= tick:
+                _, paquete = linea.popleft()
+                if not sentido.destino.recibir_paquete(paquete):
+                    self._descartar(sentido, paquete, "Interfaz destino inactiva", perdidos)
+        return perdidos
+    
+    def vaciar(self, razon):
+        """Descarta todos los paquetes en vuelo (p. ej. al desconectar); retorna
+        los de datos"""
+        perdidos = []
+        for sentido in self.sentidos.values():
+            while sentido.linea_retardo:
+                _, paquete = sentido.linea_retardo.popleft()
+                self._descartar(sentido, paquete, razon, perdidos)
+        return perdidos
+    
+    def en_vuelo(self):
+        """Cantidad de paquetes en las líneas de retardo"""
+        return sum(len(s.linea_retardo) for s in self.sentidos.values())
+    
+    def obtener_configuracion(self):
+        """Atributos persistibles del enlace"""
+        return {
+            'ancho_banda': self.ancho_banda,
+            'unidad': self.unidad,
+            'retardo': self.retardo,
+            'perdida': self.perdida
+        }
+    
+    def obtener_estado(self, tick):
+        """Retorna contadores y utilización de cada sentido"""
+        transcurrido = max(tick - self.tick_creacion, 1)
+        sentidos = []
+        for origen, sentido in self.sentidos.items():
+            if self.ancho_banda:
+                utilizacion = round(min(sentido.tiempo_ocupado / transcurrido, 1.0) * 100, 1)
+            else:
+                utilizacion = None
+            sentidos.append({
+                'origen': f"{origen.dispositivo_padre.nombre}:{origen.nombre}",
+                'destino': f"{sentido.destino.dispositivo_padre.nombre}:{sentido.destino.nombre}",
+                'transmitidos': sentido.transmitidos,
+                'unidades': sentido.unidades,
+                'perdidos': sentido.perdidos,
+                'en_vuelo': len(sentido.linea_retardo),
+                'por_tick': round(sentido.transmitidos / transcurrido, 2),
+                'utilizacion': utilizacion
+            })
+        return {
+            'conexion': self.clave,
+            'ancho_banda': self.ancho_banda,
+            'unidad': self.unidad,
+            'retardo': self.retardo,
+            'perdida': self.perdida,
+            'sentidos': sentidos
+        }
@@ -0,0 +1,676 @@
+# Módulo 22: Enrutamiento dinámico
+# Vector distancia (tipo RIP) y estado de enlace (tipo OSPF) con SPF incremental
+
+import heapq
+from abc import ABC, abstractmethod
+from collections import deque
+from paquete import Paquete
+
+CONECTADO = 'conectado'  # Destino en un segmento propio: se resuelve con la topología local
+INFINITO_RIP = 16
+
+class MensajeControl:
+    """Carga de un paquete de control: protocolo, interfaz que lo emitió y datos"""
+    
+    def __init__(self, protocolo, interfaz, datos):
+        self.protocolo = protocolo
+        self.interfaz = interfaz
+        self.datos = datos
+
+class ProcesoEnrutamiento(ABC):
+    """Base de los protocolos: descubre adyacencias con vecinos que corren el
+    mismo protocolo, calcula los segmentos conectados y envía los mensajes
+    como Paquetes reales por las colas de las interfaces.
+    
+    Los segmentos conectados son las IPs propias (métrica 0) y las de los
+    dispositivos sin protocolo alcanzables sin cruzar otro router dinámico
+    (métrica = saltos), como las redes directamente conectadas de un router"""
+    
+    PROTOCOLO = None
+    
+    def __init__(self, dispositivo, gestor):
+        self.dispositivo = dispositivo
+        self.gestor = gestor
+        self.version_vista = None
+        self.adyacencias = {}  # (interfaz, vecina) -> Dispositivo vecino
+        self.conectados = {}  # ip -> métrica
+        self.cambios_rutas = 0
+    
+    def revisar_topologia(self, tick):
+        """Recalcula adyacencias y segmentos si la topología cambió"""
+        version = self.dispositivo.red.version_topologia
+        if version == self.version_vista:
+            return
+        self.version_vista = version
+        
+        adyacencias = self._calcular_adyacencias()
+        conectados = self._calcular_conectados()
+        perdidas = [par for par in self.adyacencias if par not in adyacencias]
+        nuevas = [par for par in adyacencias if par not in self.adyacencias]
+        anteriores = self.conectados
+        self.adyacencias = adyacencias
+        self.conectados = conectados
+        if perdidas or nuevas or anteriores != conectados:
+            self.al_cambiar_vecindad(perdidas, nuevas, anteriores, tick)
+    
+    def _calcular_adyacencias(self):
+        """Pares (interfaz, vecina) hacia vecinos en línea con el mismo protocolo"""
+        pares = {}
+        if not self.dispositivo.en_linea:
+            return pares
+        for interfaz in self.dispositivo.interfaces.values():
+            if not interfaz.activa:
+                continue
+            for vecina in interfaz.obtener_vecinos():
+                otro = vecina.dispositivo_padre
+                if vecina.activa and otro.en_linea and isinstance(otro.enrutamiento, type(self)):
+                    pares[(interfaz, vecina)] = otro
+        return pares
+    
+    def _calcular_conectados(self):
+        """IPs propias y de los segmentos sin protocolo colgados de este router"""
+        conectados = {interfaz.direccion_ip: 0 for interfaz in self.dispositivo.interfaces.values()
+                      if interfaz.direccion_ip}
+        topologia = self.dispositivo.red.congelar()
+        origen = topologia.indice_objeto.get(self.dispositivo)
+        if origen is None:
+            return conectados
+        
+        visitados = {origen}
+        pendientes = deque([(origen, 0)])
+        while pendientes:
+            d, saltos = pendientes.popleft()
+            for v in topologia.vecinos_dispositivo(d):
+                if v in visitados:
+                    continue
+                visitados.add(v)
+                otro = topologia.dispositivos[v]
+                if otro.enrutamiento is not None:
+                    continue  # Otro router dinámico: su segmento lo anuncia él
+                for interfaz in otro.interfaces.values():
+                    if interfaz.direccion_ip:
+                        conectados.setdefault(interfaz.direccion_ip, saltos + 1)
+                pendientes.append((v, saltos + 1))
+        return conectados
+    
+    def enviar(self, par, datos, tamaño):
+        """Encola un mensaje de control hacia un vecino por la interfaz del par"""
+        interfaz, vecina = par
+        red = self.dispositivo.red
+        paquete = Paquete(interfaz.direccion_ip, vecina.direccion_ip, None, 1, tamaño)
+        paquete.control = MensajeControl(self.PROTOCOLO, interfaz, datos)
+        paquete.siguiente_salto = vecina
+        paquete.tick_creacion = red.tick_actual
+        paquete.agregar_salto(self.dispositivo.nombre)
+        if interfaz.enviar_paquete(paquete):
+            self.gestor.contar_envio(self.PROTOCOLO, tamaño)
+    
+    def rutas_modificadas(self, tick):
+        """Las decisiones de reenvío cambiaron: vaciar la caché de flujos"""
+        self.cambios_rutas += 1
+        self.dispositivo.cache_flujos.limpiar()
+        self.gestor.registrar_cambio_rutas(tick)
+    
+    def _describir(self, pares):
+        """Texto de los saltos (interfaz -> vecino) para las tablas"""
+        return [f"{i.nombre} -> {v.dispositivo_padre.nombre}:{v.nombre}" for i, v in pares]
+    
+    @abstractmethod
+    def al_cambiar_vecindad(self, perdidas, nuevas, anteriores, tick):
+        pass
+    
+    @abstractmethod
+    def procesar(self, tick):
+        pass
+    
+    @abstractmethod
+    def recibir(self, paquete, interfaz):
+        pass
+    
+    @abstractmethod
+    def saltos(self, ip_destino):
+        """Pares (interfaz, vecina) hacia el destino, CONECTADO o None si no hay ruta"""
+        pass
+
+class RutaRIP:
+    """Ruta aprendida: métrica y saltos de igual costo con el tick de su último anuncio"""
+    
+    def __init__(self, metrica):
+        self.metrica = metrica
+        self.via = {}  # (interfaz, vecina) -> tick del último anuncio
+        self.inalcanzable_desde = None
+
+class ProcesoRIP(ProcesoEnrutamiento):
+    """Vector distancia: cada PERIODO ticks anuncia su tabla completa a cada
+    vecino, y al cambiar una ruta envía una actualización disparada solo con
+    las rutas modificadas. Usa horizonte dividido con envenenamiento inverso,
+    métrica en saltos con infinito 16 y expira las rutas que dejan de
+    anunciarse durante EXPIRACION ticks"""
+    
+    PROTOCOLO = 'rip'
+    PERIODO = 10
+    EXPIRACION = 30
+    RECOLECCION = 20
+    BYTES_CABECERA = 4
+    BYTES_RUTA = 20
+    
+    def __init__(self, dispositivo, gestor):
+        super().__init__(dispositivo, gestor)
+        self.rutas = {}  # ip -> RutaRIP
+        self.cambiadas = set()  # IPs a incluir en la próxima actualización disparada
+        self.proximo_periodico = 0
+    
+    def al_cambiar_vecindad(self, perdidas, nuevas, anteriores, tick):
+        modificado = False
+        if perdidas:
+            for ip, ruta in self.rutas.items():
+                for par in perdidas:
+                    if par in ruta.via:
+                        modificado |= self._quitar_via(ip, ruta, par, tick)
+        for ip in set(anteriores) ^ set(self.conectados):
+            self.cambiadas.add(ip)
+            modificado = True
+        for ip, metrica in self.conectados.items():
+            if anteriores.get(ip, metrica) != metrica:
+                self.cambiadas.add(ip)
+                modificado = True
+        if nuevas:
+            self.proximo_periodico = tick  # Tabla completa ya para los vecinos nuevos
+        if modificado:
+            self.rutas_modificadas(tick)
+    
+    def _quitar_via(self, ip, ruta, par, tick):
+        """Retira un salto de una ruta; sin saltos, la ruta pasa a inalcanzable"""
+        del ruta.via[par]
+        if not ruta.via and ruta.metrica < INFINITO_RIP:
+            ruta.metrica = INFINITO_RIP
+            ruta.inalcanzable_desde = tick
+        self.cambiadas.add(ip)
+        return True
+    
+    def procesar(self, tick):
+        """Revisa la vecindad, vence temporizadores y envía las actualizaciones"""
+        self.revisar_topologia(tick)
+        if tick >= self.proximo_periodico:
+            self._expirar(tick)
+            self._anunciar(set(self.conectados) | set(self.rutas))
+            self.proximo_periodico = tick + self.PERIODO
+        elif self.cambiadas:
+            self._anunciar(self.cambiadas)
+        self.cambiadas = set()
+    
+    def _expirar(self, tick):
+        """Quita saltos sin anuncios recientes y borra rutas inalcanzables viejas"""
+        modificado = False
+        for ip, ruta in list(self.rutas.items()):
+            for par, visto in list(ruta.via.items()):
+                if tick - visto > self.EXPIRACION:
+                    modificado |= self._quitar_via(ip, ruta, par, tick)
+            if ruta.inalcanzable_desde is not None and tick - ruta.inalcanzable_desde > self.RECOLECCION:
+                del self.rutas[ip]
+        if modificado:
+            self.rutas_modificadas(tick)
+    
+    def _anunciar(self, ips):
+        """Envía a cada vecino el vector de las IPs dadas"""
+        for par in self.adyacencias:
+            vector = {}
+            for ip in ips:
+                if ip in self.conectados:
+                    vector[ip] = self.conectados[ip]
+                else:
+                    ruta = self.rutas.get(ip)
+                    # Envenenamiento inverso: no ofrecer una ruta al vecino por el que se aprendió
+                    vector[ip] = INFINITO_RIP if ruta is None or par in ruta.via else ruta.metrica
+            if vector:
+                self.enviar(par, vector, self.BYTES_CABECERA + self.BYTES_RUTA * len(vector))
+    
+    def recibir(self, paquete, interfaz):
+        """Aplica el vector de un vecino (Bellman-Ford distribuido)"""
+        par = (interfaz, paquete.control.interfaz)
+        if par not in self.adyacencias:
+            return
+        tick = self.dispositivo.red.tick_actual
+        modificado = False
+        for ip, metrica in paquete.control.datos.items():
+            if ip in self.conectados:
+                continue
+            nueva = min(metrica + 1, INFINITO_RIP)
+            ruta = self.rutas.get(ip)
+            if ruta is None:
+                if nueva < INFINITO_RIP:
+                    ruta = self.rutas[ip] = RutaRIP(nueva)
+                    ruta.via[par] = tick
+                    self.cambiadas.add(ip)
+                    modificado = True
+            elif par in ruta.via:
+                if nueva == ruta.metrica:
+                    ruta.via[par] = tick
+                elif nueva < ruta.metrica or len(ruta.via) == 1:
+                    # Mejora, o empeora el único salto: se acepta la nueva métrica
+                    ruta.via = {par: tick}
+                    if nueva >= INFINITO_RIP:
+                        modificado |= self._quitar_via(ip, ruta, par, tick)
+                    else:
+                        ruta.metrica = nueva
+                        ruta.inalcanzable_desde = None
+                        self.cambiadas.add(ip)
+                        modificado = True
+                else:
+                    modificado |= self._quitar_via(ip, ruta, par, tick)
+            elif nueva < ruta.metrica:
+                ruta.metrica = nueva
+                ruta.via = {par: tick}
+                ruta.inalcanzable_desde = None
+                self.cambiadas.add(ip)
+                modificado = True
+            elif nueva == ruta.metrica and nueva < INFINITO_RIP:
+                ruta.via[par] = tick
+                modificado = True
+        if modificado:
+            self.rutas_modificadas(tick)
+    
+    def saltos(self, ip_destino):
+        if ip_destino in self.conectados:
+            return CONECTADO
+        ruta = self.rutas.get(ip_destino)
+        if ruta is None or ruta.metrica >= INFINITO_RIP:
+            return None
+        return list(ruta.via)
+    
+    def obtener_tabla(self):
+        """Filas (destino, métrica, saltos, origen) de la tabla de rutas"""
+        tabla = [{'destino': ip, 'metrica': metrica, 'saltos': [], 'origen': 'conectado'}
+                 for ip, metrica in self.conectados.items()]
+        for ip, ruta in self.rutas.items():
+            if ip not in self.conectados:
+                tabla.append({'destino': ip, 'metrica': ruta.metrica,
+                              'saltos': self._describir(ruta.via), 'origen': self.PROTOCOLO})
+        return tabla
+
+class ArbolSPF:
+    """Caminos mínimos desde una raíz (un DAG cuando hay empates) que se
+    actualiza a partir de las aristas que cambiaron, sin recorrer todo el grafo.
+    
+    Una arista que sale del árbol invalida solo la rama que colgaba de ella;
+    esa rama se vuelve a enganchar desde sus vecinos válidos. Una arista nueva
+    o más barata propaga la mejora solo a los nodos que se acercan. Al final se
+    recalculan los primeros saltos de los nodos tocados y sus descendientes"""
+    
+    def __init__(self, raiz):
+        self.raiz = raiz
+        self.nodos_recalculados = 0
+        self._reiniciar()
+    
+    def _reiniciar(self):
+        self.dist = {self.raiz: 0}
+        self.padres = {self.raiz: set()}
+        self.hijos = {self.raiz: set()}
+        self.primeros = {self.raiz: frozenset()}  # Vecinos de la raíz por los que se sale
+    
+    def calcular(self, grafo):
+        """Dijkstra completo; retorna True si cambió algún primer salto"""
+        anteriores = self.primeros
+        self._reiniciar()
+        heap = [(costo, v, self.raiz) for v, costo in grafo.get(self.raiz, {}).items()]
+        heapq.heapify(heap)
+        afectados = set()
+        self._dijkstra(grafo, heap, afectados)
+        self._recalcular_primeros(afectados)
+        return self.primeros != anteriores
+    
+    def actualizar(self, grafo, aristas):
+        """Aplica un lote de aristas cambiadas (grafo ya actualizado)"""
+        afectados = set()
+        revisar = []
+        for u, v in aristas:
+            for a, b in ((u, v), (v, u)):
+                padres = self.padres.get(b)
+                if padres and a in padres:
+                    costo = grafo.get(a, {}).get(b)
+                    if costo is None or self.dist[a] + costo != self.dist[b]:
+                        padres.discard(a)
+                        self.hijos[a].discard(b)
+                        revisar.append(b)
+        
+        # Un nodo sin padres pierde su distancia y arrastra a los hijos que dependían solo de él
+        invalidos = set()
+        while revisar:
+            x = revisar.pop()
+            if x == self.raiz or x in invalidos:
+                continue
+            afectados.add(x)
+            if self.padres[x]:
+                continue
+            invalidos.add(x)
+            for hijo in self.hijos[x]:
+                self.padres[hijo].discard(x)
+                revisar.append(hijo)
+            self.hijos[x] = set()
+        for x in invalidos:
+            del self.dist[x]
+        
+        heap = []
+        for x in invalidos:
+            for w, costo in grafo.get(x, {}).items():
+                if w in self.dist:
+                    heap.append((self.dist[w] + costo, x, w))
+        for u, v in aristas:
+            for a, b in ((u, v), (v, u)):
+                costo = grafo.get(a, {}).get(b)
+                if costo is not None and a in self.dist:
+                    heap.append((self.dist[a] + costo, b, a))
+        heapq.heapify(heap)
+        self._dijkstra(grafo, heap, afectados)
+        
+        cambio = False
+        for x in invalidos:
+            if x not in self.dist:
+                self.padres.pop(x, None)
+                self.hijos.pop(x, None)
+                cambio |= bool(self.primeros.pop(x, None))
+        return self._recalcular_primeros(afectados) or cambio
+    
+    def _dijkstra(self, grafo, heap, afectados):
+        """Relaja desde las entradas del heap (distancia, nodo, padre)"""
+        while heap:
+            d, x, p = heapq.heappop(heap)
+            if x == self.raiz:
+                continue
+            dp = self.dist.get(p)
+            costo = grafo.get(p, {}).get(x)
+            if dp is None or costo is None or dp + costo != d:
+                continue  # Entrada vieja: el padre cambió después de encolarla
+            actual = self.dist.get(x)
+            if actual is None or d < actual:
+                for q in self.padres.get(x, ()):
+                    self.hijos[q].discard(x)
+                self.dist[x] = d
+                self.padres[x] = {p}
+                self.hijos.setdefault(x, set())
+                self.hijos[p].add(x)
+                afectados.add(x)
+                self.nodos_recalculados += 1
+                for y, costo_y in grafo.get(x, {}).items():
+                    heapq.heappush(heap, (d + costo_y, y, x))
+            elif d == actual and p not in self.padres[x]:
+                self.padres[x].add(p)
+                self.hijos[p].add(x)
+                afectados.add(x)
+    
+    def _recalcular_primeros(self, afectados):
+        """Primeros saltos de los nodos afectados y sus descendientes, en orden
+        de distancia para que los padres estén listos antes que los hijos"""
+        vistos = {x for x in afectados if x in self.dist}
+        pendientes = list(vistos)
+        while pendientes:
+            for hijo in self.hijos.get(pendientes.pop(), ()):
+                if hijo not in vistos:
+                    vistos.add(hijo)
+                    pendientes.append(hijo)
+        
+        cambio = False
+        for x in sorted(vistos, key=self.dist.__getitem__):
+            if x == self.raiz:
+                continue
+            nuevos = frozenset().union(*(self.primeros[p] if p != self.raiz else (x,) for p in self.padres[x]))
+            if nuevos != self.primeros.get(x):
+                self.primeros[x] = nuevos
+                cambio = True
+        return cambio
+
+class LSA:
+    """Anuncio de estado de enlace de un router: vecinos y segmentos conectados"""
+    
+    BYTES_CABECERA = 24
+    BYTES_ENLACE = 12
+    
+    def __init__(self, origen, secuencia, vecinos, stubs):
+        self.origen = origen
+        self.secuencia = secuencia
+        self.vecinos = vecinos  # nombre del router vecino -> costo
+        self.stubs = stubs  # ip -> métrica
+    
+    def tamaño(self):
+        return self.BYTES_CABECERA + self.BYTES_ENLACE * (len(self.vecinos) + len(self.stubs))
+
+class ProcesoOSPF(ProcesoEnrutamiento):
+    """Estado de enlace: cada router inunda un LSA con sus adyacencias y
+    segmentos, arma la base de datos (LSDB) completa y calcula sus rutas con
+    SPF. Las aristas solo cuentan si ambos extremos se anuncian mutuamente.
+    
+    Los LSA recibidos en un tick se acumulan: al tick siguiente se reenvían
+    juntos (un paquete por adyacencia) y el SPF corre una sola vez, de forma
+    incremental sobre las aristas que cambiaron. Los
+    cambios solo de segmentos no requieren SPF: las rutas a IPs se resuelven
+    al consultar combinando el árbol con quién anuncia cada IP"""
+    
+    PROTOCOLO = 'ospf'
+    REFRESCO = 100
+    
+    def __init__(self, dispositivo, gestor):
+        super().__init__(dispositivo, gestor)
+        self.lsdb = {}  # router -> LSA
+        self.secuencia = 0
+        self.grafo = {}  # router -> {vecino: costo}, solo aristas confirmadas
+        self.anunciantes = {}  # ip -> {router: métrica}
+        self.arbol = ArbolSPF(dispositivo.nombre)
+        self.aristas_pendientes = set()
+        self.por_inundar = {}  # (interfaz, vecina) -> {router: LSA} a enviar este tick
+        self.spf_completo_pendiente = True
+        self.proximo_refresco = 0
+    
+    def al_cambiar_vecindad(self, perdidas, nuevas, anteriores, tick):
+        self._originar(tick)
+        # Intercambio de base de datos con los vecinos nuevos
+        for par in nuevas:
+            self.por_inundar.setdefault(par, {}).update(self.lsdb)
+    
+    def _originar(self, tick):
+        """Crea, instala e inunda un LSA propio con el estado actual"""
+        self.secuencia += 1
+        vecinos = {otro.nombre: 1 for otro in self.adyacencias.values()}
+        lsa = LSA(self.dispositivo.nombre, self.secuencia, vecinos, dict(self.conectados))
+        self._instalar(lsa, tick)
+        self._inundar([lsa], None)
+        self.proximo_refresco = tick + self.REFRESCO
+    
+    def _inundar(self, lsas, excepto):
+        """Programa el reenvío de LSAs a todas las adyacencias salvo por la que
+        llegaron; se envían juntos, un paquete por adyacencia, al tick siguiente"""
+        for par in self.adyacencias:
+            if par != excepto:
+                pendientes = self.por_inundar.setdefault(par, {})
+                for lsa in lsas:
+                    pendientes[lsa.origen] = lsa
+    
+    def _enviar_inundacion(self):
+        """Envía los LSAs acumulados (solo la versión más nueva de cada router)"""
+        for par, pendientes in self.por_inundar.items():
+            if par in self.adyacencias:
+                lsas = list(pendientes.values())
+                self.enviar(par, lsas, sum(lsa.tamaño() for lsa in lsas))
+        self.por_inundar = {}
+    
+    def _instalar(self, lsa, tick):
+        """Guarda un LSA y actualiza las aristas y segmentos que cambió"""
+        origen = lsa.origen
+        anterior = self.lsdb.get(origen)
+        self.lsdb[origen] = lsa
+        
+        for vecino in set(anterior.vecinos if anterior else ()) | set(lsa.vecinos):
+            otro = self.lsdb.get(vecino)
+            antes = self.grafo.get(origen, {}).get(vecino)
+            ahora = lsa.vecinos.get(vecino) if otro is not None and origen in otro.vecinos else None
+            if antes == ahora:
+                continue
+            if ahora is None:
+                self.grafo[origen].pop(vecino, None)
+                self.grafo[vecino].pop(origen, None)
+            else:
+                self.grafo.setdefault(origen, {})[vecino] = ahora
+                self.grafo.setdefault(vecino, {})[origen] = ahora
+            self.aristas_pendientes.add((origen, vecino))
+        
+        stubs_anteriores = anterior.stubs if anterior else {}
+        if stubs_anteriores != lsa.stubs:
+            for ip in stubs_anteriores:
+                if ip not in lsa.stubs:
+                    self.anunciantes[ip].pop(origen, None)
+            for ip, metrica in lsa.stubs.items():
+                self.anunciantes.setdefault(ip, {})[origen] = metrica
+            self.rutas_modificadas(tick)
+    
+    def procesar(self, tick):
+        """Revisa la vecindad, refresca el LSA propio y corre el SPF pendiente"""
+        self.revisar_topologia(tick)
+        if tick >= self.proximo_refresco:
+            self._originar(tick)
+        if self.por_inundar:
+            self._enviar_inundacion()
+        
+        if self.spf_completo_pendiente:
+            cambio = self.arbol.calcular(self.grafo)
+            self.spf_completo_pendiente = False
+            self.aristas_pendientes.clear()
+            self.gestor.contar_spf(completo=True)
+        elif self.aristas_pendientes:
+            cambio = self.arbol.actualizar(self.grafo, self.aristas_pendientes)
+            self.aristas_pendientes.clear()
+            self.gestor.contar_spf(completo=False)
+        else:
+            return
+        if cambio:
+            self.rutas_modificadas(tick)
+    
+    def recibir(self, paquete, interfaz):
+        """Instala los LSAs más nuevos que los conocidos y los sigue inundando"""
+        par = (interfaz, paquete.control.interfaz)
+        if par not in self.adyacencias:
+            return
+        tick = self.dispositivo.red.tick_actual
+        nuevos = []
+        for lsa in paquete.control.datos:
+            if lsa.origen == self.dispositivo.nombre:
+                continue  # El propio LSA vuelve por la inundación
+            actual = self.lsdb.get(lsa.origen)
+            if actual is None or lsa.secuencia > actual.secuencia:
+                self._instalar(lsa, tick)
+                nuevos.append(lsa)
+        if nuevos:
+            self._inundar(nuevos, par)
+    
+    def saltos(self, ip_destino):
+        if ip_destino in self.conectados:
+            return CONECTADO
+        mejor = None
+        primeros = set()
+        for router, metrica in self.anunciantes.get(ip_destino, {}).items():
+            distancia = self.arbol.dist.get(router)
+            if distancia is None or router == self.arbol.raiz:
+                continue
+            total = distancia + metrica
+            if mejor is None or total < mejor:
+                mejor, primeros = total, set(self.arbol.primeros[router])
+            elif total == mejor:
+                primeros |= self.arbol.primeros[router]
+        if not primeros:
+            return None
+        return [par for par, otro in self.adyacencias.items() if otro.nombre in primeros]
+    
+    def obtener_tabla(self):
+        """Filas (destino, métrica, saltos, origen) de la tabla de rutas"""
+        tabla = [{'destino': ip, 'metrica': metrica, 'saltos': [], 'origen': 'conectado'}
+                 for ip, metrica in self.conectados.items()]
+        for ip, anunciantes in self.anunciantes.items():
+            if ip in self.conectados:
+                continue
+            saltos = self.saltos(ip)
+            if saltos:
+                metrica = min(self.arbol.dist[r] + m for r, m in anunciantes.items() if r in self.arbol.dist)
+                tabla.append({'destino': ip, 'metrica': metrica,
+                              'saltos': self._describir(saltos), 'origen': self.PROTOCOLO})
+        return tabla
+
+PROTOCOLOS = {'rip': ProcesoRIP, 'ospf': ProcesoOSPF}
+
+class GestorEnrutamiento:
+    """Procesos de enrutamiento dinámico de una red y los contadores de su
+    plano de control: mensajes y bytes de control, corridas de SPF y tiempo
+    de convergencia (desde cada cambio de topología hasta el último cambio de
+    rutas que provocó)"""
+    
+    def __init__(self, red):
+        self.red = red
+        self.procesos = {}  # Dispositivo -> ProcesoEnrutamiento
+        self.mensajes = {protocolo: 0 for protocolo in PROTOCOLOS}
+        self.bytes = {protocolo: 0 for protocolo in PROTOCOLOS}
+        self.spf_completos = 0
+        self.spf_incrementales = 0
+        self.version_vista = None
+        self.inicio_convergencia = None
+        self.ultimo_cambio_rutas = None
+        self.cambios_rutas = 0  # Cambios de rutas en todos los procesos
+        self.convergencias = []  # Duración en ticks de cada episodio cerrado
+    
+    def activar(self, dispositivo, protocolo):
+        """Crea el proceso del protocolo en el dispositivo (None = estático)"""
+        self.procesos.pop(dispositivo, None)
+        dispositivo.enrutamiento = None
+        if protocolo is not None:
+            dispositivo.enrutamiento = self.procesos[dispositivo] = PROTOCOLOS[protocolo](dispositivo, self)
+    
+    def procesar(self, tick):
+        """Avanza los temporizadores de todos los procesos (al inicio del tick)"""
+        if not self.procesos:
+            return
+        if self.red.version_topologia != self.version_vista:
+            self.version_vista = self.red.version_topologia
+            self._cerrar_convergencia()
+            self.inicio_convergencia = self.ultimo_cambio_rutas = tick
+        for proceso in list(self.procesos.values()):
+            proceso.procesar(tick)
+    
+    def _cerrar_convergencia(self):
+        if self.inicio_convergencia is not None:
+            self.convergencias.append(self.ultimo_cambio_rutas - self.inicio_convergencia)
+    
+    def contar_envio(self, protocolo, tamaño):
+        self.mensajes[protocolo] += 1
+        self.bytes[protocolo] += tamaño
+    
+    def contar_spf(self, completo):
+        if completo:
+            self.spf_completos += 1
+        else:
+            self.spf_incrementales += 1
+    
+    def registrar_cambio_rutas(self, tick):
+        self.ultimo_cambio_rutas = tick
+        self.cambios_rutas += 1
+    
+    def obtener_estadisticas(self):
+        """Contadores del plano de control y tiempos de convergencia"""
+        por_protocolo = {protocolo: 0 for protocolo in PROTOCOLOS}
+        for proceso in self.procesos.values():
+            por_protocolo[proceso.PROTOCOLO] += 1
+        
+        mensajes = sum(self.mensajes.values())
+        datos = sum(d.paquetes_enviados for d in self.red.dispositivos.values())
+        ultima = None
+        if self.inicio_convergencia is not None:
+            ultima = self.ultimo_cambio_rutas - self.inicio_convergencia
+        episodios = self.convergencias + ([ultima] if ultima is not None else [])
+        return {
+            'routers': por_protocolo,
+            'mensajes_control': dict(self.mensajes),
+            'bytes_control': dict(self.bytes),
+            'sobrecarga_control': round(mensajes / (mensajes + datos) * 100, 1) if mensajes else 0,
+            'ultima_convergencia': ultima,
+            'estable_desde': self.red.tick_actual - self.ultimo_cambio_rutas if ultima is not None else None,
+            'convergencia_maxima': max(episodios) if episodios else None,
+            'convergencia_promedio': round(sum(episodios) / len(episodios), 1) if episodios else None,
+            'spf_completos': self.spf_completos,
+            'spf_incrementales': self.spf_incrementales,
+            'nodos_spf': sum(p.arbol.nodos_recalculados for p in self.procesos.values() if isinstance(p, ProcesoOSPF))
+        }
@@ -1,28 +1,41 @@
 # Módulo 5: Estadísticas y Reportes
 # Manejo de estadísticas y generación de reportes
 
+from itertools import islice
+
 class GestorEstadisticas:
     """Gestiona la recolección y presentación de estadísticas"""
     
+    PAGINA_HISTORIAL = 50  # Paquetes mostrados si no se pide 'last <n>'
+    
     def __init__(self, red):
         self.red = red
     
-    def mostrar_historial_dispositivo(self, nombre_dispositivo):
-        """Muestra el historial de paquetes recibidos por un dispositivo"""
+    def mostrar_historial_dispositivo(self, nombre_dispositivo, origen=None, contenido=None, desde_tick=None, ultimos=None):
+        """Muestra los paquetes recibidos por un dispositivo, del más reciente al
+        más antiguo, filtrados con sus índices. Solo se recorre y formatea la
+        página pedida"""
         dispositivo = self.red.obtener_dispositivo(nombre_dispositivo)
         if not dispositivo:
             return f"Error: Dispositivo '{nombre_dispositivo}' no encontrado."
         
-        historial = dispositivo.obtener_historial()
-        if not historial:
+        if dispositivo.historial_recibidos.esta_vacia():
             return f"No hay historial de paquetes para {nombre_dispositivo}."
         
+        limite = ultimos or self.PAGINA_HISTORIAL
+        pagina = list(islice(dispositivo.consultar_historial(origen, contenido, desde_tick), limite + 1))
+        if not pagina:
+            return f"Ningún paquete de {nombre_dispositivo} cumple el filtro."
+        
         resultado = [f"\nHistorial de {nombre_dispositivo}:"]
-        for i, paquete in enumerate(historial, 1):
+        for i, (tick, paquete) in enumerate(pagina[:limite], 1):
             info = paquete.obtener_info_completa()
             ttl_info = f"TTL al llegar: {info['ttl_actual']}" if not info['descartado'] else "TTL expirado"
-            resultado.append(f"{i}) De {info['origen']} a {info['destino']}: \"{info['contenido']}\" | {ttl_info} | Ruta: {info['traza']}")
+            resultado.append(f"{i}) De {info['origen']} a {info['destino']}: \"{info['contenido']}\" | {ttl_info} | Ruta: {info['traza']} | Tick: {tick}")
         
+        if len(pagina) > limite:
+            resultado.append(f"... hay más paquetes ({dispositivo.historial_recibidos.obtener_tamaño()} en el historial); "
+                             f"use 'last <n>' o un filtro")
         return "\n".join(resultado)
     
     def mostrar_colas_dispositivo(self, nombre_dispositivo):
@@ -72,13 +85,249 @@ class GestorEstadisticas:
             resultado.append(f"  Vecinos conectados: {info['vecinos']}")
             resultado.append(f"  Cola entrada: {info['cola_entrada']} paquetes")
             resultado.append(f"  Cola salida: {info['cola_salida']} paquetes")
+            resultado.append(f"  Tasa de servicio: {info['tasa_servicio']:g} {info['unidad_servicio']}/tick")
+            resultado.append(f"  Tipo de cola: {info['tipo_cola']}")
+            resultado.append(f"  Paquetes transmitidos: {info['transmitidos']} | recibidos: {info['recibidos']}")
+            resultado.append(f"  Utilización: {self._calcular_utilizacion(info['transmitidos'])} paquetes/tick")
         
         return "\n".join(resultado)
     
-    def mostrar_estadisticas_globales(self):
-        """Muestra estadísticas globales de la red"""
-        stats = self.red.obtener_estadisticas_globales()
+    def mostrar_alcanzables(self, nombre_dispositivo):
+        """Muestra los dispositivos alcanzables desde un dispositivo"""
+        if not self.red.obtener_dispositivo(nombre_dispositivo):
+            return f"Error: Dispositivo '{nombre_dispositivo}' no encontrado."
+        
+        alcanzables = self.red.obtener_alcanzables(nombre_dispositivo)
+        if not alcanzables:
+            return f"Ningún dispositivo es alcanzable desde {nombre_dispositivo}."
+        return f"\nAlcanzables desde {nombre_dispositivo} ({len(alcanzables)}):\n" + "\n".join(f"  - {nombre}" for nombre in alcanzables)
+    
+    def mostrar_arp_dispositivo(self, nombre_dispositivo):
+        """Muestra la caché ARP de un dispositivo y su tasa de aciertos"""
+        dispositivo = self.red.obtener_dispositivo(nombre_dispositivo)
+        if not dispositivo:
+            return f"Error: Dispositivo '{nombre_dispositivo}' no encontrado."
         
+        entradas = dispositivo.cache_arp.obtener_entradas(self.red.tick_actual)
+        stats = dispositivo.cache_arp.obtener_estadisticas()
+        resultado = [f"\nCaché ARP de {nombre_dispositivo}:"]
+        
+        if entradas:
+            for entrada in entradas:
+                resultado.append(f"  {entrada['ip']:<16} via {', '.join(entrada['saltos'])} (expira en {entrada['expira_en']} ticks)")
+        else:
+            resultado.append("  Caché vacía")
+        
+        resultado.append(f"\nEntradas: {stats['entradas']}/{stats['capacidad']} | Paquetes en espera: {stats['pendientes']}")
+        resultado.append(f"Aciertos: {stats['aciertos']} | Fallos: {stats['fallos']} | Tasa de aciertos: {stats['tasa_aciertos']}%")
+        resultado.append(f"Solicitudes: {stats['solicitudes']} | Expiradas: {stats['expiradas']} | Desalojadas: {stats['desalojadas']}")
+        
+        return "\n".join(resultado)
+    
+    def mostrar_rutas_dispositivo(self, nombre_dispositivo):
+        """Muestra la tabla del protocolo de enrutamiento de un dispositivo"""
+        dispositivo = self.red.obtener_dispositivo(nombre_dispositivo)
+        if not dispositivo:
+            return f"Error: Dispositivo '{nombre_dispositivo}' no encontrado."
+        
+        proceso = dispositivo.enrutamiento
+        if proceso is None:
+            return f"{nombre_dispositivo} usa rutas estáticas (calculadas sobre la topología)"
+        
+        resultado = [f"\nTabla de rutas {proceso.PROTOCOLO.upper()} de {nombre_dispositivo}:"]
+        for ruta in proceso.obtener_tabla():
+            saltos = ', '.join(ruta['saltos']) if ruta['saltos'] else 'directo'
+            resultado.append(f"  {ruta['destino']:<16} métrica {ruta['metrica']:<3} [{ruta['origen']}] via {saltos}")
+        resultado.append(f"\nVecinos: {len(proceso.adyacencias)} | Cambios de rutas: {proceso.cambios_rutas}")
+        return "\n".join(resultado)
+    
+    def mostrar_rendimiento(self, nombre_dispositivo=None):
+        """Muestra aciertos y fallos de las cachés de flujos y ARP por dispositivo"""
+        if nombre_dispositivo:
+            if not self.red.obtener_dispositivo(nombre_dispositivo):
+                return f"Error: Dispositivo '{nombre_dispositivo}' no encontrado."
+            nombres = [nombre_dispositivo]
+        else:
+            nombres = list(self.red.dispositivos.keys())
+        
+        resultado = ["\n=== RENDIMIENTO DE REENVÍO ==="]
+        resultado.append(f"Época de topología: {self.red.version_topologia} | Recompilaciones CSR: {self.red.recompilaciones_topologia}")
+        resultado.append(f"Componentes conexas: {self.red.componentes.contar()} | Reconstrucciones: {self.red.componentes.reconstrucciones}")
+        
+        aciertos = fallos = 0
+        for nombre in nombres:
+            stats = self.red.obtener_dispositivo(nombre).obtener_estadisticas()
+            flujos = stats['flujos']
+            arp = stats['arp']
+            aciertos += flujos['aciertos']
+            fallos += flujos['fallos']
+            resultado.append(f"\n{nombre} ({stats['tipo']}):")
+            resultado.append(f"  Caché de flujos: {flujos['entradas']}/{flujos['capacidad']} | Aciertos: {flujos['aciertos']} | "
+                             f"Fallos: {flujos['fallos']} | Tasa de aciertos: {flujos['tasa_aciertos']}%")
+            resultado.append(f"  Invalidadas: {flujos['invalidadas']} | Desalojadas: {flujos['desalojadas']}")
+            resultado.append(f"  Caché ARP: Aciertos: {arp['aciertos']} | Fallos: {arp['fallos']} | Tasa de aciertos: {arp['tasa_aciertos']}%")
+        
+        consultas = aciertos + fallos
+        tasa = round(aciertos / consultas * 100, 1) if consultas else 0
+        resultado.append(f"\nTotal caché de flujos: {aciertos} aciertos, {fallos} fallos ({tasa}%)")
+        return "\n".join(resultado)
+    
+    def formatear_estado_bucle(self, estado):
+        """Da formato al estado del bucle de simulación en segundo plano"""
+        objetivo = f"{estado['tasa_objetivo']:g} ticks/s" if estado['tasa_objetivo'] else "sin límite"
+        resultado = [f"Simulación {'en curso' if estado['activo'] else 'detenida'} (objetivo: {objetivo})"]
+        resultado.append(f"  Ticks: {estado['ticks']} en {estado['segundos']} s | Tasa lograda: {estado['tasa_lograda']} ticks/s "
+                         f"(reciente: {estado['tasa_reciente']})")
+        resultado.append(f"  Costo por tick: {estado['ms_por_tick']} ms | Deriva: {estado['deriva_ms']} ms "
+                         f"(máxima: {estado['deriva_maxima_ms']} ms)")
+        if estado['error']:
+            resultado.append(f"  Detenida por error: {estado['error']}")
+        return "\n".join(resultado)
+    
+    def mostrar_enlaces(self):
+        """Muestra los enlaces con su capacidad, paquetes en vuelo y utilización"""
+        enlaces = self.red.obtener_estado_enlaces()
+        if not enlaces:
+            return "No hay enlaces establecidos."
+        
+        resultado = ["\n=== ENLACES ==="]
+        for enlace in enlaces:
+            if enlace['ancho_banda']:
+                capacidad = f"{enlace['ancho_banda']:g} {enlace['unidad']}/tick"
+            else:
+                capacidad = "ilimitado"
+            resultado.append(f"\n{enlace['conexion']}")
+            resultado.append(f"  Ancho de banda: {capacidad} | Retardo: {enlace['retardo']} ticks | Pérdida: {enlace['perdida'] * 100:g}%")
+            for sentido in enlace['sentidos']:
+                utilizacion = f"{sentido['utilizacion']}%" if sentido['utilizacion'] is not None else "n/a"
+                resultado.append(f"  {sentido['origen']} -> {sentido['destino']}: {sentido['transmitidos']} transmitidos "
+                                 f"({sentido['por_tick']}/tick) | En vuelo: {sentido['en_vuelo']} | "
+                                 f"Perdidos: {sentido['perdidos']} | Utilización: {utilizacion}")
+        
+        return "\n".join(resultado)
+    
+    def mostrar_pools(self):
+        """Muestra aciertos y fallos de los pools de reciclaje"""
+        from estructuras_datos import pool_nodos
+        
+        resultado = ["\n=== POOLS DE RECICLAJE ==="]
+        for pool in (self.red.pool_paquetes, pool_nodos):
+            stats = pool.obtener_estadisticas()
+            estado = "habilitado" if stats['habilitado'] else "deshabilitado"
+            resultado.append(f"\nPool de {stats['nombre']} ({estado}):")
+            resultado.append(f"  Libres: {stats['libres']}/{stats['capacidad']}")
+            resultado.append(f"  Aciertos: {stats['aciertos']} | Fallos: {stats['fallos']} | Tasa de aciertos: {stats['tasa_aciertos']}%")
+            resultado.append(f"  Devueltos: {stats['devueltos']} | Desechados: {stats['desechados']}")
+        
+        return "\n".join(resultado)
+    
+    def mostrar_flujos(self):
+        """Muestra la tasa asignada y el cuello de botella de cada flujo del modo fluido"""
+        fluido = self.red.fluido
+        stats = fluido.obtener_estadisticas()
+        if not stats['flujos'] and not stats['terminados']:
+            return "No hay flujos (active el modo fluido con 'fluid on' y use 'send')"
+        
+        resultado = ["\n=== FLUJOS ==="]
+        for flujo in fluido.obtener_reporte():
+            demanda = 'max' if flujo['demanda'] == float('inf') else f"{flujo['demanda']:g}"
+            resultado.append(f"\nFlujo {flujo['id']}: {flujo['origen']} -> {flujo['destino']} (demanda {demanda} paquetes/tick)")
+            if flujo['razon']:
+                resultado.append(f"  Sin ruta: {flujo['razon']}")
+                continue
+            resultado.append(f"  Tasa: {flujo['tasa']:g} paquetes/tick ({flujo['bytes_por_tick']:g} bytes/tick)")
+            resultado.append(f"  Limitado por: {flujo['cuello'] or 'su demanda'}")
+            resultado.append(f"  Ruta: {' → '.join(flujo['ruta'])}")
+            fin = f" | Termina en el tick {flujo['fin']}" if flujo['fin'] is not None else ""
+            resultado.append(f"  Transferidos: {flujo['volumen']:g} paquetes{fin}")
+        
+        cuellos = fluido.obtener_cuellos()
+        if cuellos:
+            resultado.append("\nCuellos de botella:")
+            for cuello in cuellos:
+                resultado.append(f"  {cuello['recurso']}: {cuello['uso']:g}/{cuello['capacidad']:g} por tick | "
+                                 f"Limita {cuello['flujos_limitados']} de {cuello['flujos']} flujos")
+        
+        for recurso in fluido.obtener_sobresuscritos():
+            resultado.append(f"Aviso: {recurso['recurso']} sobresuscrito ({recurso['uso']:g}/{recurso['capacidad']:g} por tick)")
+        
+        resultado.append(f"\nActivos: {stats['flujos']} | Terminados: {stats['terminados']} | "
+                         f"Tasa total: {stats['tasa_total']:g} paquetes/tick | Transferidos: {stats['volumen']:g} paquetes")
+        resultado.append(f"Recálculos: {stats['recalculos_completos']} completos, {stats['recalculos_incrementales']} incrementales "
+                         f"({stats['flujos_recalculados']} flujos recalculados) | Sin recalcular: {stats['asignaciones_directas']}")
+        return "\n".join(resultado)
+    
+    def mostrar_memoria(self, muestra=None):
+        """Muestra el costo base por interfaz y dispositivo medido con tracemalloc"""
+        import memoria
+        
+        reporte = memoria.obtener_reporte(self.red, muestra or memoria.MUESTRA_POR_DEFECTO)
+        base = reporte['linea_base']
+        red = reporte['red']
+        
+        resultado = ["\n=== MEMORIA ==="]
+        resultado.append(f"Línea base (tracemalloc, muestra de {base['muestra']}):")
+        resultado.append(f"  Interfaz nueva: {base['interfaz']} bytes | "
+                         f"Colas, vecinos y enlaces diferidos: {base['interfaz_diferidas']} bytes hasta el primer uso")
+        resultado.append(f"  Dispositivo nuevo: {base['dispositivo']} bytes | "
+                         f"Historial diferido: {base['dispositivo_diferidas']} bytes hasta el primer paquete")
+        resultado.append(f"\nRed: {red['interfaces']} interfaces | Con vecinos: {red['con_vecinos']} | "
+                         f"Con enlaces: {red['con_enlaces']} | Con colas: {red['con_colas']}")
+        resultado.append(f"     {red['dispositivos']} dispositivos | Con historial: {red['con_historial']}")
+        if reporte['trazado']:
+            resultado.append(f"\nMemoria trazada: {reporte['trazado']['actual'] / 1024:.1f} KiB "
+                             f"(pico {reporte['trazado']['pico'] / 1024:.1f} KiB)")
+        
+        return "\n".join(resultado)
+    
+    def mostrar_fallas(self):
+        """Muestra el efecto de cada evento del calendario de fallas"""
+        plan = self.red.plan_fallas
+        if not plan:
+            return "No hay un calendario de fallas"
+        
+        resultado = ["\n=== CALENDARIO DE FALLAS ==="]
+        for evento in plan.obtener_reporte():
+            linea = f"Tick {evento['tick']}: {evento['accion']} {evento['objetivo']} [{evento['estado']}]"
+            if evento['estado'] == 'aplicado':
+                if evento['recuperado_en'] is not None:
+                    recuperacion = f"recuperado en {evento['recuperado_en']} ticks"
+                elif not evento['linea_base']:
+                    recuperacion = "sin tráfico previo para comparar"
+                else:
+                    recuperacion = "sin recuperar"
+                linea += f" - perdidos: {evento['perdidos']}, {recuperacion} (línea base {evento['linea_base']}/tick)"
+            resultado.append(linea)
+        return "\n".join(resultado)
+    
+    def mostrar_resumen_ejecucion(self):
+        """Muestra la huella de la corrida para compararla con otra"""
+        resumen = self.red.resumen.obtener_resumen()
+        semilla = self.red.semilla if self.red.semilla is not None else "ninguna (no reproducible)"
+        return "\n".join([
+            "\n=== RESUMEN DE EJECUCIÓN ===",
+            f"Semilla: {semilla}",
+            f"Ticks: {self.red.tick_actual} | Eventos: {resumen['eventos']}",
+            f"Digest: {resumen['digest']}"
+        ])
+    
+    def mostrar_bifurcaciones(self):
+        """Muestra las variantes de la topología y cuál está activa"""
+        resultado = ["\n=== BIFURCACIONES ==="]
+        for rama in self.red.bifurcaciones.obtener_ramas():
+            marca = "*" if rama['activa'] else " "
+            origen = f" (de {rama['padre']})" if rama['padre'] else ""
+            resultado.append(f"{marca} {rama['nombre']}{origen}: {rama['cambios']} cambios")
+        return "\n".join(resultado)
+    
+    def _calcular_utilizacion(self, paquetes):
+        """Promedio de paquetes por tick desde el inicio de la simulación"""
+        if self.red.tick_actual == 0:
+            return 0
+        return round(paquetes / self.red.tick_actual, 2)
+    
+    def formatear_estadisticas_globales(self, stats):
+        """Da formato a un diccionario de estadísticas globales (de cualquier motor)"""
         resultado = ["\n=== ESTADÍSTICAS DE RED ==="]
         resultado.append(f"Total paquetes enviados: {stats['paquetes_totales_enviados']}")
         resultado.append(f"Paquetes entregados: {stats['paquetes_entregados']}")
@@ -89,6 +338,54 @@ class GestorEstadisticas:
         if stats['dispositivo_mas_activo']:
             resultado.append(f"Dispositivo más activo: {stats['dispositivo_mas_activo']} ({stats['max_paquetes_procesados']} paquetes procesados)")
         
+        return resultado
+    
+    def _formatear_metricas(self):
+        """Latencia en ticks, series del último tick y picos de cola"""
+        resumen = self.red.metricas.obtener_resumen()
+        resultado = ["\n=== MÉTRICAS POR TICK ==="]
+        resultado.append(f"Ticks registrados: {resumen['ticks']} (ventana de {resumen['ventana']})")
+        resultado.append(f"Último tick: {resumen['entregados_ultimo_tick']} entregados, "
+                         f"{resumen['descartados_ultimo_tick']} descartados, {resumen['en_vuelo']} en vuelo "
+                         f"(pico en la ventana: {resumen['pico_en_vuelo']})")
+        if resumen['latencia_muestras']:
+            resultado.append(f"Latencia (ticks): p50 ≤ {resumen['latencia_p50']} | p95 ≤ {resumen['latencia_p95']} | "
+                             f"p99 ≤ {resumen['latencia_p99']} | máx {resumen['latencia_maxima']} | "
+                             f"promedio {resumen['latencia_promedio']}")
+        else:
+            resultado.append("Latencia (ticks): sin entregas registradas")
+        
+        picos = self.red.metricas.obtener_picos_colas()
+        if picos:
+            resultado.append("Picos de profundidad de cola:")
+            for nombre, pico, p95 in picos:
+                resultado.append(f"  {nombre}: pico {pico} | p95 ≤ {p95}")
+        return resultado
+    
+    def _formatear_enrutamiento(self):
+        """Costo del plano de control y tiempos de convergencia"""
+        stats = self.red.enrutamiento.obtener_estadisticas()
+        resultado = ["\n=== ENRUTAMIENTO DINÁMICO ==="]
+        resultado.append("Routers: " + ", ".join(f"{p.upper()} {n}" for p, n in stats['routers'].items() if n))
+        resultado.append("Mensajes de control: " + ", ".join(
+            f"{p.upper()} {stats['mensajes_control'][p]} ({stats['bytes_control'][p]} bytes)" for p, n in stats['routers'].items() if n))
+        resultado.append(f"Sobrecarga de control: {stats['sobrecarga_control']}% de las transmisiones")
+        if stats['ultima_convergencia'] is not None:
+            resultado.append(f"Última convergencia: {stats['ultima_convergencia']} ticks (sin cambios hace {stats['estable_desde']}) | "
+                             f"Máxima: {stats['convergencia_maxima']} | Promedio: {stats['convergencia_promedio']}")
+        if stats['spf_completos'] or stats['spf_incrementales']:
+            resultado.append(f"SPF: {stats['spf_completos']} completos, {stats['spf_incrementales']} incrementales "
+                             f"({stats['nodos_spf']} nodos recalculados)")
+        return resultado
+    
+    def mostrar_estadisticas_globales(self):
+        """Muestra estadísticas globales de la red"""
+        stats = self.red.obtener_estadisticas_globales()
+        resultado = self.formatear_estadisticas_globales(stats)
+        resultado.extend(self._formatear_metricas())
+        if self.red.enrutamiento.procesos:
+            resultado.extend(self._formatear_enrutamiento())
+        
         # Estadísticas por dispositivo
         resultado.append("\n=== ESTADÍSTICAS POR DISPOSITIVO ===")
         for dispositivo in self.red.dispositivos.values():
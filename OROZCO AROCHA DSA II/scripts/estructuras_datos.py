@@ -1,14 +1,38 @@
 # Módulo 3: Estructuras de Datos
 # Implementación de listas enlazadas, pilas y colas desde cero
 
+from pool import PoolObjetos
+
 class Nodo:
     """Nodo básico para estructuras enlazadas"""
+    __slots__ = ('dato', 'siguiente')
+    
     def __init__(self, dato):
         self.dato = dato
         self.siguiente = None
 
+# Lista libre compartida por Cola y Pila para no crear un Nodo por elemento.
+# Se habilita junto con el pool de paquetes ('pool on')
+pool_nodos = PoolObjetos('nodos', habilitado=False)
+
+def _nuevo_nodo(dato):
+    """Toma un nodo de la lista libre o crea uno nuevo"""
+    nodo = pool_nodos.tomar()
+    if nodo is None:
+        return Nodo(dato)
+    nodo.dato = dato
+    return nodo
+
+def _liberar_nodo(nodo):
+    """Limpia un nodo retirado y lo devuelve a la lista libre"""
+    nodo.dato = None
+    nodo.siguiente = None
+    pool_nodos.devolver(nodo)
+
 class ListaEnlazada:
     """Lista enlazada simple para almacenar vecinos de interfaces"""
+    __slots__ = ('cabeza', 'tamaño')
+    
     def __init__(self):
         self.cabeza = None
         self.tamaño = 0
@@ -64,6 +88,15 @@ class ListaEnlazada:
     
     def esta_vacia(self):
         return self.cabeza is None
+    
+    def __len__(self):
+        return self.tamaño
+    
+    def __iter__(self):
+        actual = self.cabeza
+        while actual:
+            yield actual.dato
+            actual = actual.siguiente
 
 class Cola:
     """Cola FIFO para gestionar paquetes entrantes y salientes"""
@@ -74,7 +107,7 @@ class Cola:
     
     def encolar(self, dato):
         """Agrega un elemento al final de la cola"""
-        nuevo_nodo = Nodo(dato)
+        nuevo_nodo = _nuevo_nodo(dato)
         if not self.final:
             self.frente = self.final = nuevo_nodo
         else:
@@ -87,13 +120,40 @@ class Cola:
         if not self.frente:
             return None
         
-        dato = self.frente.dato
-        self.frente = self.frente.siguiente
+        nodo = self.frente
+        dato = nodo.dato
+        self.frente = nodo.siguiente
         if not self.frente:
             self.final = None
         self.tamaño -= 1
+        _liberar_nodo(nodo)
         return dato
     
+    def encolar_lote(self, datos):
+        """Agrega varios elementos al final de la cola en orden"""
+        for dato in datos:
+            self.encolar(dato)
+    
+    def desencolar_lote(self, n):
+        """Remueve y retorna hasta n elementos del frente en una sola pasada"""
+        lote = []
+        actual = self.frente
+        while actual and len(lote) < n:
+            lote.append(actual.dato)
+            siguiente = actual.siguiente
+            _liberar_nodo(actual)
+            actual = siguiente
+        
+        self.frente = actual
+        if not actual:
+            self.final = None
+        self.tamaño -= len(lote)
+        return lote
+    
+    def ver_frente(self):
+        """Retorna el primer elemento sin removerlo"""
+        return self.frente.dato if self.frente else None
+    
     def esta_vacia(self):
         return self.frente is None
     
@@ -108,6 +168,16 @@ class Cola:
             elementos.append(actual.dato)
             actual = actual.siguiente
         return elementos
+    
+    def __len__(self):
+        return self.tamaño
+    
+    def __iter__(self):
+        """Recorre del frente al final sin copiar la cola"""
+        actual = self.frente
+        while actual:
+            yield actual.dato
+            actual = actual.siguiente
 
 class Pila:
     """Pila LIFO para historial de mensajes recibidos"""
@@ -117,7 +187,7 @@ class Pila:
     
     def apilar(self, dato):
         """Agrega un elemento a la cima de la pila"""
-        nuevo_nodo = Nodo(dato)
+        nuevo_nodo = _nuevo_nodo(dato)
         nuevo_nodo.siguiente = self.cima
         self.cima = nuevo_nodo
         self.tamaño += 1
@@ -127,11 +197,38 @@ class Pila:
         if not self.cima:
             return None
         
-        dato = self.cima.dato
-        self.cima = self.cima.siguiente
+        nodo = self.cima
+        dato = nodo.dato
+        self.cima = nodo.siguiente
         self.tamaño -= 1
+        _liberar_nodo(nodo)
         return dato
     
+    def recortar(self, n):
+        """Conserva solo los n elementos más recientes y retorna los removidos"""
+        if self.tamaño <= n:
+            return []
+        
+        if n == 0:
+            ultimo_conservado = None
+            actual = self.cima
+            self.cima = None
+        else:
+            ultimo_conservado = self.cima
+            for _ in range(n - 1):
+                ultimo_conservado = ultimo_conservado.siguiente
+            actual = ultimo_conservado.siguiente
+            ultimo_conservado.siguiente = None
+        
+        removidos = []
+        while actual:
+            removidos.append(actual.dato)
+            siguiente = actual.siguiente
+            _liberar_nodo(actual)
+            actual = siguiente
+        self.tamaño = n
+        return removidos
+    
     def obtener_cima(self):
         """Retorna el elemento de la cima sin removerlo"""
         return self.cima.dato if self.cima else None
@@ -150,3 +247,200 @@ class Pila:
             elementos.append(actual.dato)
             actual = actual.siguiente
         return elementos
+    
+    def __len__(self):
+        return self.tamaño
+    
+    def __iter__(self):
+        """Recorre desde la cima hacia abajo sin copiar la pila"""
+        actual = self.cima
+        while actual:
+            yield actual.dato
+            actual = actual.siguiente
+
+class ColaCircular:
+    """Cola FIFO sobre un arreglo circular: sin un nodo por elemento y con
+    crecimiento amortizado O(1). Misma interfaz que Cola"""
+    def __init__(self, capacidad=8):
+        self.datos = [None] * capacidad
+        self.inicio = 0
+        self.tamaño = 0
+    
+    def _crecer(self, minimo):
+        """Duplica la capacidad (o más) copiando los elementos en orden"""
+        capacidad = max(2 * len(self.datos), minimo)
+        self.datos = list(self) + [None] * (capacidad - self.tamaño)
+        self.inicio = 0
+    
+    def encolar(self, dato):
+        """Agrega un elemento al final de la cola"""
+        if self.tamaño == len(self.datos):
+            self._crecer(self.tamaño + 1)
+        self.datos[(self.inicio + self.tamaño) % len(self.datos)] = dato
+        self.tamaño += 1
+    
+    def encolar_lote(self, datos):
+        """Agrega varios elementos al final con a lo sumo dos copias de bloque"""
+        datos = list(datos)
+        cantidad = len(datos)
+        if self.tamaño + cantidad > len(self.datos):
+            self._crecer(self.tamaño + cantidad)
+        
+        capacidad = len(self.datos)
+        posicion = (self.inicio + self.tamaño) % capacidad
+        primer_tramo = min(cantidad, capacidad - posicion)
+        self.datos[posicion:posicion + primer_tramo] = datos[:primer_tramo]
+        self.datos[:cantidad - primer_tramo] = datos[primer_tramo:]
+        self.tamaño += cantidad
+    
+    def desencolar(self):
+        """Remueve y retorna el primer elemento de la cola"""
+        if not self.tamaño:
+            return None
+        
+        dato = self.datos[self.inicio]
+        self.datos[self.inicio] = None
+        self.inicio = (self.inicio + 1) % len(self.datos)
+        self.tamaño -= 1
+        return dato
+    
+    def desencolar_lote(self, n):
+        """Remueve y retorna hasta n elementos del frente con copias de bloque"""
+        cantidad = min(n, self.tamaño)
+        if cantidad <= 0:
+            return []
+        
+        capacidad = len(self.datos)
+        primer_tramo = min(cantidad, capacidad - self.inicio)
+        fin = self.inicio + primer_tramo
+        lote = self.datos[self.inicio:fin]
+        self.datos[self.inicio:fin] = [None] * primer_tramo
+        resto = cantidad - primer_tramo
+        if resto:
+            lote.extend(self.datos[:resto])
+            self.datos[:resto] = [None] * resto
+        
+        self.inicio = (self.inicio + cantidad) % capacidad
+        self.tamaño -= cantidad
+        return lote
+    
+    def ver_frente(self):
+        """Retorna el primer elemento sin removerlo"""
+        return self.datos[self.inicio] if self.tamaño else None
+    
+    def esta_vacia(self):
+        return self.tamaño == 0
+    
+    def obtener_tamaño(self):
+        return self.tamaño
+    
+    def obtener_elementos(self):
+        """Retorna todos los elementos sin removerlos"""
+        return list(self)
+    
+    def __len__(self):
+        return self.tamaño
+    
+    def __iter__(self):
+        """Recorre del frente al final sin copiar la cola"""
+        capacidad = len(self.datos)
+        for i in range(self.tamaño):
+            yield self.datos[(self.inicio + i) % capacidad]
+
+class PilaArreglo:
+    """Pila LIFO sobre un arreglo dinámico. Misma interfaz que Pila"""
+    def __init__(self):
+        self.datos = []
+    
+    @property
+    def tamaño(self):
+        return len(self.datos)
+    
+    def apilar(self, dato):
+        """Agrega un elemento a la cima de la pila"""
+        self.datos.append(dato)
+    
+    def desapilar(self):
+        """Remueve y retorna el elemento de la cima"""
+        return self.datos.pop() if self.datos else None
+    
+    def recortar(self, n):
+        """Conserva solo los n elementos más recientes y retorna los removidos"""
+        exceso = len(self.datos) - n
+        if exceso <= 0:
+            return []
+        removidos = self.datos[:exceso]
+        del self.datos[:exceso]
+        return removidos
+    
+    def obtener_cima(self):
+        """Retorna el elemento de la cima sin removerlo"""
+        return self.datos[-1] if self.datos else None
+    
+    def esta_vacia(self):
+        return not self.datos
+    
+    def obtener_tamaño(self):
+        return len(self.datos)
+    
+    def obtener_elementos(self):
+        """Retorna todos los elementos desde la cima hacia abajo"""
+        return self.datos[::-1]
+    
+    def __len__(self):
+        return len(self.datos)
+    
+    def __iter__(self):
+        """Recorre desde la cima hacia abajo sin copiar la pila"""
+        return reversed(self.datos)
+
+class Vacia:
+    """Estructura vacía de solo lectura que responde como una lista, cola o
+    pila sin elementos. Se comparte entre todos los objetos que todavía no
+    crearon la suya; no tiene métodos para agregar"""
+    __slots__ = ()
+    
+    def esta_vacia(self):
+        return True
+    
+    def obtener_tamaño(self):
+        return 0
+    
+    def buscar(self, dato):
+        return False
+    
+    def ver_frente(self):
+        return None
+    
+    def obtener_cima(self):
+        return None
+    
+    def desencolar(self):
+        return None
+    
+    def desapilar(self):
+        return None
+    
+    def desencolar_lote(self, n):
+        return []
+    
+    def recortar(self, n):
+        return []
+    
+    def obtener_elementos(self):
+        return []
+    
+    def obtener_lista(self):
+        return []
+    
+    def __len__(self):
+        return 0
+    
+    def __iter__(self):
+        return iter(())
+
+VACIA = Vacia()
+
+# Implementaciones disponibles para colas e historiales
+TIPOS_COLA = {'enlazada': Cola, 'circular': ColaCircular}
+TIPOS_PILA = {'enlazada': Pila, 'arreglo': PilaArreglo}
@@ -0,0 +1,112 @@
+# Módulo 18: Canal de eventos
+# Publicación no bloqueante de eventos de paquetes hacia suscriptores acotados
+
+import time
+from collections import deque
+
+TIPOS_EVENTO = ('enviado', 'reenviado', 'entregado', 'descartado')
+
+class Evento:
+    """Algo que le ocurrió a un paquete en un dispositivo durante un tick"""
+    
+    def __init__(self, tick, tipo, dispositivo, paquete, detalle=None):
+        self.tick = tick
+        self.tipo = tipo
+        self.dispositivo = dispositivo
+        self.id_paquete = paquete.id_unico
+        self.origen = paquete.origen
+        self.destino = paquete.destino
+        self.detalle = detalle
+    
+    def formatear(self):
+        texto = f"[t={self.tick}] {self.dispositivo} {self.tipo} {self.id_paquete} {self.origen} -> {self.destino}"
+        return f"{texto} ({self.detalle})" if self.detalle else texto
+
+class Suscripcion:
+    """Cola acotada de eventos filtrados para un consumidor.
+    
+    Si el consumidor se atrasa y la cola se llena, los eventos nuevos se
+    cuentan como perdidos en vez de frenar al productor. Al leer, se
+    emiten como máximo max_por_segundo líneas y el resto se resume"""
+    
+    def __init__(self, dispositivo=None, destino=None, tipo=None, max_por_segundo=20, capacidad=1024):
+        self.dispositivo = dispositivo
+        self.destino = destino
+        self.tipo = tipo
+        self.max_por_segundo = max_por_segundo
+        self.cola = deque()
+        self.capacidad = capacidad
+        self.perdidos = 0  # Descartados por cola llena
+        self.suprimidos = 0  # Descartados por el límite de líneas por segundo
+        self.mostrados = 0
+        self._inicio_ventana = time.monotonic()
+        self._en_ventana = 0
+        self._suprimidos_ventana = 0
+        self._perdidos_informados = 0
+    
+    def acepta(self, evento):
+        return ((self.dispositivo is None or evento.dispositivo == self.dispositivo)
+                and (self.destino is None or evento.destino == self.destino)
+                and (self.tipo is None or evento.tipo == self.tipo))
+    
+    def ofrecer(self, evento):
+        """Encola el evento si pasa el filtro; nunca bloquea"""
+        if not self.acepta(evento):
+            return
+        if len(self.cola) >= self.capacidad:
+            self.perdidos += 1
+            return
+        self.cola.append(evento)
+    
+    def leer(self, final=False):
+        """Retira los eventos pendientes y retorna las líneas a mostrar.
+        Con final=True también resume lo suprimido en la ventana en curso"""
+        lineas = []
+        while self.cola:
+            evento = self.cola.popleft()
+            self._renovar_ventana(lineas)
+            if self._en_ventana < self.max_por_segundo:
+                lineas.append(evento.formatear())
+                self._en_ventana += 1
+                self.mostrados += 1
+            else:
+                self._suprimidos_ventana += 1
+                self.suprimidos += 1
+        self._renovar_ventana(lineas, final)
+        
+        if self.perdidos > self._perdidos_informados:
+            lineas.append(f"... {self.perdidos - self._perdidos_informados} eventos perdidos (consumidor atrasado)")
+            self._perdidos_informados = self.perdidos
+        return lineas
+    
+    def _renovar_ventana(self, lineas, forzar=False):
+        """Cierra la ventana de un segundo, resumiendo lo suprimido en ella"""
+        ahora = time.monotonic()
+        if ahora - self._inicio_ventana < 1.0 and not forzar:
+            return
+        if self._suprimidos_ventana:
+            lineas.append(f"... {self._suprimidos_ventana} eventos suprimidos")
+        self._inicio_ventana = ahora
+        self._en_ventana = 0
+        self._suprimidos_ventana = 0
+
+class CanalEventos:
+    """Reparte los eventos de la simulación entre las suscripciones activas.
+    Sin suscriptores, publicar no hace nada y los productores ni siquiera
+    construyen el evento (ver Dispositivo._publicar_evento)"""
+    
+    def __init__(self):
+        self.suscripciones = ()  # Se reemplaza completa: el productor la recorre sin cerrojo
+        self.publicados = 0
+    
+    def suscribir(self, suscripcion):
+        self.suscripciones = self.suscripciones + (suscripcion,)
+        return suscripcion
+    
+    def desuscribir(self, suscripcion):
+        self.suscripciones = tuple(s for s in self.suscripciones if s is not suscripcion)
+    
+    def publicar(self, evento):
+        self.publicados += 1
+        for suscripcion in self.suscripciones:
+            suscripcion.ofrecer(evento)
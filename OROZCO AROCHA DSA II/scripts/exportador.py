@@ -0,0 +1,140 @@
+# Módulo 16: Exportación de métricas
+# Servidor HTTP local en formato de texto de Prometheus
+
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def _escapar(valor):
+    """Escapa el valor de una etiqueta según el formato de exposición"""
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class _ManejadorMetricas(BaseHTTPRequestHandler):
+    """Responde GET /metrics con la última instantánea publicada"""
+    
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        cuerpo = self.server.exportador.texto.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+    
+    def log_message(self, formato, *argumentos):
+        """Silencia el registro por petición para no ensuciar el CLI"""
+
+class ExportadorMetricas:
+    """Sirve las métricas de la red en un hilo HTTP propio ligado a localhost.
+    
+    La simulación publica una instantánea de texto una vez por tick (Red.procesar_tick
+    llama a publicar); el hilo HTTP solo lee la última referencia publicada,
+    así que nunca bloquea ni recorre la red mientras esta avanza"""
+    
+    PREFIJO = 'simred'
+    
+    def __init__(self, red, puerto=9108, direccion='127.0.0.1'):
+        self.red = red
+        self.puerto = puerto
+        self.direccion = direccion
+        self.texto = ''
+        self.publicaciones = 0
+        self._tiempos = deque(maxlen=64)  # (instante, tick) de las últimas publicaciones
+        self._servidor = None
+        self._hilo = None
+    
+    def iniciar(self):
+        """Abre el puerto y arranca el hilo del servidor"""
+        self._servidor = ThreadingHTTPServer((self.direccion, self.puerto), _ManejadorMetricas)
+        self._servidor.daemon_threads = True
+        self._servidor.exportador = self
+        self.puerto = self._servidor.server_address[1]
+        self.publicar()
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, name='exportador-metricas', daemon=True)
+        self._hilo.start()
+    
+    def detener(self):
+        """Detiene el servidor y libera el puerto"""
+        if self._servidor:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+            self._hilo = None
+    
+    def activo(self):
+        return self._servidor is not None
+    
+    def tasa_ticks(self):
+        """Ticks por segundo de pared en la ventana de publicaciones recientes"""
+        if len(self._tiempos) < 2:
+            return 0.0
+        (t0, tick0), (t1, tick1) = self._tiempos[0], self._tiempos[-1]
+        return (tick1 - tick0) / (t1 - t0) if t1 > t0 else 0.0
+    
+    def publicar(self):
+        """Genera la instantánea del tick actual y la deja visible para el hilo HTTP"""
+        self._tiempos.append((time.perf_counter(), self.red.tick_actual))
+        self.publicaciones += 1
+        # Asignar la referencia es atómico: un lector ve la instantánea vieja o la nueva
+        self.texto = self._generar_texto()
+    
+    def _generar_texto(self):
+        """Arma el texto de exposición a partir de las estadísticas de la red"""
+        lineas = []
+        p = self.PREFIJO
+        
+        def metrica(nombre, tipo, ayuda, muestras):
+            lineas.append(f"# HELP {p}_{nombre} {ayuda}")
+            lineas.append(f"# TYPE {p}_{nombre} {tipo}")
+            for etiquetas, valor in muestras:
+                if etiquetas:
+                    texto_etiquetas = ",".join(f'{clave}="{_escapar(v)}"' for clave, v in etiquetas.items())
+                    lineas.append(f"{p}_{nombre}{{{texto_etiquetas}}} {valor}")
+                else:
+                    lineas.append(f"{p}_{nombre} {valor}")
+        
+        stats = self.red.obtener_estadisticas_globales()
+        metrica('tick', 'gauge', 'Tick de simulación actual.', [({}, self.red.tick_actual)])
+        metrica('ticks_por_segundo', 'gauge', 'Ticks simulados por segundo real.', [({}, round(self.tasa_ticks(), 3))])
+        metrica('paquetes_enviados_total', 'counter', 'Paquetes enviados por todos los dispositivos.',
+                [({}, stats['paquetes_totales_enviados'])])
+        metrica('paquetes_entregados_total', 'counter', 'Paquetes entregados a su destino.',
+                [({}, stats['paquetes_entregados'])])
+        metrica('paquetes_descartados_total', 'counter', 'Paquetes descartados por causa.',
+                [({'causa': 'ttl'}, stats['paquetes_descartados_ttl']),
+                 ({'causa': 'ruta'}, stats['paquetes_descartados_ruta'])])
+        metrica('saltos_total', 'counter', 'Saltos acumulados de los paquetes entregados.',
+                [({}, stats['total_saltos'])])
+        
+        resumen = self.red.metricas.obtener_resumen()
+        metrica('paquetes_en_vuelo', 'gauge', 'Paquetes en colas, enlaces o esperando ARP.', [({}, resumen['en_vuelo'])])
+        metrica('latencia_ticks', 'gauge', 'Latencia extremo a extremo aproximada por percentil.',
+                [({'percentil': '50'}, resumen['latencia_p50']),
+                 ({'percentil': '95'}, resumen['latencia_p95']),
+                 ({'percentil': '99'}, resumen['latencia_p99'])])
+        
+        dispositivos = [d.obtener_estadisticas() for d in self.red.dispositivos.values()]
+        metrica('dispositivo_en_linea', 'gauge', 'Estado del dispositivo (1 = online).',
+                [({'dispositivo': d['nombre']}, int(d['estado'] == 'online')) for d in dispositivos])
+        for clave, ayuda in (('paquetes_enviados', 'Paquetes enviados por el dispositivo.'),
+                             ('paquetes_procesados', 'Paquetes procesados por el dispositivo.'),
+                             ('paquetes_descartados', 'Paquetes descartados por el dispositivo.')):
+            metrica(f'dispositivo_{clave}_total', 'counter', ayuda,
+                    [({'dispositivo': d['nombre']}, d[clave]) for d in dispositivos])
+        metrica('dispositivo_cache_flujos_aciertos_total', 'counter', 'Aciertos de la caché de flujos.',
+                [({'dispositivo': d['nombre']}, d['flujos']['aciertos']) for d in dispositivos])
+        metrica('dispositivo_cache_flujos_fallos_total', 'counter', 'Fallos de la caché de flujos.',
+                [({'dispositivo': d['nombre']}, d['flujos']['fallos']) for d in dispositivos])
+        
+        colas = []
+        for dispositivo in self.red.dispositivos.values():
+            for estado in dispositivo.obtener_info_interfaces().values():
+                for sentido in ('entrada', 'salida'):
+                    etiquetas = {'dispositivo': dispositivo.nombre, 'interfaz': estado['nombre'], 'sentido': sentido}
+                    colas.append((etiquetas, estado[f'cola_{sentido}']))
+        metrica('interfaz_cola_paquetes', 'gauge', 'Paquetes en la cola de la interfaz.', colas)
+        
+        return "\n".join(lineas) + "\n"
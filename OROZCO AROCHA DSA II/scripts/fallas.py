@@ -0,0 +1,169 @@
+# Módulo 21: Inyección de fallas
+# Calendario de caídas de enlaces y dispositivos con medición de la reconvergencia
+
+import json
+import random
+from collections import deque
+
+ACCIONES_FALLA = ('link-down', 'link-up', 'device-down', 'device-up')
+
+class EventoFalla:
+    """Una acción del calendario y lo que se midió después de dispararla"""
+    
+    def __init__(self, tick, accion, objetivo):
+        self.tick = tick
+        self.accion = accion
+        self.objetivo = objetivo  # "disp1:int1 <-> disp2:int2" o nombre de dispositivo
+        self.aplicado = None  # True/False una vez disparado
+        self.linea_base = None  # Entregas por tick antes del evento
+        self.perdidos = 0
+        self.recuperado_en = None  # Ticks hasta recuperar la tasa de entregas
+    
+    def a_diccionario(self):
+        """Forma serializable (la misma que se carga desde archivo)"""
+        return {'tick': self.tick, 'accion': self.accion, 'objetivo': self.objetivo}
+
+class PlanFallas:
+    """Dispara eventos de falla en sus ticks y mide su efecto.
+    
+    Los descartes de cada tick se atribuyen al evento más reciente que aún no
+    se recuperó. Un evento se considera recuperado cuando el promedio de
+    entregas de las últimas VENTANA_RECUPERACION ticks vuelve a ser al menos
+    UMBRAL_RECUPERACION de su línea base (el promedio de las VENTANA_BASE
+    ticks previas al evento; una restauración hereda la de su caída)"""
+    
+    VENTANA_BASE = 10
+    VENTANA_RECUPERACION = 3
+    UMBRAL_RECUPERACION = 0.9
+    
+    def __init__(self, red, eventos):
+        self.red = red
+        self.eventos = sorted(eventos, key=lambda e: e.tick)
+        self.siguiente = 0  # Índice del próximo evento por disparar
+        self.enlaces_caidos = {}  # conexión -> atributos, para restaurarla igual
+        self.historial_entregas = deque(maxlen=self.VENTANA_BASE)
+        self.abiertos = []  # Eventos disparados aún sin recuperar
+    
+    @classmethod
+    def desde_archivo(cls, red, nombre_archivo):
+        """Carga un calendario JSON: [{"tick": t, "accion": a, "objetivo": o}, ...]"""
+        with open(nombre_archivo, 'r', encoding='utf-8') as archivo:
+            datos = json.load(archivo)
+        eventos = []
+        for entrada in datos:
+            if entrada['accion'] not in ACCIONES_FALLA:
+                raise ValueError(f"Acción de falla desconocida: {entrada['accion']}")
+            eventos.append(EventoFalla(int(entrada['tick']), entrada['accion'], entrada['objetivo']))
+        return cls(red, eventos)
+    
+    @classmethod
+    def aleatorio(cls, red, semilla, cantidad, horizonte=100, duracion=5):
+        """Genera 'cantidad' caídas (de enlaces o dispositivos) en ticks al azar
+        dentro de 'horizonte' a partir del tick actual, cada una seguida de su
+        restauración 'duracion' ticks después"""
+        azar = random.Random(semilla)
+        conexiones = red.obtener_conexiones()
+        dispositivos = list(red.dispositivos)
+        eventos = []
+        for _ in range(cantidad):
+            inicio = red.tick_actual + 1 + azar.randrange(max(horizonte, 1))
+            if conexiones and (not dispositivos or azar.random() < 0.5):
+                objetivo = azar.choice(conexiones)
+                acciones = ('link-down', 'link-up')
+            elif dispositivos:
+                objetivo = azar.choice(dispositivos)
+                acciones = ('device-down', 'device-up')
+            else:
+                break
+            eventos.append(EventoFalla(inicio, acciones[0], objetivo))
+            eventos.append(EventoFalla(inicio + duracion, acciones[1], objetivo))
+        return cls(red, eventos)
+    
+    def guardar(self, nombre_archivo):
+        """Escribe el calendario en el formato que lee desde_archivo"""
+        with open(nombre_archivo, 'w', encoding='utf-8') as archivo:
+            json.dump([e.a_diccionario() for e in self.eventos], archivo, indent=2, ensure_ascii=False)
+    
+    def aplicar(self, tick):
+        """Dispara los eventos programados hasta este tick (antes de mover paquetes)"""
+        while self.siguiente < len(self.eventos) and self.eventos[self.siguiente].tick <= tick:
+            evento = self.eventos[self.siguiente]
+            self.siguiente += 1
+            evento.aplicado = self._disparar(evento)
+            if evento.aplicado:
+                evento.linea_base = self._linea_base(evento)
+                self.abiertos.append(evento)
+    
+    def _linea_base(self, evento):
+        """Entregas por tick a recuperar: las previas al evento, o para una
+        restauración las previas a la caída que deshace"""
+        if evento.accion.endswith('-up'):
+            caida = evento.accion.replace('-up', '-down')
+            for anterior in reversed(self.eventos[:self.siguiente - 1]):
+                if anterior.aplicado and anterior.accion == caida and anterior.objetivo == evento.objetivo:
+                    return anterior.linea_base
+        entregas = self.historial_entregas
+        return sum(entregas) / len(entregas) if entregas else 0
+    
+    def _disparar(self, evento):
+        """Ejecuta la acción sobre la red; False si el objetivo no aplica"""
+        if evento.accion in ('device-down', 'device-up'):
+            return self.red.establecer_estado_dispositivo(evento.objetivo, evento.accion == 'device-up')
+        
+        extremos = self._extremos(evento.objetivo)
+        if extremos is None:
+            return False
+        if evento.accion == 'link-down':
+            enlace = self.red.obtener_enlace(evento.objetivo)
+            if enlace is None or not self.red.desconectar_dispositivos(*extremos):
+                return False
+            self.enlaces_caidos[evento.objetivo] = enlace.obtener_configuracion()
+            return True
+        atributos = self.enlaces_caidos.pop(evento.objetivo, {})
+        return self.red.conectar_dispositivos(*extremos, **atributos)
+    
+    @staticmethod
+    def _extremos(conexion):
+        """Parsea "disp1:int1 <-> disp2:int2" en sus cuatro partes"""
+        partes = conexion.split(' <-> ')
+        if len(partes) != 2:
+            return None
+        lado1, lado2 = partes[0].split(':', 1), partes[1].split(':', 1)
+        if len(lado1) != 2 or len(lado2) != 2:
+            return None
+        return lado1[0], lado1[1], lado2[0], lado2[1]
+    
+    def medir(self, tick):
+        """Atribuye los descartes del tick y revisa qué eventos se recuperaron"""
+        series = self.red.metricas.series
+        entregados = series['entregados'].ultimo()
+        descartados = series['descartados'].ultimo()
+        
+        if self.abiertos:
+            self.abiertos[-1].perdidos += descartados
+            recientes = series['entregados'].obtener_valores()[-self.VENTANA_RECUPERACION:]
+            promedio = sum(recientes) / len(recientes)
+            for evento in list(self.abiertos):
+                transcurridos = tick - evento.tick
+                if evento.linea_base and transcurridos >= self.VENTANA_RECUPERACION - 1 and \
+                        promedio >= evento.linea_base * self.UMBRAL_RECUPERACION:
+                    evento.recuperado_en = transcurridos
+                    self.abiertos.remove(evento)
+        
+        self.historial_entregas.append(entregados)
+    
+    def terminado(self):
+        """True cuando ya se dispararon todos los eventos"""
+        return self.siguiente >= len(self.eventos)
+    
+    def obtener_reporte(self):
+        """Resultado de cada evento disparado o pendiente"""
+        return [{
+            'tick': e.tick,
+            'accion': e.accion,
+            'objetivo': e.objetivo,
+            'estado': 'pendiente' if e.aplicado is None else ('aplicado' if e.aplicado else 'sin efecto'),
+            'linea_base': round(e.linea_base, 2) if e.linea_base is not None else None,
+            'perdidos': e.perdidos,
+            'recuperado_en': e.recuperado_en
+        } for e in self.eventos]
@@ -0,0 +1,395 @@
+# Módulo 24: Simulación de flujos
+# Modo fluido: flujos a tasa constante con reparto max-min sobre las rutas de la red
+
+import heapq
+import math
+
+TAMAÑO_POR_DEFECTO = 1000  # Bytes por paquete de un flujo, para los recursos medidos en bytes
+TTL_FLUJO = 64
+TOLERANCIA = 1e-9  # Margen relativo para considerar saturado un recurso
+
+class Flujo:
+    """Tráfico a tasa constante (paquetes por tick) entre dos IPs"""
+    
+    def __init__(self, identificador, dispositivo, origen, destino, demanda, tamaño, inicio, fin):
+        self.id = identificador
+        self.dispositivo = dispositivo  # Dispositivo que origina el flujo
+        self.origen = origen
+        self.destino = destino
+        self.demanda = demanda  # Paquetes por tick pedidos (math.inf = todo lo posible)
+        self.tamaño = tamaño
+        self.inicio = inicio
+        self.fin = fin  # Tick en que termina (None = hasta detenerlo)
+        self.ruta = []  # Pares (interfaz, vecino) del camino
+        self.recursos = {}  # recurso -> unidades que consume por paquete
+        self.razon = None  # Por qué no tiene ruta, si no la tiene
+        self.tasa = 0.0  # Paquetes por tick asignados
+        self.cuello = None  # Recurso que limita la tasa (None = limita la demanda)
+        self.acumulado = 0.0  # Paquetes transferidos hasta 'desde'
+        self.desde = inicio
+    
+    def volumen(self, tick):
+        """Paquetes transferidos hasta el tick"""
+        return self.acumulado + self.tasa * (tick - self.desde)
+    
+    def asignar(self, tasa, cuello, tick):
+        """Cambia la tasa conservando lo transferido con la anterior"""
+        self.acumulado = self.volumen(tick)
+        self.desde = tick
+        self.tasa = tasa
+        self.cuello = cuello
+
+class ModeloFluido:
+    """Flujos de tráfico como tasas en lugar de paquetes individuales.
+    
+    Cada flujo sigue la ruta que tomarían sus paquetes (la de reenvío de cada
+    dispositivo, con el hash por flujo de ECMP) y consume tres tipos de
+    recursos por salto: el cupo de la interfaz de salida, el ancho de banda del
+    sentido del enlace (si es finito) y el cupo de la interfaz de entrada. Las
+    tasas se reparten con equidad max-min por llenado progresivo.
+    
+    Un flujo nuevo que cabe entero en la holgura de su ruta, o uno que se
+    detiene sin cruzar recursos saturados, no cambia las demás tasas y se
+    resuelve sin recalcular. Si no, solo se recalculan los flujos que comparten
+    recursos con él (transitivamente); un cambio de topología o de rutas
+    recalcula todo.
+    El volumen transferido se integra al cambiar las tasas, no en cada tick"""
+    
+    def __init__(self, red):
+        self.red = red
+        self.activo = False  # En modo fluido, 'send' define flujos
+        self.flujos = {}  # id -> Flujo
+        self.por_recurso = {}  # recurso -> ids de los flujos que lo cruzan
+        self.uso = {}  # recurso -> unidades por tick asignadas
+        self.vencimientos = []  # heap (tick_fin, id)
+        self.siguiente_id = 1
+        self.epoca_rutas = None
+        self.recalculos_completos = 0
+        self.recalculos_incrementales = 0
+        self.flujos_recalculados = 0
+        self.asignaciones_directas = 0
+        self.terminados = 0
+        self.volumen_terminado = 0.0
+    
+    def _epoca(self):
+        """Identifica el estado de las rutas y capacidades: topología, cambios
+        de los protocolos y tasas de servicio de las interfaces"""
+        return (self.red.version_topologia, self.red.version_capacidad,
+                id(self.red.enrutamiento), self.red.enrutamiento.cambios_rutas)
+    
+    def establecer_activo(self, activo):
+        """Entra o sale del modo fluido; al salir se detienen todos los flujos"""
+        self.activo = activo
+        if not activo:
+            self.detener_todos()
+    
+    def iniciar(self, dispositivo, origen, destino, demanda, tamaño=None, duracion=None):
+        """Crea un flujo desde una IP activa del dispositivo. Retorna el Flujo
+        (sin tasa si no tiene ruta) o None si la IP de origen no es del dispositivo"""
+        if not dispositivo.en_linea or not any(i.direccion_ip == origen and i.activa
+                                               for i in dispositivo.interfaces.values()):
+            return None
+        
+        tick = self.red.tick_actual
+        self._revisar_epoca(tick)
+        fin = tick + duracion if duracion else None
+        flujo = Flujo(self.siguiente_id, dispositivo, origen, destino, demanda,
+                      tamaño or TAMAÑO_POR_DEFECTO, tick, fin)
+        self.siguiente_id += 1
+        self.flujos[flujo.id] = flujo
+        if fin is not None:
+            heapq.heappush(self.vencimientos, (fin, flujo.id))
+        
+        self._enrutar(flujo)
+        self._indexar(flujo)
+        if not flujo.recursos:
+            return flujo
+        if flujo.demanda != math.inf and all(
+                self.uso.get(r, 0) + flujo.demanda * unidades < self.capacidad(r) * (1 - TOLERANCIA)
+                for r, unidades in flujo.recursos.items()):
+            flujo.asignar(flujo.demanda, None, tick)
+            self._sumar_uso(flujo, 1)
+            self.asignaciones_directas += 1
+        else:
+            self._recalcular(self._componente(flujo.recursos), tick)
+        return flujo
+    
+    def detener(self, identificador):
+        """Detiene un flujo; False si no existe"""
+        flujo = self.flujos.get(identificador)
+        if flujo is None:
+            return False
+        tick = self.red.tick_actual
+        saturados = self._retirar(flujo, tick)
+        if saturados:
+            self._recalcular(self._componente(saturados), tick)
+        return True
+    
+    def detener_todos(self):
+        """Detiene todos los flujos; retorna cuántos había"""
+        cantidad = len(self.flujos)
+        for flujo in list(self.flujos.values()):
+            self._retirar(flujo, self.red.tick_actual)
+        self.vencimientos = []
+        return cantidad
+    
+    def procesar(self, tick):
+        """Vence los flujos cumplidos y reenruta si cambió la topología (una vez por tick)"""
+        if not self.flujos:
+            return
+        saturados = []
+        while self.vencimientos and self.vencimientos[0][0] <= tick:
+            _, identificador = heapq.heappop(self.vencimientos)
+            flujo = self.flujos.get(identificador)
+            if flujo is not None:
+                saturados.extend(self._retirar(flujo, flujo.fin))
+        if not self._revisar_epoca(tick) and saturados:
+            self._recalcular(self._componente(saturados), tick)
+    
+    def _revisar_epoca(self, tick):
+        """Reenruta y recalcula todos los flujos si las rutas cambiaron"""
+        epoca = self._epoca()
+        if epoca == self.epoca_rutas:
+            return False
+        self.epoca_rutas = epoca
+        self.por_recurso = {}
+        self.uso = {}
+        for flujo in self.flujos.values():
+            self._enrutar(flujo)
+            self._indexar(flujo)
+        self._recalcular(set(self.flujos.values()), tick, completo=True)
+        return True
+    
+    def _retirar(self, flujo, tick):
+        """Quita un flujo del modelo y retorna los recursos saturados que
+        cruzaba: los únicos donde otros flujos pueden crecer"""
+        saturados = [r for r in flujo.recursos if self._saturado(r)]
+        self._sumar_uso(flujo, -1)
+        flujo.asignar(0.0, None, tick)
+        self.terminados += 1
+        self.volumen_terminado += flujo.acumulado
+        del self.flujos[flujo.id]
+        for recurso in flujo.recursos:
+            ids = self.por_recurso.get(recurso)
+            if ids is not None:
+                ids.discard(flujo.id)
+                if not ids:
+                    del self.por_recurso[recurso]
+                    self.uso.pop(recurso, None)
+        return saturados
+    
+    def _saturado(self, recurso):
+        return self.uso.get(recurso, 0) >= self.capacidad(recurso) * (1 - TOLERANCIA)
+    
+    def _sumar_uso(self, flujo, signo):
+        """Suma (o resta) el consumo del flujo a cada recurso de su ruta"""
+        for recurso, unidades in flujo.recursos.items():
+            self.uso[recurso] = self.uso.get(recurso, 0) + signo * flujo.tasa * unidades
+    
+    def _enrutar(self, flujo):
+        """Sigue las decisiones de reenvío salto a salto desde el origen"""
+        flujo.ruta = []
+        flujo.recursos = {}
+        flujo.razon = self.red.verificar_alcance(flujo.dispositivo, flujo.destino, TTL_FLUJO)
+        if flujo.razon:
+            return
+        
+        actual = flujo.dispositivo
+        visitados = set()
+        while not any(i.direccion_ip == flujo.destino for i in actual.interfaces.values()):
+            if actual in visitados or len(flujo.ruta) >= TTL_FLUJO:
+                flujo.razon = "Bucle de enrutamiento"
+                break
+            visitados.add(actual)
+            saltos = [(i, v) for i, v in actual._resolver_saltos(flujo.destino)
+                      if i.activa and v.activa and v.dispositivo_padre.en_linea]
+            if not saltos:
+                flujo.razon = "No hay ruta al destino"
+                break
+            interfaz, vecino = actual.elegir_salto_flujo(flujo.origen, flujo.destino, saltos)
+            flujo.ruta.append((interfaz, vecino))
+            actual = vecino.dispositivo_padre
+        
+        if flujo.razon:
+            flujo.ruta = []
+            return
+        if not flujo.ruta:
+            flujo.razon = "El destino está en el origen"
+            return
+        for interfaz, vecino in flujo.ruta:
+            self._consumir(flujo, ('salida', interfaz), interfaz.unidad_servicio)
+            enlace = interfaz.enlaces.get(vecino)
+            if enlace is not None and enlace.ancho_banda:
+                self._consumir(flujo, ('enlace', enlace, interfaz), enlace.unidad)
+            self._consumir(flujo, ('entrada', vecino), vecino.unidad_servicio)
+    
+    @staticmethod
+    def _consumir(flujo, recurso, unidad):
+        """Anota cuántas unidades del recurso usa cada paquete del flujo"""
+        flujo.recursos[recurso] = flujo.recursos.get(recurso, 0) + (flujo.tamaño if unidad == 'bytes' else 1)
+    
+    def _indexar(self, flujo):
+        """Registra el flujo en cada recurso que cruza"""
+        for recurso in flujo.recursos:
+            self.por_recurso.setdefault(recurso, set()).add(flujo.id)
+    
+    def _componente(self, recursos):
+        """Flujos que comparten recursos (directa o transitivamente) con los dados"""
+        pendientes = list(recursos)
+        vistos = set(pendientes)
+        flujos = set()
+        while pendientes:
+            for identificador in self.por_recurso.get(pendientes.pop(), ()):
+                flujo = self.flujos[identificador]
+                if flujo in flujos:
+                    continue
+                flujos.add(flujo)
+                for recurso in flujo.recursos:
+                    if recurso not in vistos:
+                        vistos.add(recurso)
+                        pendientes.append(recurso)
+        return flujos
+    
+    @staticmethod
+    def capacidad(recurso):
+        """Unidades por tick que admite un recurso"""
+        if recurso[0] == 'enlace':
+            return recurso[1].ancho_banda
+        return recurso[1].tasa_servicio
+    
+    def _recalcular(self, flujos, tick, completo=False):
+        """Llenado progresivo: todas las tasas suben a la par (el 'nivel') hasta
+        que un recurso se satura (sus flujos quedan fijos con él como cuello) o
+        un flujo alcanza su demanda. Los eventos se toman de un heap en orden de
+        nivel, así que el costo es proporcional a la suma de los largos de las
+        rutas y no a la cantidad de niveles distintos"""
+        if completo:
+            self.recalculos_completos += 1
+        else:
+            self.recalculos_incrementales += 1
+        self.flujos_recalculados += len(flujos)
+        
+        tasas = {flujo: 0.0 for flujo in flujos}
+        cuellos = dict.fromkeys(flujos)
+        activos = {flujo for flujo in flujos if flujo.recursos and flujo.demanda > 0}
+        peso = {}  # recurso -> unidades por paquete de sus flujos activos
+        usado = {}  # recurso -> unidades consumidas por sus flujos ya fijos
+        for flujo in activos:
+            for recurso, unidades in flujo.recursos.items():
+                peso[recurso] = peso.get(recurso, 0) + unidades
+                usado[recurso] = 0.0
+        
+        # Entradas (nivel, prioridad, orden, objeto): a igual nivel, primero las demandas
+        eventos = []
+        orden = 0
+        nivel_recurso = {}
+        for recurso, total in peso.items():
+            nivel_recurso[recurso] = self.capacidad(recurso) / total
+            eventos.append((nivel_recurso[recurso], 1, orden, recurso))
+            orden += 1
+        for flujo in activos:
+            if flujo.demanda != math.inf:
+                eventos.append((flujo.demanda, 0, orden, flujo))
+                orden += 1
+        heapq.heapify(eventos)
+        
+        while activos and eventos:
+            nivel, prioridad, _, objeto = heapq.heappop(eventos)
+            if prioridad == 0:
+                fijos = [objeto] if objeto in activos else []
+                cuello = None
+            else:
+                if nivel_recurso.get(objeto) != nivel or not peso[objeto]:
+                    continue  # Entrada vieja: el nivel del recurso cambió
+                fijos = [self.flujos[i] for i in self.por_recurso[objeto] if self.flujos[i] in activos]
+                cuello = objeto
+            
+            for flujo in fijos:
+                activos.discard(flujo)
+                tasas[flujo] = nivel
+                cuellos[flujo] = cuello
+                for recurso, unidades in flujo.recursos.items():
+                    peso[recurso] -= unidades
+                    usado[recurso] += nivel * unidades
+                    if peso[recurso] and recurso != cuello:
+                        # El nivel de saturación solo puede subir al fijar un flujo
+                        siguiente = max(nivel, (self.capacidad(recurso) - usado[recurso]) / peso[recurso])
+                        nivel_recurso[recurso] = siguiente
+                        heapq.heappush(eventos, (siguiente, 1, orden, recurso))
+                        orden += 1
+        
+        for flujo in flujos:
+            flujo.asignar(tasas[flujo], cuellos[flujo], tick)
+            for recurso in flujo.recursos:
+                self.uso[recurso] = 0.0
+        for flujo in flujos:
+            self._sumar_uso(flujo, 1)
+    
+    @staticmethod
+    def describir_recurso(recurso):
+        """Texto de un recurso para los reportes"""
+        if recurso[0] == 'enlace':
+            origen = recurso[2]
+            return f"enlace {recurso[1].clave} (desde {origen.dispositivo_padre.nombre}:{origen.nombre})"
+        interfaz = recurso[1]
+        return f"{recurso[0]} {interfaz.dispositivo_padre.nombre}:{interfaz.nombre}"
+    
+    def obtener_reporte(self):
+        """Tasa, cuello de botella y volumen de cada flujo activo"""
+        tick = self.red.tick_actual
+        reporte = []
+        for flujo in self.flujos.values():
+            nombres = [flujo.dispositivo.nombre] + [v.dispositivo_padre.nombre for _, v in flujo.ruta]
+            reporte.append({
+                'id': flujo.id,
+                'origen': flujo.origen,
+                'destino': flujo.destino,
+                'demanda': flujo.demanda,
+                'tasa': round(flujo.tasa, 3),
+                'bytes_por_tick': round(flujo.tasa * flujo.tamaño, 1),
+                'cuello': self.describir_recurso(flujo.cuello) if flujo.cuello else None,
+                'ruta': nombres if flujo.ruta else [],
+                'razon': flujo.razon,
+                'volumen': round(flujo.volumen(tick), 1),
+                'fin': flujo.fin
+            })
+        return reporte
+    
+    def obtener_cuellos(self):
+        """Recursos saturados: capacidad, uso y cuántos flujos limitan"""
+        limitados = {}
+        for flujo in self.flujos.values():
+            if flujo.cuello is not None:
+                limitados[flujo.cuello] = limitados.get(flujo.cuello, 0) + 1
+        cuellos = []
+        for recurso, cantidad in limitados.items():
+            cuellos.append({
+                'recurso': self.describir_recurso(recurso),
+                'capacidad': self.capacidad(recurso),
+                'uso': round(self.uso[recurso], 3),
+                'flujos_limitados': cantidad,
+                'flujos': len(self.por_recurso[recurso])
+            })
+        return sorted(cuellos, key=lambda c: -c['flujos_limitados'])
+    
+    def obtener_sobresuscritos(self):
+        """Recursos cuyo uso asignado supera su capacidad (no debería haber)"""
+        return [{'recurso': self.describir_recurso(recurso), 'capacidad': self.capacidad(recurso),
+                 'uso': round(uso, 3)}
+                for recurso, uso in self.uso.items() if uso > self.capacidad(recurso) * (1 + TOLERANCIA)]
+    
+    def obtener_estadisticas(self):
+        """Contadores del modelo y volumen total transferido"""
+        tick = self.red.tick_actual
+        volumen = self.volumen_terminado + sum(f.volumen(tick) for f in self.flujos.values())
+        return {
+            'activo': self.activo,
+            'flujos': len(self.flujos),
+            'terminados': self.terminados,
+            'tasa_total': round(sum(f.tasa for f in self.flujos.values()), 3),
+            'volumen': round(volumen, 1),
+            'recalculos_completos': self.recalculos_completos,
+            'recalculos_incrementales': self.recalculos_incrementales,
+            'asignaciones_directas': self.asignaciones_directas,
+            'flujos_recalculados': self.flujos_recalculados
+        }
@@ -0,0 +1,113 @@
+# Módulo 25: Índices del historial
+# Historial de paquetes recibidos con índices por origen, contenido y tick de llegada
+
+import zlib
+from bisect import bisect_left
+
+def huella_contenido(carga):
+    """Hash estable de una carga (None para las cargas sintéticas)"""
+    return zlib.crc32(carga) if carga is not None else None
+
+class IndiceHistorial:
+    """Paquetes recibidos en orden de llegada, numerados con una secuencia
+    absoluta, más listas de secuencias por IP de origen y por hash de
+    contenido. Los ticks de llegada no decrecen, así que 'desde un tick' es
+    una búsqueda binaria.
+    
+    Recortar el historial solo adelanta 'primero'; las secuencias viejas se
+    compactan cuando ocupan más de la mitad de las listas. Es el único
+    almacenamiento del historial: también se lee como la pila de antes
+    (esta_vacia, obtener_tamaño, obtener_elementos), del más reciente al
+    más antiguo"""
+    
+    def __init__(self):
+        self.paquetes = []  # Paquete de la secuencia base + i (None si ya se recortó)
+        self.ticks = []  # Tick de llegada de cada uno
+        self.base = 0  # Secuencia de paquetes[0]
+        self.primero = 0  # Primera secuencia conservada
+        self.por_origen = {}  # ip -> secuencias en orden
+        self.por_contenido = {}  # hash de la carga -> secuencias en orden
+    
+    def __len__(self):
+        return self.base + len(self.paquetes) - self.primero
+    
+    def __iter__(self):
+        """Paquetes conservados, del más reciente al más antiguo"""
+        for secuencia in range(self.base + len(self.paquetes) - 1, self.primero - 1, -1):
+            yield self.paquetes[secuencia - self.base]
+    
+    def esta_vacia(self):
+        return len(self) == 0
+    
+    def obtener_tamaño(self):
+        return len(self)
+    
+    def obtener_cima(self):
+        """Paquete más reciente (None si no hay)"""
+        return self.paquetes[-1] if len(self) else None
+    
+    def obtener_elementos(self):
+        """Paquetes del más reciente al más antiguo"""
+        return list(self)
+    
+    def agregar(self, paquete, tick):
+        """Indexa un paquete recién recibido"""
+        secuencia = self.base + len(self.paquetes)
+        self.paquetes.append(paquete)
+        self.ticks.append(tick)
+        self.por_origen.setdefault(paquete.origen, []).append(secuencia)
+        self.por_contenido.setdefault(huella_contenido(paquete.carga), []).append(secuencia)
+    
+    def recortar(self, cantidad):
+        """Olvida los 'cantidad' paquetes más antiguos y los retorna"""
+        vencidos = []
+        for secuencia in range(self.primero, min(self.primero + cantidad, self.base + len(self.paquetes))):
+            vencidos.append(self.paquetes[secuencia - self.base])
+            self.paquetes[secuencia - self.base] = None
+        self.primero = min(self.primero + cantidad, self.base + len(self.paquetes))
+        if 2 * (self.primero - self.base) > len(self.paquetes):
+            self._compactar()
+        return vencidos
+    
+    def _compactar(self):
+        """Elimina del frente de todas las listas las secuencias recortadas"""
+        vencidos = self.primero - self.base
+        del self.paquetes[:vencidos]
+        del self.ticks[:vencidos]
+        self.base = self.primero
+        for indice in (self.por_origen, self.por_contenido):
+            for clave in list(indice):
+                secuencias = indice[clave]
+                del secuencias[:bisect_left(secuencias, self.primero)]
+                if not secuencias:
+                    del indice[clave]
+    
+    def consultar(self, origen=None, contenido=None, desde_tick=None):
+        """Generador (tick, paquete) del más reciente al más antiguo con los
+        filtros dados. Recorre el índice más selectivo y se detiene en cuanto
+        pasa del tick pedido, así que una página cuesta lo que mide"""
+        limite = self.primero
+        if desde_tick is not None:
+            limite = max(limite, self.base + bisect_left(self.ticks, desde_tick))
+        
+        huella = None
+        if contenido is not None:
+            contenido = contenido.encode('utf-8') if isinstance(contenido, str) else contenido
+            huella = huella_contenido(contenido)
+        
+        if origen is not None:
+            candidatas = reversed(self.por_origen.get(origen, ()))
+        elif contenido is not None:
+            candidatas = reversed(self.por_contenido.get(huella, ()))
+        else:
+            candidatas = range(self.base + len(self.paquetes) - 1, limite - 1, -1)
+        
+        for secuencia in candidatas:
+            if secuencia < limite:
+                return
+            paquete = self.paquetes[secuencia - self.base]
+            if origen is not None and paquete.origen != origen:
+                continue
+            if contenido is not None and (paquete.carga is None or paquete.carga != contenido):
+                continue
+            yield self.ticks[secuencia - self.base], paquete
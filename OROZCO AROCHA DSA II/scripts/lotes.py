@@ -0,0 +1,99 @@
+# Módulo 26: Ejecución por lotes
+# Scripts de comandos del CLI leídos como flujo, sin eco y con resumen de velocidad
+
+import os
+import time
+from collections import deque
+
+# Los comandos retornan texto, no un estado: un error se reconoce por el
+# comienzo de la respuesta. Un manejador cuyo mensaje de error no empiece
+# con alguno de estos prefijos no se detecta y el script sigue como si nada
+PREFIJOS_ERROR = ('Error', 'Comando no reconocido', 'Subcomando show no reconocido')
+COMENTARIOS = ('!', '#')
+
+def es_error(resultado):
+    """True si la respuesta de un comando indica que falló"""
+    return isinstance(resultado, str) and resultado.startswith(PREFIJOS_ERROR)
+
+class EjecutorScript:
+    """Ejecuta archivos de comandos con el ParserCLI línea por línea.
+    
+    Las respuestas no se muestran: se recuerdan los últimos CONTEXTO comandos
+    para ubicar el error si uno falla. Con detener_en_error el script se corta en
+    el primer error; si no, los errores se juntan y se informan al final.
+    Un 'source' dentro de un script anida otro archivo (sin ciclos)"""
+    
+    CONTEXTO = 5
+    
+    def __init__(self, parser):
+        self.parser = parser
+        self.en_curso = []  # Rutas de los scripts que se están ejecutando (anidados)
+    
+    def ejecutar(self, nombre_archivo, detener_en_error=True):
+        """Ejecuta un script y retorna el resumen como diccionario"""
+        ruta = os.path.abspath(nombre_archivo)
+        resumen = {
+            'archivo': nombre_archivo,
+            'lineas': 0,
+            'comandos': 0,
+            'errores': [],  # (número de línea, comando, respuesta)
+            'contexto': [],  # Últimos comandos antes del primer error
+            'detenido': False,
+            'salida': False,  # El script ejecutó 'quit'
+            'segundos': 0.0,
+            'lineas_por_segundo': 0.0
+        }
+        if ruta in self.en_curso:
+            resumen['errores'].append((0, f"source {nombre_archivo}", "Error: El script se incluye a sí mismo"))
+            return resumen
+        
+        recientes = deque(maxlen=self.CONTEXTO)
+        inicio = time.perf_counter()
+        self.en_curso.append(ruta)
+        try:
+            with open(nombre_archivo, 'r', encoding='utf-8') as archivo:
+                for numero, linea in enumerate(archivo, 1):
+                    resumen['lineas'] = numero
+                    comando = linea.strip()
+                    if not comando or comando.startswith(COMENTARIOS):
+                        continue
+                    
+                    resumen['comandos'] += 1
+                    resultado = self.parser.procesar_comando(comando)
+                    if resultado == "QUIT":
+                        resumen['salida'] = True
+                        break
+                    if es_error(resultado):
+                        if not resumen['errores']:
+                            resumen['contexto'] = list(recientes)
+                        resumen['errores'].append((numero, comando, resultado))
+                        if detener_en_error:
+                            resumen['detenido'] = True
+                            break
+                    recientes.append((numero, comando, resultado))
+        except OSError as e:
+            resumen['errores'].append((0, f"source {nombre_archivo}", f"Error: No se pudo leer el script: {e}"))
+        finally:
+            self.en_curso.pop()
+        
+        resumen['segundos'] = time.perf_counter() - inicio
+        if resumen['segundos'] > 0:
+            resumen['lineas_por_segundo'] = round(resumen['lineas'] / resumen['segundos'], 1)
+        return resumen
+
+def formatear_resumen(resumen):
+    """Texto del resumen: errores (con contexto si se detuvo) y velocidad"""
+    resultado = []
+    if resumen['detenido'] and resumen['contexto']:
+        resultado.append("Últimos comandos antes del error:")
+        resultado.extend(f"  {numero}: {comando}" for numero, comando, _ in resumen['contexto'])
+    for numero, comando, respuesta in resumen['errores']:
+        if numero == 0:  # El archivo en sí (no se pudo leer o es un ciclo)
+            resultado.append(f"{resumen['archivo']}: {respuesta}")
+        else:
+            resultado.append(f"{resumen['archivo']}:{numero}: {comando}\n  {respuesta}")
+    
+    estado = "detenido en el primer error" if resumen['detenido'] else f"{len(resumen['errores'])} errores"
+    resultado.append(f"Script {resumen['archivo']}: {resumen['lineas']} líneas, {resumen['comandos']} comandos, "
+                     f"{estado} | {resumen['segundos']:.3f} s ({resumen['lineas_por_segundo']:g} líneas/s)")
+    return "\n".join(resultado)
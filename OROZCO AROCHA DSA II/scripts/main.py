@@ -7,12 +7,15 @@ from red import Red
 from estadisticas import GestorEstadisticas
 from persistencia import GestorPersistencia
 from cli import ParserCLI
+from lotes import EjecutorScript, formatear_resumen
 
 class SimuladorRedLAN:
     """Clase principal que orquesta todo el simulador"""
     
-    def __init__(self):
+    def __init__(self, semilla=None):
         self.red = Red()
+        if semilla is not None:
+            self.red.sembrar(semilla)
         self.gestor_estadisticas = GestorEstadisticas(self.red)
         self.gestor_persistencia = GestorPersistencia(self.red)
         self.parser_cli = ParserCLI(self.red, self.gestor_estadisticas, self.gestor_persistencia)
@@ -72,6 +75,13 @@ class SimuladorRedLAN:
                 print(f"Error inesperado: {e}")
                 print("El simulador continuará ejecutándose...")
     
+    def ejecutar_script(self, nombre_archivo, detener_en_error=True):
+        """Ejecuta un archivo de comandos sin el bucle interactivo. Solo
+        muestra los errores y el resumen; retorna el código de salida"""
+        resumen = EjecutorScript(self.parser_cli).ejecutar(nombre_archivo, detener_en_error)
+        print(formatear_resumen(resumen))
+        return 1 if resumen['errores'] else 0
+    
     def mostrar_banner_inicial(self):
         """Muestra el banner inicial del simulador"""
         banner = """
@@ -79,9 +89,36 @@ class SimuladorRedLAN:
         """
         print(banner)
 
+USO = "Uso: python main.py [--seed <n>] [-f <script> [--continue]]"
+
+def leer_argumentos(argv):
+    """Opciones de línea de comandos: --seed <n>, -f <script> y --continue"""
+    opciones = {'semilla': None, 'script': None, 'continuar': False}
+    i = 0
+    while i < len(argv):
+        if argv[i] == '--seed' and i + 1 < len(argv):
+            try:
+                opciones['semilla'] = int(argv[i + 1])
+            except ValueError:
+                raise SystemExit(f"Opción no reconocida: --seed {argv[i + 1]}\n{USO}")
+            i += 1
+        elif argv[i] == '-f' and i + 1 < len(argv):
+            opciones['script'] = argv[i + 1]
+            i += 1
+        elif argv[i] == '--continue':
+            opciones['continuar'] = True
+        else:
+            raise SystemExit(f"Opción no reconocida: {argv[i]}\n{USO}")
+        i += 1
+    return opciones
+
 def main():
     """Función principal del programa"""
-    simulador = SimuladorRedLAN()
+    opciones = leer_argumentos(sys.argv[1:])
+    simulador = SimuladorRedLAN(opciones['semilla'])
+    if opciones['script'] is not None:
+        # Modo por lotes: sin banner ni datos de prueba, el script arma su red
+        sys.exit(simulador.ejecutar_script(opciones['script'], not opciones['continuar']))
     simulador.mostrar_banner_inicial()
     simulador.ejecutar_cli()
 
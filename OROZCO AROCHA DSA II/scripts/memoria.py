@@ -0,0 +1,69 @@
+# Módulo 23: Medición de memoria
+# Costo base por interfaz y dispositivo medido con tracemalloc
+
+import gc
+import tracemalloc
+from dispositivo import Dispositivo, Interfaz
+from estructuras_datos import ListaEnlazada, TIPOS_COLA
+from historial import IndiceHistorial
+
+MUESTRA_POR_DEFECTO = 500
+
+def _medir(crear, cantidad):
+    """Bytes asignados por objeto al crear 'cantidad' objetos con crear(i)"""
+    gc.collect()
+    antes = tracemalloc.get_traced_memory()[0]
+    objetos = [crear(i) for i in range(cantidad)]
+    despues = tracemalloc.get_traced_memory()[0]
+    del objetos
+    return round((despues - antes) / cantidad)
+
+def medir_linea_base(cantidad=MUESTRA_POR_DEFECTO, tipo_cola='enlazada'):
+    """Mide cuánto ocupa una interfaz y un dispositivo recién creados, y cuánto
+    ocuparían las estructuras que ahora se crean recién con el primer uso"""
+    activo = tracemalloc.is_tracing()
+    if not activo:
+        tracemalloc.start()
+    try:
+        padre = Dispositivo('medicion', 'router')
+        nombres = [f"medicion{i}" for i in range(cantidad)]
+        interfaz = _medir(lambda i: Interfaz('g0/0', padre, tipo_cola), cantidad)
+        dispositivo = _medir(lambda i: Dispositivo(nombres[i], 'router'), cantidad)
+        diferidas_interfaz = _medir(lambda i: (ListaEnlazada(), TIPOS_COLA[tipo_cola](),
+                                               TIPOS_COLA[tipo_cola](), {}), cantidad)
+        diferidas_dispositivo = _medir(lambda i: IndiceHistorial(), cantidad)
+    finally:
+        if not activo:
+            tracemalloc.stop()
+    
+    return {
+        'muestra': cantidad,
+        'interfaz': interfaz,
+        'interfaz_diferidas': diferidas_interfaz,
+        'dispositivo': dispositivo,
+        'dispositivo_diferidas': diferidas_dispositivo
+    }
+
+def contar_estructuras(red):
+    """Cuántas interfaces y dispositivos de la red ya crearon sus estructuras"""
+    interfaces = [i for d in red.dispositivos.values() for i in d.interfaces.values()]
+    return {
+        'dispositivos': len(red.dispositivos),
+        'con_historial': sum(1 for d in red.dispositivos.values() if d._historial is not None),
+        'interfaces': len(interfaces),
+        'con_vecinos': sum(1 for i in interfaces if i._vecinos is not None),
+        'con_enlaces': sum(1 for i in interfaces if i._enlaces is not None),
+        'con_colas': sum(1 for i in interfaces if i._cola_entrada is not None or i._cola_salida is not None)
+    }
+
+def obtener_reporte(red, cantidad=MUESTRA_POR_DEFECTO):
+    """Línea base medida, estado de la red y memoria trazada si tracemalloc ya estaba activo"""
+    reporte = {
+        'linea_base': medir_linea_base(cantidad),
+        'red': contar_estructuras(red),
+        'trazado': None
+    }
+    if tracemalloc.is_tracing():
+        actual, pico = tracemalloc.get_traced_memory()
+        reporte['trazado'] = {'actual': actual, 'pico': pico}
+    return reporte
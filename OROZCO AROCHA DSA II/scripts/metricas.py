@@ -0,0 +1,153 @@
+# Módulo 15: Métricas por tick
+# Series en buffers circulares e histogramas logarítmicos de memoria constante
+
+from array import array
+
+class SerieCircular:
+    """Últimos 'capacidad' valores enteros de una métrica, uno por tick"""
+    
+    def __init__(self, capacidad=1024):
+        self.capacidad = capacidad
+        self.valores = array('q', [0]) * capacidad
+        self.inicio = 0
+        self.cantidad = 0
+    
+    def agregar(self, valor):
+        """Agrega un valor, sobrescribiendo el más antiguo si está llena"""
+        posicion = (self.inicio + self.cantidad) % self.capacidad
+        self.valores[posicion] = valor
+        if self.cantidad < self.capacidad:
+            self.cantidad += 1
+        else:
+            self.inicio = (self.inicio + 1) % self.capacidad
+    
+    def ultimo(self):
+        """Valor más reciente (0 si no hay ninguno)"""
+        if not self.cantidad:
+            return 0
+        return self.valores[(self.inicio + self.cantidad - 1) % self.capacidad]
+    
+    def obtener_valores(self):
+        """Valores del más antiguo al más reciente"""
+        return [self.valores[(self.inicio + i) % self.capacidad] for i in range(self.cantidad)]
+
+class HistogramaLog:
+    """Histograma con cubetas de potencias de dos: la cubeta k cuenta los
+    valores en [2^(k-1), 2^k) y la cubeta 0 los ceros. Los percentiles se
+    aproximan por el límite superior de la cubeta, acotado al máximo observado"""
+    
+    CUBETAS = 64
+    
+    def __init__(self):
+        self.cubetas = array('q', [0]) * self.CUBETAS
+        self.cantidad = 0
+        self.suma = 0
+        self.maximo = 0
+    
+    def agregar(self, valor):
+        """Registra un valor entero no negativo"""
+        self.cubetas[min(valor.bit_length(), self.CUBETAS - 1)] += 1
+        self.cantidad += 1
+        self.suma += valor
+        if valor > self.maximo:
+            self.maximo = valor
+    
+    def percentil(self, p, total=None):
+        """Valor aproximado bajo el cual queda el p% de las muestras. Con
+        'total', las muestras que faltan para llegar a él cuentan como ceros"""
+        total = max(total or 0, self.cantidad)
+        if not total:
+            return 0
+        objetivo = total * p / 100
+        acumulado = total - self.cantidad
+        if acumulado and acumulado >= objetivo:
+            return 0
+        for k, cuenta in enumerate(self.cubetas):
+            acumulado += cuenta
+            if cuenta and acumulado >= objetivo:
+                return min((1 << k) - 1, self.maximo)
+        return self.maximo
+    
+    def promedio(self):
+        """Media exacta de los valores registrados"""
+        return round(self.suma / self.cantidad, 2) if self.cantidad else 0
+
+class MetricasRed:
+    """Métricas de la simulación resueltas por tick: entregados, descartados
+    y en vuelo como series circulares, latencia extremo a extremo en ticks y
+    profundidad de cola por interfaz como histogramas.
+    
+    Solo se muestrean las interfaces que ya crearon sus colas, y el histograma
+    de una interfaz nace con su primera cola no vacía: los ticks sin muestra
+    cuentan como profundidad cero al calcular percentiles"""
+    
+    def __init__(self, capacidad_series=1024):
+        self.capacidad_series = capacidad_series
+        self.series = {nombre: SerieCircular(capacidad_series)
+                       for nombre in ('entregados', 'descartados', 'en_vuelo')}
+        self.latencia = HistogramaLog()
+        self.colas = {}  # Interfaz -> HistogramaLog de sus profundidades no nulas
+        self.ticks_registrados = 0
+        self._entregados_tick = 0
+        self._descartados_tick = 0
+    
+    def registrar_entrega(self, paquete, tick):
+        """Cuenta una entrega del tick en curso y su latencia"""
+        self._entregados_tick += 1
+        self.latencia.agregar(max(tick - paquete.tick_creacion, 0))
+    
+    def registrar_descarte(self):
+        """Cuenta un descarte del tick en curso"""
+        self._descartados_tick += 1
+    
+    def cerrar_tick(self, red):
+        """Muestrea las colas y los paquetes en vuelo y publica las series del tick"""
+        en_vuelo = 0
+        for dispositivo in red.dispositivos.values():
+            en_vuelo += dispositivo.cache_arp.en_espera()
+            for interfaz in dispositivo.interfaces.values():
+                if interfaz._cola_entrada is None and interfaz._cola_salida is None:
+                    continue
+                profundidad = len(interfaz.cola_entrada) + len(interfaz.cola_salida)
+                if not profundidad:
+                    continue
+                en_vuelo += profundidad
+                histograma = self.colas.get(interfaz)
+                if histograma is None:
+                    histograma = self.colas[interfaz] = HistogramaLog()
+                histograma.agregar(profundidad)
+        for enlace in red.enlaces.values():
+            en_vuelo += enlace.en_vuelo()
+        
+        self.series['entregados'].agregar(self._entregados_tick)
+        self.series['descartados'].agregar(self._descartados_tick)
+        self.series['en_vuelo'].agregar(en_vuelo)
+        self.ticks_registrados += 1
+        self._entregados_tick = 0
+        self._descartados_tick = 0
+    
+    def obtener_picos_colas(self, limite=5):
+        """Interfaces con mayor profundidad máxima de cola: (nombre, pico, p95)"""
+        picos = [(f"{interfaz.dispositivo_padre.nombre}:{interfaz.nombre}", h.maximo,
+                  h.percentil(95, self.ticks_registrados))
+                 for interfaz, h in self.colas.items()]
+        picos.sort(key=lambda pico: pico[1], reverse=True)
+        return picos[:limite]
+    
+    def obtener_resumen(self):
+        """Resumen de latencia y series para los reportes"""
+        en_vuelo = self.series['en_vuelo'].obtener_valores()
+        return {
+            'ticks': self.ticks_registrados,
+            'ventana': len(en_vuelo),
+            'entregados_ultimo_tick': self.series['entregados'].ultimo(),
+            'descartados_ultimo_tick': self.series['descartados'].ultimo(),
+            'en_vuelo': self.series['en_vuelo'].ultimo(),
+            'pico_en_vuelo': max(en_vuelo, default=0),
+            'latencia_muestras': self.latencia.cantidad,
+            'latencia_promedio': self.latencia.promedio(),
+            'latencia_p50': self.latencia.percentil(50),
+            'latencia_p95': self.latencia.percentil(95),
+            'latencia_p99': self.latencia.percentil(99),
+            'latencia_maxima': self.latencia.maximo
+        }
@@ -0,0 +1,222 @@
+# Módulo 10: Motor vectorizado
+# Simulación masiva con NumPy sobre una matriz de siguiente salto
+
+from collections import Counter, deque
+from resumen import ResumenEjecucion, causa_descarte
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: solo lo necesita este motor
+    np = None
+
+# Estados de los paquetes en los arreglos
+EN_TRANSITO = 0
+ENTREGADO = 1
+DESCARTADO_TTL = 2
+DESCARTADO_RUTA = 3
+
+class MotorVectorizado:
+    """Motor alternativo para cargas grandes y uniformes: los paquetes en vuelo
+    se guardan como arreglos (nodo actual, destino, TTL, saltos, estado) y cada
+    tick los mueve a todos con unas pocas operaciones vectorizadas.
+    
+    Cada paquete avanza un salto por tick por el camino más corto. A diferencia
+    de Red.procesar_tick, no modela colas ni enlaces. Como en
+    Dispositivo.enviar_paquete, un destino inalcanzable o fuera del alcance del
+    TTL se descarta en el origen sin contarse como enviado.
+    
+    Lleva el mismo ResumenEjecucion que Red: cada paquete recuerda su par
+    (origen, destino) para que la huella se compare con la de procesar_tick"""
+    
+    def __init__(self, red):
+        if np is None:
+            raise ImportError("El motor vectorizado requiere NumPy (pip install numpy)")
+        self.red = red
+        self.tick_actual = 0
+        self._compilar_topologia()
+        
+        self.nodo = np.empty(0, dtype=np.int32)
+        self.destino = np.empty(0, dtype=np.int32)
+        self.ttl = np.empty(0, dtype=np.int32)
+        self.saltos = np.empty(0, dtype=np.int32)
+        self.estado = np.empty(0, dtype=np.int8)
+        self.flujo = np.empty(0, dtype=np.int32)  # Índice en self.flujos
+        self.flujos = []  # (ip_origen, ip_destino) de cada inyección
+        self.resumen = ResumenEjecucion()
+        self._descartes_origen = Counter()  # Se publican en el tick siguiente, como en Red
+        
+        n = len(self.nombres)
+        self.procesados = np.zeros(n, dtype=np.int64)
+        self.enviados = np.zeros(n, dtype=np.int64)
+        self.descartados = np.zeros(n, dtype=np.int64)
+        self.entregados = 0
+        self.descartados_ttl = 0
+        self.descartados_ruta = 0
+        self.total_saltos = 0
+    
+    def _compilar_topologia(self):
+        """Indexa los dispositivos y calcula la matriz de siguiente salto
+        a partir de la instantánea CSR de la red"""
+        topologia = self.red.congelar()
+        self.nombres = topologia.nombres
+        self.indices = topologia.indice_dispositivo
+        self.ip_a_nodo = topologia.ip_a_dispositivo
+        n = len(self.nombres)
+        
+        # siguiente[u, d]: vecino de u un salto más cerca de d (-1 si no hay ruta).
+        # Un BFS desde cada destino; los enlaces son simétricos
+        self.siguiente = np.full((n, n), -1, dtype=np.int32)
+        for d in range(n):
+            if not topologia.en_linea[d]:
+                continue
+            columna = self.siguiente[:, d]
+            columna[d] = d
+            pendientes = deque([d])
+            while pendientes:
+                v = pendientes.popleft()
+                for u in topologia.vecinos_dispositivo(v):
+                    if columna[u] < 0:
+                        columna[u] = v
+                        pendientes.append(u)
+    
+    def inyectar(self, ip_origen, ip_destino, cantidad, ttl=64):
+        """Crea 'cantidad' paquetes en el dispositivo con ip_origen"""
+        origen = self.ip_a_nodo.get(ip_origen)
+        if origen is None or cantidad <= 0:
+            return False
+        destino = self.ip_a_nodo.get(ip_destino, -1)
+        
+        # Mismo filtro que el modelo de referencia: descarte en el origen
+        razon = self.red.verificar_alcance(self.red.dispositivos[self.nombres[origen]], ip_destino, ttl)
+        if razon:
+            self.descartados[origen] += cantidad
+            if razon.startswith('TTL'):
+                self.descartados_ttl += cantidad
+            else:
+                self.descartados_ruta += cantidad
+            self._descartes_origen[('D', ip_origen, ip_destino, 1, causa_descarte(razon))] += cantidad
+            return True
+        
+        self.flujos.append((ip_origen, ip_destino))
+        self.flujo = np.concatenate([self.flujo, np.full(cantidad, len(self.flujos) - 1, dtype=np.int32)])
+        
+        self.nodo = np.concatenate([self.nodo, np.full(cantidad, origen, dtype=np.int32)])
+        self.destino = np.concatenate([self.destino, np.full(cantidad, destino, dtype=np.int32)])
+        self.ttl = np.concatenate([self.ttl, np.full(cantidad, ttl, dtype=np.int32)])
+        # La traza del modelo de referencia ya incluye al origen
+        self.saltos = np.concatenate([self.saltos, np.ones(cantidad, dtype=np.int32)])
+        self.estado = np.concatenate([self.estado, np.full(cantidad, EN_TRANSITO, dtype=np.int8)])
+        self.enviados[origen] += cantidad
+        return True
+    
+    def procesar_tick(self):
+        """Avanza un salto todos los paquetes en tránsito y clasifica entregas y descartes"""
+        self.tick_actual += 1
+        n = len(self.nombres)
+        conteos = self._descartes_origen
+        self._descartes_origen = Counter()
+        vivos = np.flatnonzero(self.estado == EN_TRANSITO)
+        if vivos.size == 0:
+            self.resumen.registrar_eventos(self.tick_actual, conteos.items())
+            return 0
+        
+        actuales = self.nodo[vivos]
+        destinos = self.destino[vivos]
+        siguientes = np.where(destinos >= 0, self.siguiente[actuales, np.maximum(destinos, 0)], -1)
+        
+        # Sin siguiente salto: descarte por ruta en el nodo actual
+        sin_ruta = siguientes < 0
+        self.estado[vivos[sin_ruta]] = DESCARTADO_RUTA
+        self.descartados += np.bincount(actuales[sin_ruta], minlength=n)
+        self.descartados_ruta += int(sin_ruta.sum())
+        self._contar(conteos, vivos[sin_ruta], 'D', 'ruta')
+        
+        # Mover el resto un salto
+        movidos = vivos[~sin_ruta]
+        nuevos = siguientes[~sin_ruta]
+        self.enviados += np.bincount(actuales[~sin_ruta], minlength=n)
+        self.procesados += np.bincount(nuevos, minlength=n)
+        self.nodo[movidos] = nuevos
+        self.saltos[movidos] += 1
+        
+        # Llegada: entregar, o decrementar TTL y descartar los que expiran
+        entregados = nuevos == self.destino[movidos]
+        llegaron = movidos[entregados]
+        self.estado[llegaron] = ENTREGADO
+        self.entregados += int(llegaron.size)
+        self.total_saltos += int(self.saltos[llegaron].sum())
+        self._contar(conteos, llegaron, 'E', '')
+        
+        en_camino = movidos[~entregados]
+        self.ttl[en_camino] -= 1
+        expirados = en_camino[self.ttl[en_camino] <= 0]
+        self.estado[expirados] = DESCARTADO_TTL
+        self.descartados += np.bincount(self.nodo[expirados], minlength=n)
+        self.descartados_ttl += int(expirados.size)
+        self._contar(conteos, expirados, 'D', 'ttl')
+        
+        self.resumen.registrar_eventos(self.tick_actual, conteos.items())
+        self._compactar()
+        return int(vivos.size)
+    
+    def _contar(self, conteos, indices, resultado, causa):
+        """Agrupa por (flujo, saltos) los paquetes terminados para el resumen"""
+        if not indices.size:
+            return
+        claves, cantidades = np.unique(np.stack([self.flujo[indices], self.saltos[indices]]),
+                                       axis=1, return_counts=True)
+        for (flujo, saltos), cantidad in zip(claves.T.tolist(), cantidades.tolist()):
+            origen, destino = self.flujos[flujo]
+            conteos[(resultado, origen, destino, saltos, causa)] += cantidad
+    
+    def _compactar(self):
+        """Elimina los paquetes terminados cuando son mayoría (ya están contabilizados)"""
+        vivos = self.estado == EN_TRANSITO
+        if vivos.size and vivos.sum() * 2 < vivos.size:
+            self.nodo = self.nodo[vivos]
+            self.destino = self.destino[vivos]
+            self.ttl = self.ttl[vivos]
+            self.saltos = self.saltos[vivos]
+            self.estado = self.estado[vivos]
+            self.flujo = self.flujo[vivos]
+    
+    def en_transito(self):
+        """Cantidad de paquetes aún en vuelo"""
+        return int((self.estado == EN_TRANSITO).sum())
+    
+    def simular(self, max_ticks):
+        """Procesa ticks hasta vaciar la red o llegar a max_ticks"""
+        for _ in range(max_ticks):
+            if not self.procesar_tick():
+                break
+        return self.obtener_estadisticas_globales()
+    
+    def obtener_estadisticas_globales(self):
+        """Retorna las mismas claves que Red.obtener_estadisticas_globales"""
+        mas_activo = None
+        max_procesados = 0
+        if len(self.nombres) and self.procesados.max() > 0:
+            indice = int(self.procesados.argmax())
+            mas_activo = self.nombres[indice]
+            max_procesados = int(self.procesados[indice])
+        
+        return {
+            'paquetes_totales_enviados': int(self.enviados.sum()),
+            'paquetes_entregados': self.entregados,
+            'paquetes_descartados_ttl': self.descartados_ttl,
+            'paquetes_descartados_ruta': self.descartados_ruta,
+            'total_saltos': self.total_saltos,
+            'dispositivo_mas_activo': mas_activo,
+            'max_paquetes_procesados': max_procesados,
+            'promedio_saltos': round(self.total_saltos / self.entregados, 1) if self.entregados else 0
+        }
+    
+    def obtener_estadisticas_dispositivo(self, nombre):
+        """Contadores por dispositivo con las claves de Dispositivo.obtener_estadisticas"""
+        i = self.indices[nombre]
+        return {
+            'nombre': nombre,
+            'paquetes_procesados': int(self.procesados[i]),
+            'paquetes_enviados': int(self.enviados[i]),
+            'paquetes_descartados': int(self.descartados[i])
+        }
@@ -1,24 +1,83 @@
 # Módulo 2: Paquetes y Comunicación
 # Definición de la estructura de paquetes de red
 
+import random
 import uuid
 import time
 
 class Paquete:
     """Representa un paquete de red virtual con toda su información"""
     
-    def __init__(self, origen, destino, contenido, ttl=64):
-        self.id_unico = str(uuid.uuid4())[:8]  # Identificador único corto
+    _generador_ids = None  # random.Random sembrado en modo determinista; None = uuid4
+    
+    def __init__(self, origen, destino, contenido, ttl=64, tamaño=None):
+        self.reiniciar(origen, destino, contenido, ttl, tamaño)
+    
+    def reiniciar(self, origen, destino, contenido, ttl=64, tamaño=None):
+        """Inicializa (o reinicializa en el lugar, al reciclarlo) todos los campos"""
+        if Paquete._generador_ids is None:
+            self.id_unico = str(uuid.uuid4())[:8]  # Identificador único corto
+            self.timestamp = time.time()
+        else:
+            self.id_unico = f"{Paquete._generador_ids.getrandbits(32):08x}"
+            self.timestamp = 0.0  # Sin reloj de pared: el momento lo da tick_creacion
         self.origen = origen
         self.destino = destino
-        self.contenido = contenido
+        self.carga = self._normalizar_carga(contenido)  # bytes/memoryview inmutable o None
+        # Tamaño declarado: permite cargas sintéticas grandes sin reservar el buffer
+        self.tamaño = tamaño if tamaño is not None else (self.carga.nbytes if self.carga is not None else 0)
         self.ttl_inicial = ttl
         self.ttl_actual = ttl
         self.traza_ruta = []  # Lista de dispositivos por los que ha pasado
-        self.timestamp = time.time()
+        self.tick_creacion = 0  # Tick de simulación en que se originó (para la latencia)
         self.entregado = False
         self.descartado = False
         self.razon_descarte = None
+        self.siguiente_salto = None  # Interfaz vecina resuelta por ARP
+        self.reciclado = False  # True mientras espera en el pool
+        self.control = None  # MensajeControl si es tráfico de enrutamiento
+    
+    @classmethod
+    def sembrar(cls, semilla):
+        """Hace reproducibles los identificadores (None vuelve a uuid4 y al reloj real)"""
+        cls._generador_ids = random.Random(semilla) if semilla is not None else None
+    
+    def liberar_referencias(self):
+        """Suelta la carga y la traza para no retenerlas mientras está en el pool"""
+        self.carga = None
+        self.traza_ruta = []
+        self.siguiente_salto = None
+    
+    @staticmethod
+    def _normalizar_carga(contenido):
+        """Convierte el contenido en un buffer inmutable sin copiar si ya lo es"""
+        if contenido is None:
+            return None
+        if isinstance(contenido, memoryview):
+            return contenido if contenido.readonly else contenido.toreadonly()
+        if isinstance(contenido, bytes):
+            return memoryview(contenido)
+        if isinstance(contenido, bytearray):
+            return memoryview(bytes(contenido))
+        return memoryview(str(contenido).encode('utf-8'))
+    
+    @property
+    def contenido(self):
+        """Contenido legible para reportes (solo se decodifica al mostrarlo)"""
+        if self.carga is None:
+            return f"<{self.tamaño} bytes sintéticos>"
+        texto = str(self.carga, 'utf-8', errors='replace')
+        if self.tamaño > self.carga.nbytes:
+            texto += f" <+{self.tamaño - self.carga.nbytes} bytes sintéticos>"
+        return texto
+    
+    def duplicar(self):
+        """Crea una copia del paquete que comparte el mismo buffer de carga"""
+        copia = Paquete(self.origen, self.destino, self.carga, self.ttl_actual, self.tamaño)
+        copia.ttl_inicial = self.ttl_inicial
+        copia.tick_creacion = self.tick_creacion
+        copia.traza_ruta = list(self.traza_ruta)
+        return copia
     
     def decrementar_ttl(self):
         """Decrementa el TTL en 1 y verifica si debe descartarse"""
@@ -39,6 +98,10 @@ class Paquete:
             return "Sin traza"
         return " → ".join(self.traza_ruta)
     
+    def obtener_tamaño(self):
+        """Tamaño de la carga en bytes (declarado o real)"""
+        return self.tamaño
+    
     def marcar_entregado(self):
         """Marca el paquete como entregado exitosamente"""
         self.entregado = True
@@ -50,6 +113,7 @@ class Paquete:
             'origen': self.origen,
             'destino': self.destino,
             'contenido': self.contenido,
+            'tamaño': self.tamaño,
             'ttl_inicial': self.ttl_inicial,
             'ttl_actual': self.ttl_actual,
             'traza': self.obtener_traza_formateada(),
@@ -52,7 +52,9 @@ class GestorPersistencia:
                 'descripcion': 'Configuración del simulador de red LAN'
             },
             'dispositivos': {},
-            'conexiones': []
+            'conexiones': [],
+            'enlaces': {},
+            'cache_flujos': dict(self.red.capacidad_cache_flujos)
         }
         
         # Extraer información de dispositivos
@@ -61,6 +63,10 @@ class GestorPersistencia:
                 'nombre': dispositivo.nombre,
                 'tipo': dispositivo.tipo,
                 'en_linea': dispositivo.en_linea,
+                'ecmp': dispositivo.modo_ecmp,
+                'enrutamiento': dispositivo.enrutamiento.PROTOCOLO if dispositivo.enrutamiento else None,
+                'retencion_historial': dispositivo.retencion_historial,
+                'cache_flujos': dispositivo.cache_flujos.capacidad,
                 'interfaces': {}
             }
             
@@ -69,7 +75,10 @@ class GestorPersistencia:
                 config_interfaz = {
                     'nombre': interfaz.nombre,
                     'direccion_ip': interfaz.direccion_ip,
-                    'activa': interfaz.activa
+                    'activa': interfaz.activa,
+                    'tasa_servicio': interfaz.tasa_servicio,
+                    'unidad_servicio': interfaz.unidad_servicio,
+                    'tipo_cola': interfaz.tipo_cola
                 }
                 config_dispositivo['interfaces'][int_nombre] = config_interfaz
             
@@ -79,6 +88,9 @@ class GestorPersistencia:
         conexiones = self.red.obtener_conexiones()
         for conexion in conexiones:
             configuracion['conexiones'].append(conexion)
+            enlace = self.red.obtener_enlace(conexion)
+            if enlace:
+                configuracion['enlaces'][conexion] = enlace.obtener_configuracion()
         
         return configuracion
     
@@ -87,14 +99,20 @@ class GestorPersistencia:
         resultados = []
         
         # Limpiar red actual
-        self.red.dispositivos.clear()
-        self.red.conexiones = self.red.conexiones.__class__()  # Nueva lista enlazada vacía
+        self.red.limpiar()
+        self.red.capacidad_cache_flujos.update(configuracion.get('cache_flujos', {}))
         
         # Crear dispositivos
         for nombre, config_disp in configuracion['dispositivos'].items():
             if self.red.agregar_dispositivo(nombre, config_disp['tipo']):
                 dispositivo = self.red.obtener_dispositivo(nombre)
                 dispositivo.establecer_estado(config_disp['en_linea'])
+                dispositivo.establecer_modo_ecmp(config_disp.get('ecmp', 'flujo'))
+                dispositivo.establecer_retencion_historial(config_disp.get('retencion_historial'))
+                if 'cache_flujos' in config_disp:
+                    dispositivo.cache_flujos.establecer_capacidad(config_disp['cache_flujos'])
+                if config_disp.get('enrutamiento'):
+                    dispositivo.establecer_enrutamiento(config_disp['enrutamiento'])
                 
                 # Configurar interfaces
                 for int_nombre, config_int in config_disp['interfaces'].items():
@@ -105,6 +123,11 @@ class GestorPersistencia:
                     if config_int['direccion_ip']:
                         interfaz.asignar_ip(config_int['direccion_ip'])
                     
+                    interfaz.establecer_tipo_cola(config_int.get('tipo_cola', 'enlazada'))
+                    if 'tasa_servicio' in config_int:
+                        interfaz.configurar_servicio(config_int['tasa_servicio'],
+                                                     config_int.get('unidad_servicio', 'paquetes'))
+                    
                     if config_int['activa']:
                         interfaz.activar()
                     else:
@@ -112,7 +135,8 @@ class GestorPersistencia:
                 
                 resultados.append(f"Dispositivo {nombre} creado y configurado")
         
-        # Recrear conexiones
+        # Recrear conexiones con los atributos de sus enlaces
+        atributos_enlaces = configuracion.get('enlaces', {})
         for conexion in configuracion['conexiones']:
             # Parsear formato "dispositivo1:interfaz1 <-> dispositivo2:interfaz2"
             partes = conexion.split(' <-> ')
@@ -122,7 +146,8 @@ class GestorPersistencia:
                 
                 if len(disp1_int1) == 2 and len(disp2_int2) == 2:
                     if self.red.conectar_dispositivos(disp1_int1[0], disp1_int1[1], 
-                                                    disp2_int2[0], disp2_int2[1]):
+                                                    disp2_int2[0], disp2_int2[1],
+                                                    **atributos_enlaces.get(conexion, {})):
                         resultados.append(f"Conexión restaurada: {conexion}")
         
         return "\n".join(resultados)
@@ -0,0 +1,85 @@
+# Módulo 9: Reciclaje de objetos
+# Listas libres acotadas para reutilizar paquetes y nodos de las estructuras
+
+from paquete import Paquete
+
+class PoolObjetos:
+    """Lista libre acotada de objetos reutilizables con contadores de aciertos"""
+    
+    def __init__(self, nombre, capacidad=100000, habilitado=True):
+        self.nombre = nombre
+        self.capacidad = capacidad
+        self.habilitado = habilitado
+        self.libres = []
+        self.aciertos = 0  # Objetos servidos desde la lista libre
+        self.fallos = 0  # Objetos que hubo que crear
+        self.devueltos = 0
+        self.desechados = 0  # Devoluciones rechazadas por pool lleno o deshabilitado
+    
+    def tomar(self):
+        """Retorna un objeto libre o None si hay que crear uno nuevo"""
+        if self.libres:
+            self.aciertos += 1
+            return self.libres.pop()
+        if self.habilitado:
+            self.fallos += 1
+        return None
+    
+    def devolver(self, objeto):
+        """Devuelve un objeto a la lista libre si hay espacio"""
+        if not self.habilitado or len(self.libres) >= self.capacidad:
+            self.desechados += 1
+            return False
+        self.libres.append(objeto)
+        self.devueltos += 1
+        return True
+    
+    def establecer_habilitado(self, habilitado):
+        """Activa o desactiva el reciclaje; al desactivar se vacía la lista libre"""
+        self.habilitado = habilitado
+        if not habilitado:
+            self.libres.clear()
+    
+    def obtener_estadisticas(self):
+        """Retorna los contadores del pool"""
+        solicitudes = self.aciertos + self.fallos
+        return {
+            'nombre': self.nombre,
+            'habilitado': self.habilitado,
+            'libres': len(self.libres),
+            'capacidad': self.capacidad,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / solicitudes * 100, 1) if solicitudes else 0,
+            'devueltos': self.devueltos,
+            'desechados': self.desechados
+        }
+
+class PoolPaquetes(PoolObjetos):
+    """Pool de paquetes: los descartados y los que salen del historial se
+    reinician en el lugar en vez de crear objetos nuevos"""
+    
+    def __init__(self, capacidad=100000, habilitado=False):
+        super().__init__('paquetes', capacidad, habilitado)
+        self.diferidos = []  # Liberados en este tick; se reciclan en el siguiente
+    
+    def crear(self, origen, destino, contenido, ttl=64, tamaño=None):
+        """Obtiene un paquete reciclado (o nuevo) inicializado con estos datos"""
+        paquete = self.tomar()
+        if paquete is None:
+            return Paquete(origen, destino, contenido, ttl, tamaño)
+        paquete.reiniciar(origen, destino, contenido, ttl, tamaño)
+        return paquete
+    
+    def diferir(self, paquete):
+        """Marca un paquete para reciclar cuando terminen los reportes del tick"""
+        if self.habilitado and not paquete.reciclado:
+            paquete.reciclado = True
+            self.diferidos.append(paquete)
+    
+    def liberar_diferidos(self):
+        """Devuelve a la lista libre los paquetes diferidos del tick anterior"""
+        for paquete in self.diferidos:
+            paquete.liberar_referencias()
+            self.devolver(paquete)
+        self.diferidos = []
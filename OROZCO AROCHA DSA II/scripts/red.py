@@ -2,7 +2,23 @@
 # Orquesta el conjunto de dispositivos y sus conexiones
 
 from dispositivo import Dispositivo
+from cache_flujos import CacheFlujos
+from enlace import Enlace
+from pool import PoolPaquetes
+from topologia_csr import TopologiaCSR
+from componentes import ComponentesConexas
+from validacion import ValidadorTopologia
+from metricas import MetricasRed
+from eventos import CanalEventos
+from bifurcaciones import GestorBifurcaciones
+from resumen import ResumenEjecucion
+from enrutamiento import GestorEnrutamiento
+from fluido import ModeloFluido
+from paquete import Paquete
 from estructuras_datos import ListaEnlazada
+from functools import partial
+import random
+import threading
 
 class Red:
     """Gestiona la topología completa de la red"""
@@ -10,6 +26,31 @@ class Red:
     def __init__(self):
         self.dispositivos = {}  # Diccionario de dispositivos por nombre
         self.conexiones = ListaEnlazada()  # Lista de conexiones activas
+        self.tick_actual = 0  # Reloj de simulación en ticks
+        self.enlaces = {}  # Conexión -> Enlace con su modelo de capacidad
+        self.aleatorio = random.Random()  # Fuente de azar para pérdidas en enlaces
+        self.semilla = None  # Semilla del modo determinista, si se fijó
+        self.resumen = ResumenEjecucion()  # Huella de entregas y descartes
+        self.descartes_pendientes = []  # Descartes fuera de procesar_tick, se contabilizan en el próximo
+        self.pool_paquetes = PoolPaquetes()  # Reciclaje de paquetes (deshabilitado por defecto)
+        self.version_topologia = 0  # Aumenta con cada cambio de topología
+        self.version_capacidad = 0  # Aumenta con cada cambio de tasa de servicio
+        self._instantanea = None  # Última TopologiaCSR compilada
+        self.recompilaciones_topologia = 0
+        self.componentes = ComponentesConexas(self)  # Conectividad incremental
+        self.validador = ValidadorTopologia(self)  # Violaciones de la topología
+        self._direcciones = None  # IP -> dispositivo, se recalcula al cambiar una IP
+        self.capacidad_cache_flujos = dict(CacheFlujos.CAPACIDAD_POR_TIPO)  # Tamaño por tipo de dispositivo
+        self.metricas = MetricasRed()  # Series por tick e histogramas
+        self.exportador = None  # ExportadorMetricas activo, si lo hay
+        self.eventos = CanalEventos()  # Eventos de paquetes para 'watch'
+        self.bifurcaciones = GestorBifurcaciones(self)  # Variantes de la topología (fork/switch)
+        self.bucle = None  # BucleSimulacion en segundo plano, si lo hay
+        self.plan_fallas = None  # PlanFallas activo, si lo hay
+        self.enrutamiento = GestorEnrutamiento(self)  # Protocolos dinámicos (RIP/OSPF)
+        self.fluido = ModeloFluido(self)  # Flujos a tasa constante (modo fluido)
+        self.cerrojo = threading.RLock()  # Serializa los ticks del bucle con los comandos del CLI
+        self.pasadas_por_tick = 2  # Pasadas de propagación; la capacidad la limita cada interfaz
         self.estadisticas_globales = {
             'paquetes_totales_enviados': 0,
             'paquetes_entregados': 0,
@@ -24,6 +65,11 @@ class Red:
         """Agrega un nuevo dispositivo a la red"""
         if nombre not in self.dispositivos:
             self.dispositivos[nombre] = Dispositivo(nombre, tipo_dispositivo)
+            self.dispositivos[nombre].pool_paquetes = self.pool_paquetes
+            self.dispositivos[nombre].red = self
+            self.dispositivos[nombre].cache_flujos.establecer_capacidad(self.capacidad_cache_flujos.get(
+                tipo_dispositivo.lower(), CacheFlujos.CAPACIDAD_POR_DEFECTO))
+            self.marcar_topologia_modificada()
             
             # Agregar interfaces por defecto según el tipo
             if tipo_dispositivo.lower() == 'router':
@@ -41,12 +87,97 @@ class Red:
             return True
         return False
     
+    def limpiar(self):
+        """Elimina todos los dispositivos y conexiones"""
+        for dispositivo in self.dispositivos.values():
+            dispositivo.red = None
+        self.dispositivos.clear()
+        self.validador.reiniciar()
+        self.bifurcaciones = GestorBifurcaciones(self)
+        self.enrutamiento = GestorEnrutamiento(self)
+        self.fluido = ModeloFluido(self)
+        self.conexiones = ListaEnlazada()
+        self.enlaces.clear()
+        self.marcar_topologia_modificada(corte=True, direcciones=True)
+    
+    def marcar_topologia_modificada(self, dispositivo=None, corte=False, direcciones=False):
+        """Registra un cambio de topología; la instantánea se recompila al pedirla.
+        Los cambios que solo agregan enlaces se aplican a los componentes en el acto"""
+        self.version_topologia += 1
+        if corte:
+            self.componentes.invalidar()
+        elif dispositivo is not None:
+            self.componentes.unir_enlaces(dispositivo)
+        if direcciones:
+            self._direcciones = None
+    
+    def _dueño_direccion(self, ip):
+        """Dispositivo que tiene asignada una IP"""
+        if self._direcciones is None:
+            self._direcciones = {}
+            for dispositivo in self.dispositivos.values():
+                for interfaz in dispositivo.interfaces.values():
+                    if interfaz.direccion_ip:
+                        self._direcciones.setdefault(interfaz.direccion_ip, dispositivo)
+        return self._direcciones.get(ip)
+    
+    def verificar_alcance(self, origen, ip_destino, ttl):
+        """Retorna la razón de descarte si un paquete desde 'origen' no puede
+        llegar a ip_destino con ese TTL, o None si puede"""
+        destino = self._dueño_direccion(ip_destino)
+        if destino is origen:
+            return None
+        if destino is None or not self.componentes.conectados(origen, destino):
+            return "Destino inalcanzable"
+        # Cada dispositivo intermedio decrementa el TTL una vez
+        if ttl < self.congelar().distancia(origen, destino):
+            return "TTL insuficiente para el destino"
+        return None
+    
+    def sembrar(self, semilla):
+        """Modo determinista: la misma semilla y los mismos comandos producen
+        los mismos identificadores, pérdidas y resumen de ejecución"""
+        self.semilla = semilla
+        self.aleatorio.seed(semilla)
+        Paquete.sembrar(semilla)
+    
+    def registrar_descarte(self, paquete):
+        """Contabiliza en el próximo tick un paquete descartado fuera de procesar_tick"""
+        self.descartes_pendientes.append(paquete)
+    
+    def congelar(self):
+        """Retorna una instantánea CSR de la topología, recompilándola solo si
+        la topología cambió desde la última vez"""
+        if self._instantanea is None or self._instantanea.version != self.version_topologia:
+            self._instantanea = TopologiaCSR(self, self.version_topologia)
+            self.recompilaciones_topologia += 1
+        return self._instantanea
+    
+    def configurar_cache_flujos(self, tipo_dispositivo, capacidad):
+        """Fija el tamaño de la caché de flujos para un tipo de dispositivo,
+        incluidos los dispositivos de ese tipo que ya existen"""
+        tipo = tipo_dispositivo.lower()
+        self.capacidad_cache_flujos[tipo] = capacidad
+        afectados = 0
+        for dispositivo in self.dispositivos.values():
+            if dispositivo.tipo.lower() == tipo:
+                dispositivo.cache_flujos.establecer_capacidad(capacidad)
+                afectados += 1
+        return afectados
+    
+    def obtener_alcanzables(self, nombre):
+        """Retorna los dispositivos alcanzables desde un dispositivo"""
+        return self.congelar().alcanzables(nombre)
+    
     def obtener_dispositivo(self, nombre):
         """Obtiene un dispositivo específico"""
         return self.dispositivos.get(nombre)
     
-    def conectar_dispositivos(self, dispositivo1, interfaz1, dispositivo2, interfaz2):
-        """Conecta dos interfaces de dispositivos diferentes"""
+    def conectar_dispositivos(self, dispositivo1, interfaz1, dispositivo2, interfaz2,
+                              ancho_banda=None, unidad='paquetes', retardo=0, perdida=0.0):
+        """Conecta dos interfaces de dispositivos diferentes.
+        ancho_banda en unidades por tick (None = infinito), retardo en ticks
+        de propagación y perdida como probabilidad por paquete"""
         disp1 = self.obtener_dispositivo(dispositivo1)
         disp2 = self.obtener_dispositivo(dispositivo2)
         
@@ -59,13 +190,29 @@ class Red:
         if not int1 or not int2:
             return False
         
+        if unidad not in Enlace.UNIDADES or retardo < 0 or not 0 <= perdida <= 1:
+            return False
+        if ancho_banda is not None and ancho_banda <= 0:
+            return False
+        
+        # Una conexión existente no se duplica
+        if int2 in int1.enlaces:
+            return False
+        
+        conexion = f"{dispositivo1}:{interfaz1} <-> {dispositivo2}:{interfaz2}"
+        enlace = Enlace(conexion, int1, int2, ancho_banda, unidad, retardo, perdida,
+                        self.aleatorio, self.tick_actual)
+        
         # Crear conexión bidireccional
-        int1.conectar_vecino(int2)
-        int2.conectar_vecino(int1)
+        int1.conectar_vecino(int2, enlace)
+        int2.conectar_vecino(int1, enlace)
         
         # Registrar conexión
-        conexion = f"{dispositivo1}:{interfaz1} <-> {dispositivo2}:{interfaz2}"
         self.conexiones.agregar(conexion)
+        self.enlaces[conexion] = enlace
+        self.bifurcaciones.registrar(
+            partial(self.conectar_dispositivos, dispositivo1, interfaz1, dispositivo2, interfaz2, **enlace.obtener_configuracion()),
+            partial(self.desconectar_dispositivos, dispositivo1, interfaz1, dispositivo2, interfaz2))
         
         return True
     
@@ -83,13 +230,26 @@ class Red:
         if not int1 or not int2:
             return False
         
-        # Remover conexión bidireccional
+        enlace = int1.enlaces.get(int2)
+        if enlace:
+            # Para deshacer, reconectar en el mismo sentido y con los mismos atributos
+            extremos = (dispositivo1, interfaz1, dispositivo2, interfaz2)
+            if not enlace.clave.startswith(f"{dispositivo1}:{interfaz1} <->"):
+                extremos = (dispositivo2, interfaz2, dispositivo1, interfaz1)
+            self.bifurcaciones.registrar(
+                partial(self.desconectar_dispositivos, dispositivo1, interfaz1, dispositivo2, interfaz2),
+                partial(self.conectar_dispositivos, *extremos, **enlace.obtener_configuracion()))
+        
+        # Remover conexión bidireccional (también invalida sus entradas ARP)
         int1.desconectar_vecino(int2)
         int2.desconectar_vecino(int1)
         
-        # Remover registro de conexión
-        conexion = f"{dispositivo1}:{interfaz1} <-> {dispositivo2}:{interfaz2}"
+        # Remover registro de conexión (puede estar escrita en cualquier sentido)
+        conexion = enlace.clave if enlace else f"{dispositivo1}:{interfaz1} <-> {dispositivo2}:{interfaz2}"
         self.conexiones.eliminar(conexion)
+        if enlace:
+            del self.enlaces[conexion]
+            self.descartes_pendientes.extend(enlace.vaciar("Enlace desconectado"))
         
         return True
     
@@ -103,33 +263,71 @@ class Red:
     
     def procesar_tick(self):
         """Procesa un tick de simulación en toda la red"""
-        todos_paquetes = []
+        # Los reportes del tick anterior ya se generaron: reciclar sus descartes
+        self.pool_paquetes.liberar_diferidos()
+        
+        todos_paquetes = self.descartes_pendientes
+        self.descartes_pendientes = []
+        self.tick_actual += 1
         
-        # Procesar cada dispositivo múltiples veces para asegurar flujo de paquetes
-        for _ in range(2):  # Procesar 2 veces por tick para mejor flujo
+        if self.plan_fallas:
+            self.plan_fallas.aplicar(self.tick_actual)
+        self.enrutamiento.procesar(self.tick_actual)
+        self.fluido.procesar(self.tick_actual)
+        
+        # Entregar los paquetes que terminaron de cruzar sus enlaces
+        for enlace in self.enlaces.values():
+            todos_paquetes.extend(enlace.entregar(self.tick_actual))
+        
+        # Varias pasadas permiten avanzar más de un salto por tick; cuántos
+        # paquetes atiende cada cola lo decide su tasa de servicio
+        for _ in range(self.pasadas_por_tick):
             for dispositivo in self.dispositivos.values():
-                paquetes = dispositivo.procesar_paquetes()
+                paquetes = dispositivo.procesar_paquetes(self.tick_actual)
                 todos_paquetes.extend(paquetes)
         
         # Actualizar estadísticas globales
         self._actualizar_estadisticas(todos_paquetes)
+        if self.plan_fallas:
+            self.plan_fallas.medir(self.tick_actual)
+        
+        if self.pool_paquetes.habilitado:
+            for paquete in todos_paquetes:
+                if paquete.descartado:
+                    self.pool_paquetes.diferir(paquete)
+        
+        if self.exportador:
+            self.exportador.publicar()
         
         return todos_paquetes
     
     def _actualizar_estadisticas(self, paquetes):
         """Actualiza las estadísticas globales de la red"""
+        # Se leen los atributos directamente: armar el reporte completo de
+        # cada paquete (traza y contenido) en cada tick es innecesario.
+        # Un paquete que cruza varios dispositivos en el mismo tick aparece
+        # varias veces en la lista, pero se contabiliza una sola
+        vistos = set()
+        terminados = []
         for paquete in paquetes:
-            info = paquete.obtener_info_completa()
+            if not (paquete.entregado or paquete.descartado) or id(paquete) in vistos:
+                continue
+            vistos.add(id(paquete))
+            terminados.append(paquete)
             
-            if info['entregado']:
+            if paquete.entregado:
                 self.estadisticas_globales['paquetes_entregados'] += 1
-                self.estadisticas_globales['total_saltos'] += info['saltos']
+                self.estadisticas_globales['total_saltos'] += len(paquete.traza_ruta)
+                self.metricas.registrar_entrega(paquete, self.tick_actual)
             
-            if info['descartado']:
-                if info['razon_descarte'] == 'TTL expirado':
+            if paquete.descartado:
+                self.metricas.registrar_descarte()
+                if paquete.razon_descarte.startswith('TTL'):
                     self.estadisticas_globales['paquetes_descartados_ttl'] += 1
                 else:
                     self.estadisticas_globales['paquetes_descartados_ruta'] += 1
+        self.resumen.registrar_tick(self.tick_actual, terminados)
+        self.metricas.cerrar_tick(self)
         
         # Encontrar dispositivo más activo
         max_procesados = 0
@@ -170,16 +368,18 @@ class Red:
         """Retorna lista de todas las conexiones"""
         return self.conexiones.obtener_lista()
     
+    def obtener_enlace(self, conexion):
+        """Obtiene el enlace registrado para una conexión"""
+        return self.enlaces.get(conexion)
+    
+    def obtener_estado_enlaces(self):
+        """Retorna el estado y la utilización de todos los enlaces"""
+        return [enlace.obtener_estado(self.tick_actual) for enlace in self.enlaces.values()]
+    
     def validar_topologia(self):
-        """Valida la consistencia de la topología de red"""
-        errores = []
-        
-        for nombre, dispositivo in self.dispositivos.items():
-            for int_nombre, interfaz in dispositivo.interfaces.items():
-                vecinos = interfaz.obtener_vecinos()
-                for vecino in vecinos:
-                    # Verificar que la conexión sea bidireccional
-                    if not vecino.vecinos.buscar(interfaz):
-                        errores.append(f"Conexión unidireccional detectada: {nombre}:{int_nombre}")
-        
-        return errores
+        """Retorna las violaciones de la topología detectadas hasta ahora"""
+        return self.validador.obtener_violaciones()
+    
+    def auditar_topologia(self):
+        """Revisa toda la topología desde cero y retorna sus violaciones"""
+        return self.validador.auditar()
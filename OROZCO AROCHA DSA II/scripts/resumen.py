@@ -0,0 +1,44 @@
+# Módulo 20: Resumen de ejecución
+# Huella de la secuencia de entregas y descartes para comparar corridas
+
+import hashlib
+from collections import Counter
+
+def causa_descarte(razon):
+    """Categoría de una razón de descarte, la misma de las estadísticas globales"""
+    return 'ttl' if razon.startswith('TTL') else 'ruta'
+
+class ResumenEjecucion:
+    """Hash acumulado (SHA-256) de los paquetes que terminan en cada tick.
+    
+    Cada evento se reduce a (tick, resultado, origen, destino, saltos, causa):
+    campos que también tiene el motor vectorizado, sin el identificador, la
+    traza ni el TTL del paquete. Los eventos de un mismo tick se ordenan antes
+    de agregarlos, así que la huella no depende de cómo cada motor numera o
+    recorre los paquetes: dos corridas (o dos motores) que entregan y
+    descartan lo mismo en los mismos ticks dan el mismo resumen"""
+    
+    def __init__(self):
+        self.hash = hashlib.sha256()
+        self.eventos = 0
+    
+    def registrar_tick(self, tick, paquetes):
+        """Agrega los paquetes terminados en un tick (ya sin repetidos)"""
+        if not paquetes:
+            return
+        self.registrar_eventos(tick, Counter(
+            ('E', p.origen, p.destino, len(p.traza_ruta), '') if p.entregado else
+            ('D', p.origen, p.destino, len(p.traza_ruta), causa_descarte(p.razon_descarte))
+            for p in paquetes).items())
+    
+    def registrar_eventos(self, tick, conteos):
+        """Agrega los eventos de un tick como pares (evento, cantidad). Los
+        eventos iguales quedan juntos al ordenar, así que cada uno se agrega
+        una sola vez multiplicado por su cantidad"""
+        for evento, cantidad in sorted(conteos):
+            self.hash.update(f"{tick}|{'|'.join(map(str, evento))}\n".encode('utf-8') * cantidad)
+            self.eventos += cantidad
+    
+    def obtener_resumen(self):
+        """Huella hexadecimal y cantidad de eventos incluidos"""
+        return {'digest': self.hash.hexdigest(), 'eventos': self.eventos}
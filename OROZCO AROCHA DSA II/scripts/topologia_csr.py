@@ -0,0 +1,135 @@
+# Módulo 11: Topología compacta (CSR)
+# Instantánea inmutable de la red en arreglos para el enrutamiento
+
+from array import array
+from collections import deque
+
+class TopologiaCSR:
+    """Compila la topología de una Red en arreglos comprimidos por filas (CSR).
+    
+    - Dispositivos e interfaces se identifican por índice, con tablas nombre <-> índice.
+    - offsets_interfaces[d]:offsets_interfaces[d+1] son las interfaces del dispositivo d.
+    - offsets_vecinos[i]:offsets_vecinos[i+1] son las interfaces vecinas de la interfaz i.
+    - offsets_adyacencia[d]:offsets_adyacencia[d+1] son los dispositivos alcanzables
+      en un salto por enlaces utilizables (interfaces activas y dispositivos en línea).
+    
+    La instantánea no se modifica: Red.congelar la reconstruye cuando cambia la topología."""
+    
+    def __init__(self, red, version):
+        self.version = version
+        
+        # Dispositivos
+        self.nombres = list(red.dispositivos.keys())
+        self.indice_dispositivo = {nombre: d for d, nombre in enumerate(self.nombres)}
+        self.dispositivos = [red.dispositivos[nombre] for nombre in self.nombres]
+        self.indice_objeto = {dispositivo: d for d, dispositivo in enumerate(self.dispositivos)}
+        self.en_linea = bytearray(1 if disp.en_linea else 0 for disp in self.dispositivos)
+        
+        # Interfaces agrupadas por dispositivo
+        self.interfaces = []
+        self.interfaz_dispositivo = array('i')
+        self.offsets_interfaces = array('i', [0])
+        self.ip_a_dispositivo = {}
+        for d, dispositivo in enumerate(self.dispositivos):
+            for interfaz in dispositivo.interfaces.values():
+                self.interfaces.append(interfaz)
+                self.interfaz_dispositivo.append(d)
+                if interfaz.direccion_ip:
+                    self.ip_a_dispositivo.setdefault(interfaz.direccion_ip, d)
+            self.offsets_interfaces.append(len(self.interfaces))
+        self.indice_interfaz = {interfaz: i for i, interfaz in enumerate(self.interfaces)}
+        self.interfaz_activa = bytearray(1 if interfaz.activa else 0 for interfaz in self.interfaces)
+        
+        # Vecinos de cada interfaz; se omiten los que ya no pertenecen a la red
+        self.vecino_interfaz = array('i')
+        self.offsets_vecinos = array('i', [0])
+        for i, interfaz in enumerate(self.interfaces):
+            for vecino in interfaz.vecinos:
+                j = self.indice_interfaz.get(vecino)
+                if j is not None:
+                    self.vecino_interfaz.append(j)
+            self.offsets_vecinos.append(len(self.vecino_interfaz))
+        
+        # Adyacencia entre dispositivos por enlaces utilizables (sin repetidos)
+        self.adyacencia = array('i')
+        self.offsets_adyacencia = array('i', [0])
+        for d in range(len(self.nombres)):
+            vistos = set()
+            for _, j in self._enlaces_utilizables(d):
+                destino = self.interfaz_dispositivo[j]
+                if destino not in vistos:
+                    vistos.add(destino)
+                    self.adyacencia.append(destino)
+            self.offsets_adyacencia.append(len(self.adyacencia))
+        
+        self._distancias = {}  # Destino -> distancias BFS (válidas mientras viva la instantánea)
+    
+    def _enlaces_utilizables(self, d):
+        """Pares (interfaz, vecina) por índice que el dispositivo d puede usar"""
+        if not self.en_linea[d]:
+            return
+        for i in range(self.offsets_interfaces[d], self.offsets_interfaces[d + 1]):
+            if not self.interfaz_activa[i]:
+                continue
+            for k in range(self.offsets_vecinos[i], self.offsets_vecinos[i + 1]):
+                j = self.vecino_interfaz[k]
+                if self.interfaz_activa[j] and self.en_linea[self.interfaz_dispositivo[j]]:
+                    yield i, j
+    
+    def vecinos_dispositivo(self, d):
+        """Índices de los dispositivos adyacentes a d"""
+        return self.adyacencia[self.offsets_adyacencia[d]:self.offsets_adyacencia[d + 1]]
+    
+    def distancias(self, origen):
+        """Distancia en saltos desde 'origen' a cada dispositivo (-1 = inalcanzable).
+        Los enlaces son simétricos, por lo que sirve también como distancia hacia 'origen'"""
+        if origen in self._distancias:
+            return self._distancias[origen]
+        
+        distancias = array('i', [-1]) * len(self.nombres)
+        if self.en_linea[origen]:
+            distancias[origen] = 0
+            pendientes = deque([origen])
+            adyacencia = self.adyacencia
+            offsets = self.offsets_adyacencia
+            while pendientes:
+                actual = pendientes.popleft()
+                siguiente_distancia = distancias[actual] + 1
+                for k in range(offsets[actual], offsets[actual + 1]):
+                    vecino = adyacencia[k]
+                    if distancias[vecino] < 0:
+                        distancias[vecino] = siguiente_distancia
+                        pendientes.append(vecino)
+        self._distancias[origen] = distancias
+        return distancias
+    
+    def alcanzables(self, nombre):
+        """Nombres de los dispositivos alcanzables desde 'nombre'"""
+        d = self.indice_dispositivo.get(nombre)
+        if d is None:
+            return []
+        distancias = self.distancias(d)
+        return [self.nombres[x] for x in range(len(self.nombres)) if x != d and distancias[x] >= 0]
+    
+    def distancia(self, origen, destino):
+        """Saltos entre dos dispositivos (-1 si no hay camino o no pertenecen a la red)"""
+        d_origen = self.indice_objeto.get(origen)
+        d_destino = self.indice_objeto.get(destino)
+        if d_origen is None or d_destino is None:
+            return -1
+        return self.distancias(d_destino)[d_origen]
+    
+    def saltos_equivalentes(self, dispositivo, ip_destino):
+        """Pares (interfaz, vecino) de igual costo que acercan 'dispositivo' al
+        dueño de ip_destino; lista vacía si no hay camino"""
+        origen = self.indice_objeto.get(dispositivo)
+        destino = self.ip_a_dispositivo.get(ip_destino)
+        if origen is None or destino is None or origen == destino:
+            return []
+        
+        distancias = self.distancias(destino)
+        mi_distancia = distancias[origen]
+        if mi_distancia < 0:
+            return []
+        return [(self.interfaces[i], self.interfaces[j]) for i, j in self._enlaces_utilizables(origen)
+                if distancias[self.interfaz_dispositivo[j]] == mi_distancia - 1]
@@ -0,0 +1,102 @@
+# Módulo 14: Validación de topología
+# Invariantes verificados en cada cambio y guardados como conjunto de violaciones
+
+class ValidadorTopologia:
+    """Mantiene las violaciones de la topología al día con cada mutación:
+    enlaces unidireccionales, conexiones de un dispositivo consigo mismo,
+    IPs duplicadas y vecinos que ya no pertenecen a la red.
+    
+    Cada cambio revisa solo el par de interfaces o la IP afectada, así que
+    consultar las violaciones cuesta O(violaciones). auditar() recorre toda
+    la red y reconstruye el estado, por si algo se modificó sin avisar"""
+    
+    def __init__(self, red):
+        self.red = red
+        self.pares = set()  # (interfaz, vecina) por cada sentido conectado
+        self.direcciones = {}  # IP -> interfaces que la tienen asignada
+        self.violaciones = {}  # Clave -> mensaje, en orden de detección
+        self.auditorias = 0
+    
+    def reiniciar(self):
+        """Olvida todo el estado (la red quedó vacía)"""
+        self.pares.clear()
+        self.direcciones.clear()
+        self.violaciones.clear()
+    
+    def _nombre(self, interfaz):
+        return f"{interfaz.dispositivo_padre.nombre}:{interfaz.nombre}"
+    
+    def _registrada(self, interfaz):
+        """Indica si la interfaz sigue perteneciendo a un dispositivo de la red"""
+        dispositivo = interfaz.dispositivo_padre
+        return dispositivo.red is self.red and dispositivo.interfaces.get(interfaz.nombre) is interfaz
+    
+    def _marcar(self, clave, violada, mensaje):
+        if violada:
+            self.violaciones.setdefault(clave, mensaje)
+        else:
+            self.violaciones.pop(clave, None)
+    
+    def enlace_conectado(self, interfaz, vecina):
+        """Registra el sentido interfaz -> vecina y revisa el par"""
+        self.pares.add((interfaz, vecina))
+        self._verificar_par(interfaz, vecina)
+    
+    def enlace_desconectado(self, interfaz, vecina):
+        """Elimina el sentido interfaz -> vecina y revisa el par"""
+        self.pares.discard((interfaz, vecina))
+        self._verificar_par(interfaz, vecina)
+    
+    def _verificar_par(self, a, b):
+        """Revisa los invariantes de ambos sentidos entre dos interfaces"""
+        for origen, destino in ((a, b), (b, a)):
+            conectado = (origen, destino) in self.pares
+            self._marcar(('unidireccional', origen, destino),
+                         conectado and (destino, origen) not in self.pares,
+                         f"Conexión unidireccional detectada: {self._nombre(origen)}")
+            self._marcar(('colgante', origen, destino),
+                         conectado and not self._registrada(destino),
+                         f"Vecino inexistente en la red: {self._nombre(origen)}")
+        self._marcar(('bucle', frozenset((a, b))),
+                     ((a, b) in self.pares or (b, a) in self.pares)
+                     and a.dispositivo_padre is b.dispositivo_padre,
+                     f"Dispositivo conectado consigo mismo: {self._nombre(a)} <-> {self._nombre(b)}")
+    
+    def direccion_cambiada(self, interfaz, anterior):
+        """Mueve la interfaz de su IP anterior a la actual y revisa ambas"""
+        if anterior:
+            dueñas = self.direcciones.get(anterior)
+            if dueñas:
+                dueñas.discard(interfaz)
+                if not dueñas:
+                    del self.direcciones[anterior]
+            self._verificar_direccion(anterior)
+        if interfaz.direccion_ip:
+            self.direcciones.setdefault(interfaz.direccion_ip, set()).add(interfaz)
+            self._verificar_direccion(interfaz.direccion_ip)
+    
+    def _verificar_direccion(self, ip):
+        dueñas = self.direcciones.get(ip, ())
+        nombres = ", ".join(sorted(self._nombre(i) for i in dueñas))
+        self._marcar(('ip_duplicada', ip), len(dueñas) > 1, f"IP duplicada {ip}: {nombres}")
+    
+    def obtener_violaciones(self):
+        """Mensajes de las violaciones vigentes"""
+        return list(self.violaciones.values())
+    
+    def auditar(self):
+        """Recorre toda la red, reconstruye el estado y retorna las violaciones"""
+        self.reiniciar()
+        self.auditorias += 1
+        for dispositivo in self.red.dispositivos.values():
+            for interfaz in dispositivo.interfaces.values():
+                for vecina in interfaz.obtener_vecinos():
+                    self.pares.add((interfaz, vecina))
+                if interfaz.direccion_ip:
+                    self.direcciones.setdefault(interfaz.direccion_ip, set()).add(interfaz)
+        
+        for interfaz, vecina in list(self.pares):
+            self._verificar_par(interfaz, vecina)
+        for ip in self.direcciones:
+            self._verificar_direccion(ip)
+        return self.obtener_violaciones()